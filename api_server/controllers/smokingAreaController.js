@@ -45,6 +45,55 @@ function resolveSubmittedCategory(rawCategory) {
   return null;
 }
 
+// 카운터 테이블이 없을 때(마이그레이션 전 DB) 쓰는 집계 - parse_district()와 같은 규칙으로 시도 + 시군구를 뽑는다
+const FALLBACK_STATS_SQL = `
+  WITH active AS (
+    SELECT
+      category,
+      COALESCE(
+        (SELECT m[1] || ' ' || m[2] FROM regexp_match(address, '^\\s*(\\S+(?:특별시|광역시|특별자치시|특별자치도|도))\\s+(\\S+(?:시|군|구))(?:\\s|$)') AS m),
+        (regexp_match(address, '^\\s*(\\S+특별자치시)'))[1],
+        '기타'
+      ) AS district
+    FROM smoking_areas
+    WHERE status = 'active'
+  )
+  SELECT 'total' AS dimension, 'all' AS key, COUNT(*) AS count FROM active
+  UNION ALL SELECT 'category', category, COUNT(*) FROM active GROUP BY category
+  UNION ALL SELECT 'district', district, COUNT(*) FROM active GROUP BY district
+`;
+
+// 통계 카운터 조회 (scripts/migrations/0008_statistics_counters.sql), 테이블이 없으면 직접 집계
+async function fetchStatisticsRows() {
+  try {
+    const result = await query(`
+      SELECT dimension, key, count
+      FROM smoking_area_stats
+      WHERE count > 0
+    `);
+    return result.rows;
+  } catch (error) {
+    if (error.code !== '42P01') { // undefined_table
+      throw error;
+    }
+    debugLogger('smoking_area_stats table missing, aggregating smoking_areas directly');
+    const result = await query(FALLBACK_STATS_SQL);
+    return result.rows;
+  }
+}
+
+// 행 목록을 { key: count } 로 합친 뒤 개수 내림차순 배열로
+function sortedCounts(rows, keyOf, field) {
+  const counts = new Map();
+  rows.forEach(row => {
+    const key = keyOf(row);
+    counts.set(key, (counts.get(key) || 0) + parseInt(row.count));
+  });
+  return [...counts.entries()]
+    .sort((a, b) => b[1] - a[1])
+    .map(([key, count]) => ({ [field]: key, count }));
+}
+
 class SmokingAreaController {
   // 모든 흡연구역 조회
   static async getAllAreas(req, res) {
@@ -307,53 +356,20 @@ class SmokingAreaController {
     try {
       debugLogger('Getting smoking areas statistics');
 
-      const totalResult = await query(`
-        SELECT COUNT(*) as total_count
-        FROM smoking_areas
-        WHERE status = 'active'
-      `);
-
-      const categoryResult = await query(`
-        SELECT
-          category,
-          COUNT(*) as count
-        FROM smoking_areas
-        WHERE status = 'active'
-        GROUP BY category
-        ORDER BY count DESC
-      `);
-
-      const districtResult = await query(`
-        SELECT
-          CASE
-            WHEN address LIKE '%중구%' THEN '중구'
-            WHEN address LIKE '%용산구%' THEN '용산구'
-            WHEN address LIKE '%성동구%' THEN '성동구'
-            WHEN address LIKE '%광진구%' THEN '광진구'
-            WHEN address LIKE '%동대문구%' THEN '동대문구'
-            WHEN address LIKE '%노원구%' THEN '노원구'
-            WHEN address LIKE '%강서구%' THEN '강서구'
-            ELSE '기타'
-          END as district,
-          COUNT(*) as count
-        FROM smoking_areas
-        WHERE status = 'active'
-        GROUP BY district
-        ORDER BY count DESC
-      `);
+      const rows = await fetchStatisticsRows();
+      const rowsFor = dimension => rows.filter(row => row.dimension === dimension);
+      const totalRow = rowsFor('total')[0];
+      const districtRows = rowsFor('district');
 
       const response = {
         success: true,
         statistics: {
-          total_areas: parseInt(totalResult.rows[0].total_count),
-          by_category: categoryResult.rows.map(row => ({
-            category: row.category,
-            count: parseInt(row.count),
-          })),
-          by_district: districtResult.rows.map(row => ({
-            district: row.district,
-            count: parseInt(row.count),
-          })),
+          total_areas: totalRow ? parseInt(totalRow.count) : 0,
+          by_category: sortedCounts(rowsFor('category'), row => row.key, 'category'),
+          // 기존 응답 형식 유지: 시군구 이름만 (예: '중구')
+          by_district: sortedCounts(districtRows, row => row.key.split(' ').pop(), 'district'),
+          // 시도 + 시군구 (예: '서울특별시 중구')
+          by_region: sortedCounts(districtRows, row => row.key, 'region'),
           last_updated: new Date().toISOString(),
         },
       };
@@ -426,7 +442,7 @@ class SmokingAreaController {
       // 역지오코딩으로 실제 주소 가져오기 (실패 시 좌표 기반 폴백)
       const address = await GeocodingService.getAddressOrFallback(latNum, lngNum);
 
-      // 데이터베이스에 대기 상태로 저장
+      // 데이터베이스에 대기 상태로 저장 (셀 키는 DB 트리거가, 지역 코드는 scripts/region_assignment.py가 채운다)
       const result = await query(`
         INSERT INTO smoking_areas (
           category, submitted_category, address, detail, postal_code,
@@ -3,12 +3,15 @@
 
 import pandas as pd
 import requests
-import time
 import json
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+from rate_limiter import kakao_rate_limiter
+
 class CoordinateAdder:
     def __init__(self, input_csv=None):
         # .env 파일 로드
@@ -17,7 +20,7 @@ class CoordinateAdder:
         self.input_csv = input_csv or os.getenv('INPUT_CSV', "validated_total_smoking_place_20250920_190021.csv")
         self.kakao_api_url = os.getenv('KAKAO_API_URL', "https://dapi.kakao.com/v2/local/search/address.json")
         self.api_key = os.getenv('KAKAO_API_KEY')
-        self.api_delay = float(os.getenv('API_DELAY', 0.1))
+        self.metrics = pipeline_metrics('add_coordinates')
 
     def load_data(self):
         """CSV 데이터 로드"""
@@ -53,6 +56,9 @@ class CoordinateAdder:
         if not self.api_key:
             return False, "API 키가 설정되지 않음"
 
+        # API 제한 고려 (카카오는 초당 10회 제한) - 다른 카카오 호출과 같은 버킷을 공유
+        self.metrics.observe('kakao.rate_limit_wait', kakao_rate_limiter().acquire())
+
         try:
             headers = {
                 'Authorization': f'KakaoAK {self.api_key}'
@@ -63,7 +69,8 @@ class CoordinateAdder:
                 'analyze_type': 'similar'
             }
 
-            response = requests.get(self.kakao_api_url, headers=headers, params=params, timeout=10)
+            with self.metrics.timer('kakao.address_search'):
+                response = requests.get(self.kakao_api_url, headers=headers, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -167,6 +174,7 @@ class CoordinateAdder:
             existing_lon = pick_coordinate(row, longitude_candidates)
             existing_lat = pick_coordinate(row, latitude_candidates)
 
+            self.metrics.cache('existing_coordinates', hit=existing_lon is not None and existing_lat is not None)
             if existing_lon is not None and existing_lat is not None:
                 df.at[idx, 'kakao_longitude'] = existing_lon
                 df.at[idx, 'kakao_latitude'] = existing_lat
@@ -213,9 +221,6 @@ class CoordinateAdder:
                 coord_success_rate = success_count / (success_count + fail_count) * 100 if (success_count + fail_count) > 0 else 0
                 print(f"    📊 진행률: {progress:.1f}% | 좌표변환 성공률: {coord_success_rate:.1f}%")
 
-            # API 제한 고려 (카카오는 초당 10회 제한)
-            time.sleep(self.api_delay)
-
         print("\n" + "="*60)
         print("🎉 좌표 변환 완료")
         print("="*60)
@@ -226,9 +231,9 @@ class CoordinateAdder:
 
         return df
 
-    def save_final_result(self, df):
+    def save_final_result(self, df, timestamp=None):
         """최종 결과 저장"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
 
         # 최종 CSV 저장
         output_csv = f"final_smoking_places_with_coordinates_{timestamp}.csv"
@@ -274,18 +279,28 @@ class CoordinateAdder:
         print("="*60)
 
         # 1. 데이터 로드
-        df = self.load_data()
+        with self.metrics.stage('load_csv') as stage:
+            df = self.load_data()
+            stage.rows = len(df) if df is not None else 0
         if df is None:
             return False
 
         # 2. 우편번호 컬럼 정리
-        df = self.fix_postcode_column(df)
+        with self.metrics.stage('fix_postcode', rows=len(df)):
+            df = self.fix_postcode_column(df)
 
         # 3. 좌표 변환
-        df = self.add_coordinates_to_dataframe(df)
+        with self.metrics.stage('geocode', rows=int((df['검증상태'] == '성공').sum())):
+            df = self.add_coordinates_to_dataframe(df)
 
-        # 4. 최종 결과 저장
-        output_file, complete_count = self.save_final_result(df)
+        # 4. 최종 결과 저장 (메트릭은 final_summary_{timestamp}.json 옆에 같은 timestamp로 남긴다)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        with self.metrics.stage('save_result', rows=len(df)):
+            output_file, complete_count = self.save_final_result(df, timestamp)
+
+        self.metrics.print_summary()
+        for path in self.metrics.write_reports(timestamp):
+            print(f"📈 메트릭 저장: {path}")
 
         print(f"\n🎉 모든 작업 완료!")
         print(f"📍 완전한 흡연구역 데이터 {complete_count}개 준비 완료")
@@ -335,11 +350,26 @@ def test_kakao_api():
     except Exception as e:
         print(f"❌ 테스트 실패: {e}")
 
-if __name__ == "__main__":
+def main():
+    """메인 실행 함수 (성공 여부 반환)"""
     import sys
 
-    if len(sys.argv) > 1 and sys.argv[1] == "test":
+    # --profile: 단계별 cProfile/collapsed stack 기록 (add_coordinates_profile_*)
+    # --memory: 단계별 최고 RSS/tracemalloc 상위 할당을 메트릭 리포트에 기록
+    profile = '--profile' in sys.argv
+    if '--memory' in sys.argv:
+        pipeline_metrics('add_coordinates').track_memory()
+    args = [arg for arg in sys.argv[1:] if arg not in {'--profile', '--memory'}]
+
+    if args and args[0] == "test":
         test_kakao_api()
-    else:
+        return True
+
+    with profile_run('add_coordinates', enabled=profile):
         adder = CoordinateAdder()
-        adder.run()
+        return adder.run()
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(0 if main() else 1)
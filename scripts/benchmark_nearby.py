@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""주변 검색 쿼리 벤치마크: 기존 acos 하버사인 vs 바운딩 박스 + 삼각함수 컬럼"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+
+from nearby_search import build_legacy_nearby_query, build_nearby_query
+
+
+def _time_queries(cursor, builder, points, radius, limit, **kwargs) -> tuple[list[float], list[list[int]]]:
+    timings = []
+    results = []
+    for lat, lng in points:
+        sql, params = builder(lat, lng, radius, limit, **kwargs)
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append([row[0] for row in rows])
+    return timings, results
+
+
+def _summary(label: str, timings: list[float]) -> float:
+    median = statistics.median(timings)
+    p95 = sorted(timings)[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else max(timings)
+    print(f"  {label:<12} 중앙값 {median:8.2f}ms | p95 {p95:8.2f}ms | 평균 {statistics.mean(timings):8.2f}ms")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark nearby-search SQL variants.')
+    parser.add_argument('--queries', type=int, default=200, help='Number of random query points.')
+    parser.add_argument('--radius', type=float, default=1000, help='Search radius in meters.')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5432'),
+        database=os.getenv('DB_NAME', 'smoking_areas_db'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT latitude::float8, longitude::float8 FROM smoking_areas WHERE status = 'active'")
+        anchors = cursor.fetchall()
+        if not anchors:
+            print("❌ 활성 흡연구역이 없어 벤치마크를 실행할 수 없습니다.")
+            return
+
+        # 실제 데이터 주변의 임의 지점 (약 ±1km 흔들기)
+        rng = random.Random(args.seed)
+        points = [
+            (lat + rng.uniform(-0.01, 0.01), lng + rng.uniform(-0.01, 0.01))
+            for lat, lng in (rng.choice(anchors) for _ in range(args.queries))
+        ]
+
+        print(f"📊 주변 검색 벤치마크: 행 {len(anchors)}개, 쿼리 {len(points)}회, 반경 {args.radius:.0f}m")
+
+        # 워밍업
+        _time_queries(cursor, build_legacy_nearby_query, points[:10], args.radius, args.limit)
+        _time_queries(cursor, build_nearby_query, points[:10], args.radius, args.limit)
+
+        legacy_timings, legacy_ids = _time_queries(cursor, build_legacy_nearby_query, points, args.radius, args.limit)
+        bbox_timings, bbox_ids = _time_queries(cursor, build_nearby_query, points, args.radius, args.limit)
+        cell_timings, cell_ids = _time_queries(cursor, build_nearby_query, points, args.radius, args.limit, prefilter='cells')
+
+        legacy_median = _summary('legacy', legacy_timings)
+        bbox_median = _summary('bbox+trig', bbox_timings)
+        cell_median = _summary('cells+trig', cell_timings)
+
+        print(f"  🚀 속도 향상: bbox+trig {legacy_median / bbox_median:.1f}배, cells+trig {legacy_median / cell_median:.1f}배")
+
+        mismatches = sum(
+            1 for legacy, bbox, cells in zip(legacy_ids, bbox_ids, cell_ids)
+            if set(legacy) != set(bbox) or set(legacy) != set(cells)
+        )
+        if mismatches:
+            print(f"  ⚠️ 결과가 다른 쿼리: {mismatches}개")
+        else:
+            print("  ✅ 모든 쿼리 결과 일치")
+
+        cursor.close()
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""삽입 전 좌표 검증 (프레임 전체를 한 번에 벡터 연산)
+
+- missing: 위경도 결측/숫자 아님
+- zero: 위도 또는 경도가 0
+- swapped: 위경도를 바꾸면 국내 범위 안에 들어오는 경우
+- out_of_bounds: 국내 범위(제주 남단 ~ 북단, 서해 ~ 독도) 밖
+- district_outlier: 같은 시군구(주소 파싱) 중앙 지점에서 MAD 기준으로 지나치게 먼 경우
+
+표시된 행은 quarantine CSV로 따로 남기고 삽입 대상에서 뺀다.
+"""
+
+import argparse
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from haversine_kernel import haversine_pairwise
+
+
+# (남, 북, 서, 동) - 마라도 33.11, 북한 접경 38.6, 격렬비열도 125.6, 독도 131.87
+KOREA_BOUNDS = (32.9, 38.7, 124.5, 132.0)
+
+# migrations/0008 parse_district()와 같은 규칙
+DISTRICT_PATTERN = re.compile(r'^\s*(\S+(?:특별시|광역시|특별자치시|특별자치도|도))\s+(\S+(?:시|군|구))(?:\s|$)')
+SEJONG_PATTERN = re.compile(r'^\s*(\S+특별자치시)')
+
+MAD_SCALE = 1.4826  # 정규분포에서 MAD → 표준편차
+MAD_THRESHOLD = 5.0
+MIN_GROUP_SIZE = 5
+# 넓은 군 지역에서 정상 지점을 이상치로 잡지 않도록 최소 거리
+MIN_OUTLIER_DISTANCE_M = 15_000.0
+
+ISSUE_COLUMN = 'coordinate_issue'
+
+
+@lru_cache(maxsize=4096)
+def _district_of_prefix(prefix: str) -> str:
+    match = DISTRICT_PATTERN.match(prefix)
+    if match:
+        return f'{match.group(1)} {match.group(2)}'
+    match = SEJONG_PATTERN.match(prefix)
+    return match.group(1) if match else '기타'
+
+
+def parse_districts(addresses: pd.Series) -> pd.Series:
+    """주소 → '시도 시군구' (파싱 실패는 '기타')
+
+    결과는 앞 두 어절로만 정해지므로 그 접두어 단위로 캐시해 행마다 정규식을 돌리지 않는다.
+    """
+    return pd.Series(
+        [_district_of_prefix(' '.join(address.split(None, 2)[:2])) if isinstance(address, str) else '기타'
+         for address in addresses.tolist()],
+        index=addresses.index,
+    )
+
+
+def _in_bounds(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    south, north, west, east = KOREA_BOUNDS
+    return (latitudes >= south) & (latitudes <= north) & (longitudes >= west) & (longitudes <= east)
+
+
+def flag_coordinates(latitudes, longitudes, addresses=None) -> pd.Series:
+    """행마다 첫 번째로 걸린 문제 이름 (문제 없으면 빈 문자열)"""
+    latitudes = pd.to_numeric(pd.Series(latitudes), errors='coerce').reset_index(drop=True)
+    longitudes = pd.to_numeric(pd.Series(longitudes), errors='coerce').reset_index(drop=True)
+    lat = latitudes.to_numpy(dtype=np.float64)
+    lon = longitudes.to_numpy(dtype=np.float64)
+
+    issues = np.full(len(lat), '', dtype=object)
+
+    missing = np.isnan(lat) | np.isnan(lon)
+    zero = ~missing & ((lat == 0) | (lon == 0))
+    in_bounds = _in_bounds(lat, lon)
+    swapped = ~missing & ~zero & ~in_bounds & _in_bounds(lon, lat)
+    out_of_bounds = ~missing & ~zero & ~in_bounds & ~swapped
+
+    issues[out_of_bounds] = 'out_of_bounds'
+    issues[swapped] = 'swapped'
+    issues[zero] = 'zero'
+    issues[missing] = 'missing'
+
+    if addresses is not None:
+        outliers = _district_outliers(lat, lon, pd.Series(addresses).reset_index(drop=True), in_bounds)
+        issues[outliers & (issues == '')] = 'district_outlier'
+
+    return pd.Series(issues, name=ISSUE_COLUMN)
+
+
+def _district_outliers(lat: np.ndarray, lon: np.ndarray, addresses: pd.Series, usable: np.ndarray) -> np.ndarray:
+    frame = pd.DataFrame({'district': parse_districts(addresses), 'lat': lat, 'lon': lon})
+    frame = frame[usable & (frame['district'] != '기타').to_numpy()]
+    if frame.empty:
+        return np.zeros(len(lat), dtype=bool)
+
+    groups = frame.groupby('district', sort=False)
+    size = groups['lat'].transform('size').to_numpy()
+    center_lat = groups['lat'].transform('median').to_numpy()
+    center_lon = groups['lon'].transform('median').to_numpy()
+    distances = haversine_pairwise(frame['lat'].to_numpy(), frame['lon'].to_numpy(), center_lat, center_lon)
+
+    frame = frame.assign(distance=distances)
+    groups = frame.groupby('district', sort=False)['distance']
+    median_distance = groups.transform('median').to_numpy()
+    mad = (frame['distance'] - median_distance).abs().groupby(frame['district'], sort=False).transform('median').to_numpy()
+
+    threshold = np.maximum(median_distance + MAD_THRESHOLD * MAD_SCALE * mad, MIN_OUTLIER_DISTANCE_M)
+    flagged = (size >= MIN_GROUP_SIZE) & (distances > threshold)
+
+    result = np.zeros(len(lat), dtype=bool)
+    result[frame.index.to_numpy()[flagged]] = True
+    return result
+
+
+def split_valid(frame: pd.DataFrame, latitude_column: str, longitude_column: str,
+                address_column: str | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(정상 행, 격리 행 + coordinate_issue 컬럼)"""
+    addresses = frame[address_column] if address_column else None
+    issues = flag_coordinates(frame[latitude_column], frame[longitude_column], addresses)
+    mask = (issues != '').to_numpy()
+    quarantined = frame[mask].copy()
+    quarantined[ISSUE_COLUMN] = issues[mask].to_numpy()
+    return frame[~mask], quarantined
+
+
+def write_quarantine(quarantined: pd.DataFrame, path: str):
+    quarantined.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def summarize(quarantined: pd.DataFrame) -> str:
+    counts = quarantined[ISSUE_COLUMN].value_counts()
+    return ', '.join(f'{issue} {count}개' for issue, count in counts.items())
+
+
+def main():
+    import time
+
+    parser = argparse.ArgumentParser(description='Flag suspicious coordinates in a CSV.')
+    parser.add_argument('csv_path')
+    parser.add_argument('--lat', default='kakao_latitude', help='Latitude column.')
+    parser.add_argument('--lng', default='kakao_longitude', help='Longitude column.')
+    parser.add_argument('--address', default='주소', help='Address column used for district outliers.')
+    parser.add_argument('-o', '--output', default=None, help='Quarantine CSV path.')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv_path, encoding='utf-8-sig')
+    start = time.perf_counter()
+    _, quarantined = split_valid(df, args.lat, args.lng, args.address if args.address in df.columns else None)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"🧭 {len(df)}개 행 좌표 검증 ({elapsed_ms:.1f}ms): 격리 {len(quarantined)}개")
+    if len(quarantined):
+        print(f"  {summarize(quarantined)}")
+        output = args.output or f"{args.csv_path.rsplit('.', 1)[0]}_quarantine.csv"
+        write_quarantine(quarantined, output)
+        print(f"  격리 파일 저장: {output}")
+
+
+if __name__ == '__main__':
+    main()
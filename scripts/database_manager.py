@@ -1,13 +1,24 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import math
 import psycopg2
-import pandas as pd
-import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+# pandas/numpy를 쓰는 모듈(coordinate_validation, region_assignment, export_writers)은
+# 필요한 메서드 안에서 import한다 - stats 같은 가벼운 명령의 시작 시간을 줄이기 위해
+from schema_migrations import SchemaMigrator
+from spatial_cells import CELL_COLUMNS, EARTH_RADIUS_M, cell_keys
+from nearby_search import build_nearby_query, postgis_search_installed
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+
+# PostGIS 없이 최근접 검색할 때 차례로 넓히는 셀 키 검색 반경
+NEAREST_FALLBACK_RADII_M = (1000, 4000, 16000, 64000)
+
+
 class DatabaseManager:
     def __init__(self):
         # .env 파일 로드
@@ -22,11 +33,15 @@ class DatabaseManager:
             'password': os.getenv('DB_PASSWORD', '')
         }
         self.connection = None
+        # PostGIS 검색 함수(마이그레이션 0005) 설치 여부 - 연결마다 한 번 확인
+        self._postgis_search = None
+        self.metrics = pipeline_metrics('database_manager')
 
     def connect(self):
         """데이터베이스 연결"""
         try:
             self.connection = psycopg2.connect(**self.db_config)
+            self._postgis_search = None
             print(f"✅ PostgreSQL 연결 성공: {self.db_config['database']}")
             return True
         except Exception as e:
@@ -40,85 +55,17 @@ class DatabaseManager:
             print("📪 데이터베이스 연결 해제")
 
     def create_tables(self):
-        """흡연구역 테이블 생성"""
-        print("🔧 흡연구역 테이블 생성 중...")
-
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS smoking_areas (
-            id SERIAL PRIMARY KEY,
-            category VARCHAR(20) NOT NULL,
-            submitted_category VARCHAR(20),
-            address TEXT NOT NULL,
-            detail TEXT,
-            postal_code VARCHAR(10),
-            longitude DECIMAL(10, 7) NOT NULL,
-            latitude DECIMAL(10, 7) NOT NULL,
-            status VARCHAR(10) DEFAULT 'active',
-            report_count INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-
-        # 인덱스 생성
-        create_indexes_sql = """
-        CREATE INDEX IF NOT EXISTS idx_smoking_areas_location ON smoking_areas(latitude, longitude);
-        CREATE INDEX IF NOT EXISTS idx_smoking_areas_category ON smoking_areas(category);
-        CREATE INDEX IF NOT EXISTS idx_smoking_areas_status ON smoking_areas(status);
-        """
-
-        # 업데이트 트리거 함수
-        create_trigger_sql = """
-        CREATE OR REPLACE FUNCTION update_updated_at_column()
-        RETURNS TRIGGER AS $$
-        BEGIN
-            NEW.updated_at = CURRENT_TIMESTAMP;
-            RETURN NEW;
-        END;
-        $$ language 'plpgsql';
-
-        DROP TRIGGER IF EXISTS update_smoking_areas_updated_at ON smoking_areas;
-        CREATE TRIGGER update_smoking_areas_updated_at
-            BEFORE UPDATE ON smoking_areas
-            FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-        """
-
-        # 뷰 생성
-        create_view_sql = """
-        CREATE OR REPLACE VIEW active_smoking_areas AS
-        SELECT
-            id,
-            category,
-            submitted_category,
-            address,
-            detail,
-            postal_code,
-            longitude,
-            latitude,
-            report_count,
-            created_at
-        FROM smoking_areas
-        WHERE status = 'active';
-        """
+        """흡연구역 테이블 생성 (미적용 스키마 마이그레이션 실행)"""
+        print("🔧 흡연구역 스키마 확인 중...")
 
         try:
-            cursor = self.connection.cursor()
-
-            cursor.execute(create_table_sql)
-            print("  ✅ smoking_areas 테이블 생성")
-
-            cursor.execute(create_indexes_sql)
-            print("  ✅ 인덱스 생성")
-
-            cursor.execute(create_trigger_sql)
-            print("  ✅ 업데이트 트리거 생성")
-
-            cursor.execute(create_view_sql)
-            print("  ✅ active_smoking_areas 뷰 생성")
-
-            self.connection.commit()
-            cursor.close()
-            print("🎉 테이블 생성 완료")
+            with self.metrics.timer('db.migrate'):
+                applied = SchemaMigrator(self.connection).migrate()
+            if applied:
+                print(f"  ✅ 마이그레이션 {applied}개 적용")
+            else:
+                print("  ✅ 스키마가 최신 상태입니다")
+            print("🎉 테이블 준비 완료")
             return True
 
         except Exception as e:
@@ -128,11 +75,18 @@ class DatabaseManager:
 
     def import_csv_data(self, csv_file="final_smoking_places_with_coordinates_20250920_192227.csv"):
         """CSV 데이터를 데이터베이스로 임포트"""
+        import pandas as pd
+
+        from coordinate_validation import split_valid, summarize, write_quarantine
+        from region_assignment import REGION_COLUMNS, region_codes_for
+
         print(f"📊 CSV 데이터 임포트 시작: {csv_file}")
 
         try:
             # CSV 파일 로드
-            df = pd.read_csv(csv_file, encoding='utf-8-sig')
+            with self.metrics.stage('load_csv') as stage:
+                df = pd.read_csv(csv_file, encoding='utf-8-sig')
+                stage.rows = len(df)
             print(f"  📄 CSV 파일 로드: {len(df)}개 행")
 
             # 성공한 데이터만 필터링
@@ -145,6 +99,14 @@ class DatabaseManager:
 
             print(f"  ✅ 유효한 데이터: {len(valid_data)}개")
 
+            # 좌표 검증 (범위 밖/축 뒤바뀜/0 좌표/시군구 이상치는 격리)
+            with self.metrics.stage('validate_coordinates', rows=len(valid_data)):
+                valid_data, quarantined = split_valid(valid_data, 'kakao_latitude', 'kakao_longitude', '주소')
+            if len(quarantined):
+                quarantine_file = f"quarantine_coordinates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                write_quarantine(quarantined, quarantine_file)
+                print(f"  🚧 좌표 검증 격리 {len(quarantined)}개 ({summarize(quarantined)}): {quarantine_file}")
+
             # 우편번호 형식 수정 (앞에 0 추가)
             def fix_postal_code(postal_code):
                 if pd.isna(postal_code):
@@ -160,33 +122,50 @@ class DatabaseManager:
 
             # 기존 데이터 삭제
             cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM smoking_areas")
+            with self.metrics.timer('db.delete_all'):
+                cursor.execute("DELETE FROM smoking_areas")
             print("  🗑️ 기존 데이터 삭제")
 
             # 데이터 삽입
             insert_count = 0
-            for _, row in valid_data.iterrows():
-                insert_sql = """
-                INSERT INTO smoking_areas (
-                    category, submitted_category, address, detail, postal_code,
-                    longitude, latitude, status, report_count
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(insert_sql, (
-                    row['카테고리'] if row['카테고리'] in ['공공데이타', '시민제보'] else '공공데이타',
-                    None,
-                    row['주소'],
-                    row['상세'],
-                    row['우편번호_수정'],
-                    float(row['kakao_longitude']),
-                    float(row['kakao_latitude']),
-                    'active',
-                    0
-                ))
-                insert_count += 1
-
-            self.connection.commit()
+            extra_columns = ', '.join(CELL_COLUMNS + REGION_COLUMNS)
+            extra_placeholders = ', '.join(['%s'] * len(CELL_COLUMNS + REGION_COLUMNS))
+            insert_sql = f"""
+            INSERT INTO smoking_areas (
+                category, submitted_category, address, detail, postal_code,
+                longitude, latitude, status, report_count, {extra_columns}
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, {extra_placeholders})
+            """
+
+            # 행정구역 코드 일괄 배정 (경계 데이터가 설정된 경우)
+            region_codes = region_codes_for(
+                valid_data['kakao_latitude'].astype(float).tolist(),
+                valid_data['kakao_longitude'].astype(float).tolist(),
+            )
+
+            with self.metrics.stage('db_insert', rows=len(valid_data)):
+                for (_, row), codes in zip(valid_data.iterrows(), region_codes):
+                    longitude = float(row['kakao_longitude'])
+                    latitude = float(row['kakao_latitude'])
+
+                    with self.metrics.timer('db.insert_row'):
+                        cursor.execute(insert_sql, (
+                            row['카테고리'] if row['카테고리'] in ['공공데이타', '시민제보'] else '공공데이타',
+                            None,
+                            row['주소'],
+                            row['상세'],
+                            row['우편번호_수정'],
+                            longitude,
+                            latitude,
+                            'active',
+                            0,
+                            *cell_keys(latitude, longitude),
+                            *codes
+                        ))
+                    insert_count += 1
+
+                with self.metrics.timer('db.commit'):
+                    self.connection.commit()
             cursor.close()
             print(f"  ✅ 데이터 삽입 완료: {insert_count}개")
             return True
@@ -203,42 +182,30 @@ class DatabaseManager:
         try:
             cursor = self.connection.cursor()
 
-            # 전체 통계
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as total_count,
-                    COUNT(CASE WHEN category = '공공데이타' THEN 1 END) as public_data,
-                    COUNT(CASE WHEN category = '시민제보' THEN 1 END) as citizen_reports
-                FROM smoking_areas
-                WHERE status = 'active'
-            """)
+            # 트리거로 유지되는 통계 카운터 조회 (테이블 크기와 무관)
+            with self.metrics.timer('db.statistics'):
+                cursor.execute("""
+                    SELECT dimension, key, count
+                    FROM smoking_area_stats
+                    WHERE count > 0
+                    ORDER BY dimension, count DESC
+                """)
+
+            totals = {}
+            by_category = {}
+            districts = []
+            for dimension, key, count in cursor.fetchall():
+                if dimension == 'total':
+                    totals[key] = count
+                elif dimension == 'category':
+                    by_category[key] = count
+                elif dimension == 'district':
+                    districts.append((key, count))
+
+            print(f"  📋 총 흡연구역: {totals.get('all', 0)}개")
+            print(f"  🗂️ 공공데이타: {by_category.get('공공데이타', 0)}개")
+            print(f"  🙋 시민제보: {by_category.get('시민제보', 0)}개")
 
-            stats = cursor.fetchone()
-            print(f"  📋 총 흡연구역: {stats[0]}개")
-            print(f"  🗂️ 공공데이타: {stats[1]}개")
-            print(f"  🙋 시민제보: {stats[2]}개")
-
-            # 지역별 통계
-            cursor.execute("""
-                SELECT
-                    CASE
-                        WHEN address LIKE '%중구%' THEN '중구'
-                        WHEN address LIKE '%용산구%' THEN '용산구'
-                        WHEN address LIKE '%성동구%' THEN '성동구'
-                        WHEN address LIKE '%광진구%' THEN '광진구'
-                        WHEN address LIKE '%동대문구%' THEN '동대문구'
-                        WHEN address LIKE '%노원구%' THEN '노원구'
-                        WHEN address LIKE '%강서구%' THEN '강서구'
-                        ELSE '기타'
-                    END as district,
-                    COUNT(*) as count
-                FROM smoking_areas
-                WHERE status = 'active'
-                GROUP BY district
-                ORDER BY count DESC
-            """)
-
-            districts = cursor.fetchall()
             print("\\n  🗺️ 지역별 분포:")
             for district, count in districts:
                 print(f"    {district}: {count}개")
@@ -256,12 +223,13 @@ class DatabaseManager:
 
         try:
             cursor = self.connection.cursor()
-            cursor.execute("""
-                SELECT id, category, address, detail, longitude, latitude
-                FROM active_smoking_areas
-                ORDER BY id
-                LIMIT %s
-            """, (limit,))
+            with self.metrics.timer('db.sample'):
+                cursor.execute("""
+                    SELECT id, category, address, detail, longitude, latitude
+                    FROM active_smoking_areas
+                    ORDER BY id
+                    LIMIT %s
+                """, (limit,))
 
             rows = cursor.fetchall()
             for row in rows:
@@ -276,61 +244,169 @@ class DatabaseManager:
             print(f"❌ 샘플 데이터 조회 실패: {e}")
             return []
 
-    def export_json(self, output_file="smoking_areas_export.json"):
-        """JSON 형태로 데이터 내보내기"""
+    def postgis_search_available(self):
+        """smoking_areas_within/nearest 함수가 있는지 (PostGIS 없이 마이그레이션했다면 False)"""
+        if self._postgis_search is None:
+            cursor = self.connection.cursor()
+            try:
+                self._postgis_search = postgis_search_installed(cursor)
+            finally:
+                cursor.close()
+            if not self._postgis_search:
+                print("  ⚠️ PostGIS 검색 함수가 없어 셀 키 검색으로 대신합니다")
+        return self._postgis_search
+
+    def find_nearby(self, latitude, longitude, radius_meters=500, limit=50):
+        """반경 내 흡연구역 조회 (PostGIS ST_DWithin, GiST 인덱스 사용 - PostGIS가 없으면 셀 키 검색)"""
+        if not self.postgis_search_available():
+            return self.find_nearby_by_cells(latitude, longitude, radius_meters, limit)
+
+        cursor = self.connection.cursor()
+        try:
+            with self.metrics.timer('db.find_nearby'):
+                cursor.execute(
+                    "SELECT * FROM smoking_areas_within(%s, %s, %s, %s)",
+                    (latitude, longitude, radius_meters, limit),
+                )
+                return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def find_nearest(self, latitude, longitude, k=10):
+        """가까운 흡연구역 k개 조회 (PostGIS KNN <-> 정렬 - PostGIS가 없으면 셀 키 반경을 넓혀 가며 검색)"""
+        if not self.postgis_search_available():
+            return self._find_nearest_by_cells(latitude, longitude, k)
+
+        cursor = self.connection.cursor()
+        try:
+            with self.metrics.timer('db.find_nearest'):
+                cursor.execute(
+                    "SELECT * FROM smoking_areas_nearest(%s, %s, %s)",
+                    (latitude, longitude, k),
+                )
+                return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def find_nearby_by_cells(self, latitude, longitude, radius_meters=500, limit=50):
+        """반경 내 흡연구역 조회 (PostGIS 없이 셀 키 범위로 후보를 좁힌 뒤 정확한 거리 검사)"""
+        sql, params = build_nearby_query(latitude, longitude, radius_meters, limit, prefilter='cells')
+        cursor = self.connection.cursor()
+        try:
+            with self.metrics.timer('db.find_nearby_by_cells'):
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _find_nearest_by_cells(self, latitude, longitude, k):
+        """반경 안에서 k개가 모이면 그 k개가 최근접이다 - 끝까지 모자라면 전체를 거리순으로"""
+        for radius_meters in NEAREST_FALLBACK_RADII_M:
+            rows = self.find_nearby_by_cells(latitude, longitude, radius_meters, k)
+            if len(rows) >= k:
+                return rows
+
+        sql, params = build_nearby_query(latitude, longitude, math.pi * EARTH_RADIUS_M, k)
+        cursor = self.connection.cursor()
+        try:
+            with self.metrics.timer('db.find_nearest_full_scan'):
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def export_json(self, output_file="smoking_areas_export.json", output_format="json", batch_size=5000):
+        """JSON(또는 JSONL) 형태로 데이터 내보내기 (서버 사이드 커서로 스트리밍)"""
+        from export_writers import EXPORT_COLUMNS, JsonExportWriter, JsonLinesExportWriter, stream_to_writers
+
         print(f"📤 JSON 내보내기: {output_file}")
 
+        writer_class = JsonLinesExportWriter if output_format == 'jsonl' else JsonExportWriter
+        writer = writer_class(output_file, metadata={
+            'export_date': datetime.now().isoformat(),
+            'database': self.db_config['database']
+        })
+
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                SELECT
-                    id, category, submitted_category, address, detail, postal_code,
-                    longitude, latitude, report_count, created_at
+            # 이름 있는 커서 = 서버 사이드 커서: 결과를 batch_size씩 받아온다
+            cursor = self.connection.cursor(name='export_json_cursor')
+            cursor.itersize = batch_size
+            cursor.execute(f"""
+                SELECT {', '.join(EXPORT_COLUMNS)}
                 FROM active_smoking_areas
                 ORDER BY id
             """)
 
-            rows = cursor.fetchall()
-
-            # JSON 데이터 구성
-            export_data = {
-                'metadata': {
-                    'export_date': datetime.now().isoformat(),
-                    'total_count': len(rows),
-                    'database': self.db_config['database']
-                },
-                'smoking_areas': []
-            }
-
-            for row in rows:
-                area_data = {
-                    'id': row[0],
-                    'category': row[1],
-                    'submitted_category': row[2],
-                    'address': row[3],
-                    'detail': row[4],
-                    'postal_code': row[5],
-                    'coordinates': {
-                        'longitude': float(row[6]),
-                        'latitude': float(row[7])
-                    },
-                    'report_count': int(row[8]) if row[8] is not None else 0,
-                    'created_at': row[9].isoformat() if row[9] else None
-                }
-                export_data['smoking_areas'].append(area_data)
-
-            # JSON 파일 저장
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            with self.metrics.stage('export_json') as stage:
+                total = stream_to_writers(cursor, [writer], batch_size)
+                stage.rows = total
 
             cursor.close()
-            print(f"  ✅ {len(rows)}개 데이터 내보내기 완료")
+            self.connection.commit()
+            print(f"  ✅ {total}개 데이터 내보내기 완료")
             return True
 
         except Exception as e:
             print(f"❌ JSON 내보내기 실패: {e}")
+            self.connection.rollback()
             return False
 
+    def export_all(self, basename, formats=('json', 'geojson', 'fgb', 'compact', 'clusters', 'kdtree'), compress=True, batch_size=5000):
+        """한 번의 DB 스캔으로 여러 포맷 동시 내보내기 (+ gzip/brotli 사전 압축본)"""
+        from export_writers import EXPORT_COLUMNS, EXPORT_FORMATS, precompress, stream_to_writers
+
+        print(f"📤 다중 포맷 내보내기: {basename}.* ({', '.join(formats)})")
+
+        metadata = {
+            'export_date': datetime.now().isoformat(),
+            'database': self.db_config['database']
+        }
+        writers = []
+        for name in formats:
+            extension, writer_class = EXPORT_FORMATS[name]
+            try:
+                writers.append(writer_class(f"{basename}.{extension}", metadata=metadata))
+            except RuntimeError as e:
+                print(f"  ⚠️ {name} 건너뜀: {e}")
+
+        if not writers:
+            print("❌ 사용 가능한 내보내기 포맷이 없습니다.")
+            return []
+
+        try:
+            cursor = self.connection.cursor(name='export_all_cursor')
+            cursor.itersize = batch_size
+            cursor.execute(f"""
+                SELECT {', '.join(EXPORT_COLUMNS)}
+                FROM active_smoking_areas
+                ORDER BY id
+            """)
+
+            with self.metrics.stage('export_all') as stage:
+                total = stream_to_writers(cursor, writers, batch_size)
+                stage.rows = total
+
+            cursor.close()
+            self.connection.commit()
+        except Exception as e:
+            print(f"❌ 다중 포맷 내보내기 실패: {e}")
+            self.connection.rollback()
+            return []
+
+        outputs = []
+        for writer in writers:
+            outputs.append(writer.output_file)
+            size = os.path.getsize(writer.output_file)
+            line = f"  ✅ {writer.output_file}: {size:,} bytes"
+            if compress:
+                for compressed in precompress(writer.output_file):
+                    outputs.append(compressed)
+                    line += f" | {compressed.rsplit('.', 1)[-1]} {os.path.getsize(compressed):,} bytes"
+            print(line)
+
+        print(f"  📦 {total}개 데이터, {len(outputs)}개 파일 내보내기 완료")
+        return outputs
+
     def run_full_setup(self, csv_file=None):
         """전체 설정 실행"""
         print("🚀 흡연구역 데이터베이스 전체 설정 시작")
@@ -361,6 +437,10 @@ class DatabaseManager:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.export_json(f"smoking_areas_api_data_{timestamp}.json")
 
+        self.metrics.print_summary()
+        for path in self.metrics.write_reports(timestamp):
+            print(f"📈 메트릭 저장: {path}")
+
         print("\\n🎉 데이터베이스 설정 완료!")
         print("🔗 다음 단계: API 서버 개발 또는 모바일 앱 연동")
 
@@ -370,35 +450,62 @@ def main():
     """메인 실행 함수"""
     import sys
 
-    # CSV 파일 경로 설정
-    csv_file = "final_smoking_places_with_coordinates_20250920_192227.csv"
-
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "setup":
-            # 전체 설정 실행
-            db_manager = DatabaseManager()
-            success = db_manager.run_full_setup(csv_file)
-            db_manager.disconnect()
-            return success
-        elif sys.argv[1] == "stats":
-            # 통계만 조회
-            db_manager = DatabaseManager()
-            if db_manager.connect():
-                db_manager.get_statistics()
-                db_manager.get_sample_data(5)
-                db_manager.disconnect()
-        elif sys.argv[1] == "export":
-            # JSON 내보내기만 실행
-            db_manager = DatabaseManager()
-            if db_manager.connect():
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                db_manager.export_json(f"smoking_areas_api_data_{timestamp}.json")
+    # CSV 파일 경로 설정 (FINAL_CSV로 덮어쓸 수 있다)
+    csv_file = os.getenv('FINAL_CSV', "final_smoking_places_with_coordinates_20250920_192227.csv")
+
+    # --profile: 명령 전체를 단계별 cProfile/collapsed stack으로 기록 (database_manager_profile_*)
+    # --memory: 단계별 최고 RSS/tracemalloc 상위 할당을 메트릭 리포트에 기록
+    profile = '--profile' in sys.argv
+    if profile:
+        sys.argv.remove('--profile')
+    if '--memory' in sys.argv:
+        sys.argv.remove('--memory')
+        pipeline_metrics('database_manager').track_memory()
+
+    with profile_run('database_manager', enabled=profile):
+        if len(sys.argv) > 1:
+            if sys.argv[1] == "setup":
+                # 전체 설정 실행
+                db_manager = DatabaseManager()
+                success = db_manager.run_full_setup(csv_file)
                 db_manager.disconnect()
-    else:
-        print("사용법:")
-        print("  python3 database_manager.py setup   # 전체 설정 실행")
-        print("  python3 database_manager.py stats   # 통계 조회")
-        print("  python3 database_manager.py export  # JSON 내보내기")
+                return success
+            elif sys.argv[1] == "stats":
+                # 통계만 조회
+                db_manager = DatabaseManager()
+                if db_manager.connect():
+                    db_manager.get_statistics()
+                    db_manager.get_sample_data(5)
+                    db_manager.disconnect()
+            elif sys.argv[1] == "export":
+                # JSON 내보내기만 실행
+                # 포맷 지정이 없으면 json/geojson/fgb/compact/clusters/kdtree 전체를 한 번의 스캔으로 내보낸다
+                from export_writers import EXPORT_FORMATS
+                formats = [name for name in sys.argv[2:] if name in EXPORT_FORMATS] or ['json', 'geojson', 'fgb', 'compact', 'clusters', 'kdtree']
+                db_manager = DatabaseManager()
+                if db_manager.connect():
+                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    db_manager.export_all(f"smoking_areas_api_data_{timestamp}", formats)
+                    db_manager.disconnect()
+                    db_manager.metrics.write_reports(timestamp)
+            elif sys.argv[1] == "export-delta":
+                # 마지막 내보내기 이후 변경분만 패치로 기록 (주기적으로 전체 스냅샷)
+                from delta_export import DeltaExporter
+                output_dir = sys.argv[2] if len(sys.argv) > 2 else "delta_exports"
+                db_manager = DatabaseManager()
+                if db_manager.connect():
+                    DeltaExporter(db_manager.connection, output_dir).run()
+                    db_manager.disconnect()
+        else:
+            print("사용법:")
+            print("  python3 database_manager.py setup   # 전체 설정 실행")
+            print("  python3 database_manager.py stats   # 통계 조회")
+            print("  python3 database_manager.py export  # JSON/GeoJSON/FlatGeobuf/compact/클러스터/KD-tree 내보내기")
+            print("  python3 database_manager.py export json jsonl  # 지정한 포맷만 내보내기")
+            print("  python3 database_manager.py export-delta [폴더]  # 변경분 패치 내보내기")
+            print("  python3 database_manager.py <명령> --profile  # cProfile/collapsed stack 기록")
+            print("  python3 database_manager.py <명령> --memory   # 단계별 메모리 기록")
 
 if __name__ == "__main__":
-    main()
+    # setup 실패는 종료 코드 1 (오케스트레이터/cron에서 감지)
+    raise SystemExit(0 if main() is not False else 1)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""updated_at 워터마크 기반 증분 내보내기
+
+output_dir/manifest.json 에 마지막 스냅샷과 그 이후 패치 목록을 기록한다.
+클라이언트는 스냅샷을 받은 뒤 patches를 순서대로 적용하면 된다.
+- 패치: 워터마크 이후 추가(added)/변경(changed)된 활성 행과 제거(removed)된 id
+  (직전 활성 id 목록에 없던 행은 updated_at과 관계없이 added에 싣는다)
+- 패치가 snapshot_every개 쌓이면 전체 스냅샷을 새로 쓰고 이전 파일들을 정리한다
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import psycopg2.extensions
+
+from export_writers import EXPORT_COLUMNS, JsonExportWriter, dumps, row_to_area, stream_to_writers
+
+
+MANIFEST_FILE = 'manifest.json'
+STATE_FILE = '.delta_state.json'
+DEFAULT_SNAPSHOT_EVERY = 24
+# 커밋이 늦게 끝난 트랜잭션의 updated_at을 놓치지 않도록 워터마크를 겹쳐 조회한다
+DEFAULT_OVERLAP_SECONDS = 60
+
+
+def _encode_id_ranges(ids: list[int]) -> list[list[int]]:
+    ranges: list[list[int]] = []
+    for area_id in sorted(ids):
+        if ranges and area_id == ranges[-1][1] + 1:
+            ranges[-1][1] = area_id
+        else:
+            ranges.append([area_id, area_id])
+    return ranges
+
+
+def _decode_id_ranges(ranges: list[list[int]]) -> set[int]:
+    ids: set[int] = set()
+    for start, end in ranges:
+        ids.update(range(start, end + 1))
+    return ids
+
+
+class DeltaExporter:
+    def __init__(self, connection, output_dir: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+                 overlap_seconds: int = DEFAULT_OVERLAP_SECONDS):
+        self.connection = connection
+        self.output_dir = output_dir
+        self.snapshot_every = snapshot_every
+        self.overlap = timedelta(seconds=overlap_seconds)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _load_json(self, name: str) -> dict | None:
+        path = os.path.join(self.output_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as fp:
+            return json.load(fp)
+
+    def _save_json(self, name: str, data: dict):
+        path = os.path.join(self.output_dir, name)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fp:
+            json.dump(data, fp, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _current_state(cursor) -> tuple[datetime | None, list[int]]:
+        cursor.execute("SELECT MAX(updated_at) FROM smoking_areas")
+        watermark = cursor.fetchone()[0]
+        cursor.execute("SELECT id FROM smoking_areas WHERE status = 'active' ORDER BY id")
+        return watermark, [row[0] for row in cursor.fetchall()]
+
+    def _write_snapshot(self, cursor, seq: int, timestamp: str) -> str:
+        file_name = f'smoking_areas_snapshot_{seq:06d}_{timestamp}.json'
+        writer = JsonExportWriter(os.path.join(self.output_dir, file_name), metadata={
+            'export_date': datetime.now().isoformat(),
+            'seq': seq,
+        })
+        named_cursor = self.connection.cursor(name='delta_snapshot_cursor')
+        named_cursor.itersize = 5000
+        named_cursor.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM active_smoking_areas ORDER BY id")
+        total = stream_to_writers(named_cursor, [writer])
+        named_cursor.close()
+        print(f"  📸 전체 스냅샷 {total}개: {file_name}")
+        return file_name
+
+    def _write_patch(self, cursor, seq: int, timestamp: str, since: datetime, previous_ids: set[int],
+                     current_ids: list[int], sent_versions: dict, base_watermark: str) -> tuple[str | None, dict]:
+        cursor.execute(f"""
+            SELECT {', '.join(EXPORT_COLUMNS)}, updated_at
+            FROM smoking_areas
+            WHERE status = 'active' AND updated_at > %s
+            ORDER BY id
+        """, (since,))
+
+        added = []
+        changed = []
+        for row in cursor:
+            if row[0] not in previous_ids:
+                added.append(row_to_area(row))
+            # 겹침 구간에서 이미 보낸 버전은 다시 싣지 않는다
+            elif sent_versions.get(str(row[0])) != row[-1].isoformat():
+                changed.append(row_to_area(row))
+
+        # 새로 활성 집합에 들어왔지만 updated_at이 워터마크 이전인 행
+        # (다른 시계/시간대로 기록된 updated_at, updated_at을 건드리지 않은 상태 변경)도 내용을 함께 보낸다
+        unsent = set(current_ids).difference(previous_ids).difference(area['id'] for area in added)
+        if unsent:
+            cursor.execute(f"""
+                SELECT {', '.join(EXPORT_COLUMNS)}
+                FROM smoking_areas
+                WHERE status = 'active' AND id = ANY(%s)
+            """, (sorted(unsent),))
+            added.extend(row_to_area(row) for row in cursor)
+            added.sort(key=lambda area: area['id'])
+
+        removed = sorted(previous_ids.difference(current_ids))
+        counts = {'added': len(added), 'changed': len(changed), 'removed': len(removed)}
+        if not (added or changed or removed):
+            return None, counts
+
+        file_name = f'smoking_areas_patch_{seq:06d}_{timestamp}.json'
+        with open(os.path.join(self.output_dir, file_name), 'wb') as fp:
+            fp.write(dumps({
+                'seq': seq,
+                'base_watermark': base_watermark,
+                'added': added,
+                'changed': changed,
+                'removed': removed,
+            }))
+        return file_name, counts
+
+    def _recent_versions(self, cursor, watermark: datetime | None) -> dict[str, str]:
+        """다음 실행의 겹침 구간에 들어갈 (id, updated_at) 목록"""
+        if watermark is None:
+            return {}
+        cursor.execute(
+            "SELECT id, updated_at FROM smoking_areas WHERE status = 'active' AND updated_at > %s",
+            (watermark - self.overlap,),
+        )
+        return {str(area_id): updated_at.isoformat() for area_id, updated_at in cursor.fetchall()}
+
+    def run(self, force_snapshot: bool = False) -> dict:
+        manifest = self._load_json(MANIFEST_FILE)
+        state = self._load_json(STATE_FILE)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        # 스냅샷/패치와 워터마크가 같은 시점을 보도록 REPEATABLE READ 한 트랜잭션에서 읽는다
+        previous_isolation = self.connection.isolation_level
+        self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ)
+        try:
+            cursor = self.connection.cursor()
+            watermark, current_ids = self._current_state(cursor)
+            watermark_text = watermark.isoformat() if watermark else None
+
+            needs_snapshot = (
+                force_snapshot or manifest is None or state is None
+                or len(manifest.get('patches', [])) >= self.snapshot_every
+            )
+
+            superseded = []
+            if needs_snapshot:
+                if manifest:
+                    superseded = [manifest['snapshot'], *manifest.get('patches', [])]
+                seq = (manifest or {}).get('seq', 0) + 1
+                snapshot = self._write_snapshot(cursor, seq, timestamp)
+                manifest = {'seq': seq, 'snapshot': snapshot, 'snapshot_seq': seq, 'patches': []}
+                result = {'type': 'snapshot', 'file': snapshot, 'count': len(current_ids)}
+            else:
+                seq = manifest['seq'] + 1
+                # 스냅샷 당시 테이블이 비어 있었다면 워터마크가 없으므로 전체를 대상으로 한다
+                since = (datetime.fromisoformat(manifest['watermark']) - self.overlap
+                         if manifest.get('watermark') else datetime.min)
+                patch, counts = self._write_patch(
+                    cursor, seq, timestamp, since,
+                    _decode_id_ranges(state['active_ids']), current_ids, state.get('sent_versions', {}),
+                    manifest.get('watermark'),
+                )
+                if patch is None:
+                    print("  ✅ 변경 사항 없음 - 패치를 만들지 않았습니다.")
+                    self.connection.commit()
+                    return {'type': 'none', **counts}
+                manifest['seq'] = seq
+                manifest['patches'].append(patch)
+                result = {'type': 'patch', 'file': patch, **counts}
+                print(f"  🩹 패치 {patch}: 추가 {counts['added']}, 변경 {counts['changed']}, 제거 {counts['removed']}")
+
+            sent_versions = self._recent_versions(cursor, watermark)
+            cursor.close()
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self.connection.set_isolation_level(previous_isolation)
+
+        manifest['watermark'] = watermark_text
+        manifest['updated_at'] = datetime.now().isoformat()
+        self._save_json(STATE_FILE, {'active_ids': _encode_id_ranges(current_ids), 'sent_versions': sent_versions})
+        self._save_json(MANIFEST_FILE, manifest)
+
+        # 새 매니페스트를 쓴 뒤에야 이전 스냅샷/패치를 지운다
+        for file_name in superseded:
+            path = os.path.join(self.output_dir, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+        return result
+
+
+def main():
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Incremental (patch) export driven by updated_at.')
+    parser.add_argument('--output-dir', default='delta_exports')
+    parser.add_argument('--snapshot-every', type=int, default=DEFAULT_SNAPSHOT_EVERY,
+                        help='Write a compacted full snapshot after this many patches.')
+    parser.add_argument('--full', action='store_true', help='Force a full snapshot now.')
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return
+    try:
+        print(f"📤 증분 내보내기: {args.output_dir}")
+        DeltaExporter(db_manager.connection, args.output_dir, args.snapshot_every).run(force_snapshot=args.full)
+    finally:
+        db_manager.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""흡연구역 내보내기 writer 모음
+
+DB 커서에서 배치 단위로 읽은 행을 writer에 흘려보내 전체 결과를 메모리에 올리지 않는다.
+writer는 임시 경로(out.tmp.json)에 쓰고, 스트리밍이 끝까지 성공했을 때만 원래 경로로 교체된다.
+
+writer 인터페이스: output_file, count, open(), write_rows(rows), close() (정상 종료), abort() (실패 - 마무리 없이 닫기)
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from kdtree_export import KDTreeExportWriter
+from marker_clusters import ClusterExportWriter
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fiona
+except ImportError:
+    fiona = None
+
+
+EXPORT_COLUMNS = (
+    'id', 'category', 'submitted_category', 'address', 'detail', 'postal_code',
+    'longitude', 'latitude', 'report_count', 'created_at',
+)
+
+
+def row_to_area(row) -> dict:
+    """active_smoking_areas 행(EXPORT_COLUMNS 순서)을 API 응답과 같은 형태의 dict로 변환"""
+    return {
+        'id': row[0],
+        'category': row[1],
+        'submitted_category': row[2],
+        'address': row[3],
+        'detail': row[4],
+        'postal_code': row[5],
+        'coordinates': {
+            'longitude': float(row[6]),
+            'latitude': float(row[7])
+        },
+        'report_count': int(row[8]) if row[8] is not None else 0,
+        'created_at': row[9].isoformat() if row[9] else None
+    }
+
+
+def dumps(obj) -> bytes:
+    """공백 없는 UTF-8 JSON 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class JsonExportWriter:
+    """{"smoking_areas": [...], "metadata": {...}} 형태를 점진적으로 기록
+
+    총 개수는 스트리밍이 끝나야 알 수 있으므로 metadata를 마지막 키로 쓴다.
+    """
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        self.output_file = output_file
+        self.metadata = dict(metadata or {})
+        self.count = 0
+        self._fp = None
+
+    def open(self):
+        self._fp = open(self.output_file, 'wb')
+        self._fp.write(b'{"smoking_areas":[')
+
+    def write_rows(self, rows):
+        fp = self._fp
+        for row in rows:
+            if self.count:
+                fp.write(b',')
+            fp.write(dumps(row_to_area(row)))
+            self.count += 1
+
+    def close(self):
+        self.metadata.setdefault('export_date', datetime.now().isoformat())
+        self.metadata['total_count'] = self.count
+        self._fp.write(b'],"metadata":')
+        self._fp.write(dumps(self.metadata))
+        self._fp.write(b'}')
+        self._fp.close()
+
+    def abort(self):
+        if self._fp is not None:
+            self._fp.close()
+
+
+class JsonLinesExportWriter:
+    """한 줄에 흡연구역 하나씩 기록 (JSONL)"""
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        self.output_file = output_file
+        self.metadata = dict(metadata or {})
+        self.count = 0
+        self._fp = None
+
+    def open(self):
+        self._fp = open(self.output_file, 'wb')
+
+    def write_rows(self, rows):
+        fp = self._fp
+        for row in rows:
+            fp.write(dumps(row_to_area(row)))
+            fp.write(b'\n')
+            self.count += 1
+
+    def close(self):
+        self._fp.close()
+
+    def abort(self):
+        if self._fp is not None:
+            self._fp.close()
+
+
+class GeoJsonExportWriter:
+    """RFC 7946 FeatureCollection (Point, [경도, 위도])"""
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        self.output_file = output_file
+        self.count = 0
+        self._fp = None
+
+    def open(self):
+        self._fp = open(self.output_file, 'wb')
+        self._fp.write(b'{"type":"FeatureCollection","features":[')
+
+    def write_rows(self, rows):
+        fp = self._fp
+        for row in rows:
+            if self.count:
+                fp.write(b',')
+            fp.write(dumps({
+                'type': 'Feature',
+                'id': row[0],
+                'geometry': {'type': 'Point', 'coordinates': [float(row[6]), float(row[7])]},
+                'properties': {
+                    'category': row[1],
+                    'submitted_category': row[2],
+                    'address': row[3],
+                    'detail': row[4],
+                    'postal_code': row[5],
+                    'report_count': int(row[8]) if row[8] is not None else 0,
+                    'created_at': row[9].isoformat() if row[9] else None,
+                },
+            }))
+            self.count += 1
+
+    def close(self):
+        self._fp.write(b']}')
+        self._fp.close()
+
+    def abort(self):
+        if self._fp is not None:
+            self._fp.close()
+
+
+class FlatGeobufExportWriter:
+    """FlatGeobuf (공간 인덱스 포함) - fiona/GDAL 필요"""
+
+    SCHEMA = {
+        'geometry': 'Point',
+        'properties': {
+            'id': 'int',
+            'category': 'str',
+            'submitted_category': 'str',
+            'address': 'str',
+            'detail': 'str',
+            'postal_code': 'str',
+            'report_count': 'int',
+            'created_at': 'str',
+        },
+    }
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        if fiona is None:
+            raise RuntimeError('FlatGeobuf 내보내기에는 fiona가 필요합니다 (pip install fiona).')
+        self.output_file = output_file
+        self.count = 0
+        self._collection = None
+
+    def open(self):
+        self._collection = fiona.open(
+            self.output_file, 'w', driver='FlatGeobuf', schema=self.SCHEMA, crs='EPSG:4326',
+        )
+
+    def write_rows(self, rows):
+        self._collection.writerecords(
+            {
+                'geometry': {'type': 'Point', 'coordinates': (float(row[6]), float(row[7]))},
+                'properties': {
+                    'id': row[0],
+                    'category': row[1],
+                    'submitted_category': row[2],
+                    'address': row[3],
+                    'detail': row[4],
+                    'postal_code': row[5],
+                    'report_count': int(row[8]) if row[8] is not None else 0,
+                    'created_at': row[9].isoformat() if row[9] else None,
+                },
+            }
+            for row in rows
+        )
+        self.count += len(rows)
+
+    def close(self):
+        self._collection.close()
+
+    def abort(self):
+        if self._collection is not None:
+            self._collection.close()
+
+
+COMPACT_COORD_SCALE = 10_000_000  # DECIMAL(10, 7)과 같은 고정소수점
+
+
+def _write_uvarint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_svarint(buffer: bytearray, value: int):
+    # zigzag: 작은 음수도 짧은 varint가 되도록
+    _write_uvarint(buffer, (value << 1) ^ (value >> 63))
+
+
+def _read_uvarints(data: bytes):
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield value
+        value = 0
+        shift = 0
+
+
+def _epoch_seconds(value) -> int:
+    """created_at(timezone 없는 TIMESTAMP)을 UTC로 간주한 epoch 초 - 실행 호스트의 로컬 시간대와 무관하게 같은 값"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class CompactExportWriter:
+    """MessagePack 컬럼형 포맷 (배치마다 청크로 기록 - 메모리는 배치 크기 + 카테고리 사전 크기)
+
+    파일은 msgpack 값이 이어진 스트림이다:
+    - 헤더 {'version', 'coord_scale', 'metadata'}
+    - 청크 {'count', 'ids', 'coords', 'dictionaries', 'columns'} (write_rows 배치마다 하나)
+      - ids: id 차이값 uvarint
+      - coords: 1e-7도 고정소수점 (경도, 위도) 차이값 zigzag varint
+      - category/submitted_category: 사전 인덱스 배열, dictionaries에는 이 청크에서 새로 생긴 값만
+      - 나머지 속성은 컬럼별 배열, created_at은 UTC epoch 초
+      (차이값과 사전은 앞 청크에서 이어진다)
+    - 푸터 {'total_count'} - 없으면 중간에 끊긴 파일
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        if msgpack is None:
+            raise RuntimeError('compact 내보내기에는 msgpack이 필요합니다 (pip install msgpack).')
+        self.output_file = output_file
+        self.metadata = dict(metadata or {})
+        self.count = 0
+        self._fp = None
+
+    def open(self):
+        self._last_id = 0
+        self._last_lon = 0
+        self._last_lat = 0
+        self._dictionaries = {'category': {}, 'submitted_category': {}}
+        self.metadata.setdefault('export_date', datetime.now().isoformat())
+        self._fp = open(self.output_file, 'wb')
+        self._fp.write(msgpack.packb({
+            'version': self.FORMAT_VERSION,
+            'coord_scale': COMPACT_COORD_SCALE,
+            'metadata': self.metadata,
+        }, use_bin_type=True))
+
+    def _dictionary_index(self, name: str, value, additions: list) -> int:
+        dictionary = self._dictionaries[name]
+        if value not in dictionary:
+            dictionary[value] = len(dictionary)
+            additions.append(value)
+        return dictionary[value]
+
+    def write_rows(self, rows):
+        ids = bytearray()
+        coords = bytearray()
+        additions = {name: [] for name in self._dictionaries}
+        columns = {
+            'category': [], 'submitted_category': [], 'address': [], 'detail': [],
+            'postal_code': [], 'report_count': [], 'created_at': [],
+        }
+        for row in rows:
+            _write_uvarint(ids, row[0] - self._last_id)
+            self._last_id = row[0]
+
+            lon = round(float(row[6]) * COMPACT_COORD_SCALE)
+            lat = round(float(row[7]) * COMPACT_COORD_SCALE)
+            _write_svarint(coords, lon - self._last_lon)
+            _write_svarint(coords, lat - self._last_lat)
+            self._last_lon, self._last_lat = lon, lat
+
+            columns['category'].append(self._dictionary_index('category', row[1], additions['category']))
+            columns['submitted_category'].append(
+                self._dictionary_index('submitted_category', row[2], additions['submitted_category']))
+            columns['address'].append(row[3])
+            columns['detail'].append(row[4])
+            columns['postal_code'].append(row[5])
+            columns['report_count'].append(int(row[8]) if row[8] is not None else 0)
+            columns['created_at'].append(_epoch_seconds(row[9]) if row[9] else None)
+
+        self._fp.write(msgpack.packb({
+            'count': len(rows),
+            'ids': bytes(ids),
+            'coords': bytes(coords),
+            'dictionaries': additions,
+            'columns': columns,
+        }, use_bin_type=True))
+        self.count += len(rows)
+
+    def close(self):
+        self._fp.write(msgpack.packb({'total_count': self.count}, use_bin_type=True))
+        self._fp.close()
+
+    def abort(self):
+        if self._fp is not None:
+            self._fp.close()
+
+
+def read_compact_export(path: str) -> list[dict]:
+    """CompactExportWriter 결과를 dict 목록으로 복원 (클라이언트 구현용 참조 디코더)"""
+    areas = []
+    with open(path, 'rb') as fp:
+        unpacker = msgpack.Unpacker(fp, raw=False)
+        header = next(unpacker, None)
+        if not header or header.get('version') != CompactExportWriter.FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 compact 포맷: {path}")
+        scale = header['coord_scale']
+
+        current_id = lon = lat = 0
+        dictionaries = {'category': [], 'submitted_category': []}
+        footer = None
+        for chunk in unpacker:
+            if 'total_count' in chunk:
+                footer = chunk
+                break
+            for name, values in chunk['dictionaries'].items():
+                dictionaries[name].extend(values)
+
+            ids = []
+            for delta in _read_uvarints(chunk['ids']):
+                current_id += delta
+                ids.append(current_id)
+
+            coords = []
+            values = [(value >> 1) ^ -(value & 1) for value in _read_uvarints(chunk['coords'])]
+            for i in range(0, len(values), 2):
+                lon += values[i]
+                lat += values[i + 1]
+                coords.append((lon / scale, lat / scale))
+
+            columns = chunk['columns']
+            for i, area_id in enumerate(ids):
+                areas.append({
+                    'id': area_id,
+                    'category': dictionaries['category'][columns['category'][i]],
+                    'submitted_category': dictionaries['submitted_category'][columns['submitted_category'][i]],
+                    'address': columns['address'][i],
+                    'detail': columns['detail'][i],
+                    'postal_code': columns['postal_code'][i],
+                    'coordinates': {'longitude': coords[i][0], 'latitude': coords[i][1]},
+                    'report_count': columns['report_count'][i],
+                    'created_at': columns['created_at'][i],
+                })
+
+    if footer is None or footer['total_count'] != len(areas):
+        raise ValueError(f"compact 파일이 중간에 끊겼습니다: {path}")
+    return areas
+
+
+EXPORT_FORMATS = {
+    'json': ('json', JsonExportWriter),
+    'jsonl': ('jsonl', JsonLinesExportWriter),
+    'geojson': ('geojson', GeoJsonExportWriter),
+    'fgb': ('fgb', FlatGeobufExportWriter),
+    'compact': ('msgpack', CompactExportWriter),
+    'clusters': ('clusters.json', ClusterExportWriter),
+    'kdtree': ('kdtree.bin', KDTreeExportWriter),
+}
+
+
+TEMP_SUFFIX = '.tmp'
+
+
+def temp_path_for(path: str) -> str:
+    """out.fgb → out.tmp.fgb (GDAL은 확장자로 드라이버 동작을 정하므로 확장자를 유지한다)"""
+    base, extension = os.path.splitext(path)
+    return f'{base}{TEMP_SUFFIX}{extension}'
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def precompress(path: str) -> list[str]:
+    """gzip/brotli 사전 압축본(.gz, .br)을 만들고 경로 목록을 반환 (각각 임시 파일에 쓴 뒤 교체)"""
+    outputs = []
+    temp_path = f'{path}.gz{TEMP_SUFFIX}'
+    try:
+        # 헤더의 원본 파일명은 임시 경로가 아닌 압축 해제 후 이름으로 기록한다 (gzip -N 복원 시 사용)
+        with open(path, 'rb') as src, open(temp_path, 'wb') as raw, \
+                gzip.GzipFile(filename=os.path.basename(path), mode='wb', fileobj=raw, compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(temp_path, f'{path}.gz')
+    finally:
+        _remove_quietly(temp_path)
+    outputs.append(f'{path}.gz')
+
+    if brotli is not None:
+        compressor = brotli.Compressor(quality=11)
+        temp_path = f'{path}.br{TEMP_SUFFIX}'
+        try:
+            with open(path, 'rb') as src, open(temp_path, 'wb') as dst:
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(compressor.process(chunk))
+                dst.write(compressor.finish())
+            os.replace(temp_path, f'{path}.br')
+        finally:
+            _remove_quietly(temp_path)
+        outputs.append(f'{path}.br')
+    return outputs
+
+
+def stream_to_writers(cursor, writers, batch_size: int = 5000) -> int:
+    """서버 사이드 커서에서 batch_size씩 읽어 모든 writer에 전달하고 행 수를 반환
+
+    writer는 temp_path_for(output_file)에 쓰고, 조회/기록/마무리가 모두 성공해야 원래 경로로 교체한다.
+    도중에 예외가 나면 writer를 abort()하고 임시 파일을 지운 뒤 예외를 다시 던진다
+    (이전에 내보낸 파일은 그대로 남고, 일부만 담긴 파일이 완성본처럼 게시되지 않는다).
+    """
+    targets = [writer.output_file for writer in writers]
+    for writer, target in zip(writers, targets):
+        writer.output_file = temp_path_for(target)
+
+    pending = []
+    total = 0
+    try:
+        for writer in writers:
+            writer.open()
+            pending.append(writer)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for writer in writers:
+                writer.write_rows(rows)
+            total += len(rows)
+
+        while pending:
+            pending[0].close()
+            pending.pop(0)
+    except BaseException:
+        for writer in pending:
+            try:
+                writer.abort()
+            except Exception:
+                pass
+        for writer in writers:
+            _remove_quietly(writer.output_file)
+        raise
+    finally:
+        temp_paths = [writer.output_file for writer in writers]
+        for writer, target in zip(writers, targets):
+            writer.output_file = target
+
+    for temp_path, target in zip(temp_paths, targets):
+        os.replace(temp_path, target)
+    return total
@@ -77,9 +77,11 @@ def fix_postal_codes():
         cursor.close()
         connection.close()
         print("\n🎉 우편번호 형식 수정 완료!")
+        return True
 
     except Exception as e:
         print(f"❌ 우편번호 수정 실패: {e}")
+        return False
 
 if __name__ == "__main__":
-    fix_postal_codes()
\ No newline at end of file
+    raise SystemExit(0 if fix_postal_codes() else 1)
\ No newline at end of file
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""NumPy 하버사인 거리 커널
+
+- haversine_to_point: 한 지점 → 좌표 배열
+- iter_distance_tiles: 좌표 배열 × 좌표 배열을 (chunk × chunk) 타일로 나눠 메모리 상한 유지
+- pairs_within / k_nearest: 타일 위에서 반경 내 쌍, k-최근접 계산
+
+dtype=np.float32는 메모리를 절반으로, 연산 시간을 1/3가량으로 줄이는 대신 수백 km 거리에서 1m 안팎의 오차가 생긴다.
+좌표 입력은 도(degree), 거리 출력은 미터.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from spatial_cells import EARTH_RADIUS_M
+
+
+DEFAULT_CHUNK_SIZE = 2048
+
+
+def _prepare(latitudes, longitudes, dtype) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64)).astype(dtype, copy=False)
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64)).astype(dtype, copy=False)
+    return lat, lon, np.cos(lat)
+
+
+def _angles(lat1, lon1, cos1, lat2, lon2, cos2) -> np.ndarray:
+    """브로드캐스팅되는 두 좌표 묶음 사이 중심각(라디안)"""
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + cos1 * cos2 * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_to_point(latitude: float, longitude: float, latitudes, longitudes, dtype=np.float64) -> np.ndarray:
+    """한 지점에서 좌표 배열까지의 거리(m)"""
+    lat, lon, cos_lat = _prepare(latitudes, longitudes, dtype)
+    q_lat, q_lon, q_cos = _prepare([latitude], [longitude], dtype)
+    return (_angles(q_lat[0], q_lon[0], q_cos[0], lat, lon, cos_lat) * dtype(EARTH_RADIUS_M)).astype(dtype, copy=False)
+
+
+def haversine_pairwise(latitudes1, longitudes1, latitudes2, longitudes2, dtype=np.float64) -> np.ndarray:
+    """같은 길이의 두 좌표 배열에서 i번째끼리의 거리(m)"""
+    lat1, lon1, cos1 = _prepare(latitudes1, longitudes1, dtype)
+    lat2, lon2, cos2 = _prepare(latitudes2, longitudes2, dtype)
+    return (_angles(lat1, lon1, cos1, lat2, lon2, cos2) * dtype(EARTH_RADIUS_M)).astype(dtype, copy=False)
+
+
+def iter_distance_tiles(latitudes1, longitudes1, latitudes2, longitudes2,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """(행 시작, 열 시작, 거리 타일)을 생성 - 한 번에 chunk_size² 개의 거리만 메모리에 둔다"""
+    lat1, lon1, cos1 = _prepare(latitudes1, longitudes1, dtype)
+    lat2, lon2, cos2 = _prepare(latitudes2, longitudes2, dtype)
+    radius = dtype(EARTH_RADIUS_M)
+
+    for row in range(0, len(lat1), chunk_size):
+        row_slice = slice(row, row + chunk_size)
+        a_lat = lat1[row_slice, None]
+        a_lon = lon1[row_slice, None]
+        a_cos = cos1[row_slice, None]
+        for col in range(0, len(lat2), chunk_size):
+            col_slice = slice(col, col + chunk_size)
+            tile = _angles(a_lat, a_lon, a_cos, lat2[col_slice], lon2[col_slice], cos2[col_slice])
+            tile *= radius
+            yield row, col, tile
+
+
+def haversine_matrix(latitudes1, longitudes1, latitudes2, longitudes2,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64) -> np.ndarray:
+    """전체 거리 행렬 (결과 자체가 메모리에 들어가는 크기일 때만 사용)"""
+    result = np.empty((len(latitudes1), len(latitudes2)), dtype=dtype)
+    for row, col, tile in iter_distance_tiles(latitudes1, longitudes1, latitudes2, longitudes2, chunk_size, dtype):
+        result[row:row + tile.shape[0], col:col + tile.shape[1]] = tile
+    return result
+
+
+def pairs_within(latitudes1, longitudes1, latitudes2, longitudes2, radius_m: float,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """반경 내 (i, j, 거리m) 배열 - i는 첫 번째, j는 두 번째 좌표 배열의 인덱스"""
+    rows, cols, distances = [], [], []
+    for row, col, tile in iter_distance_tiles(latitudes1, longitudes1, latitudes2, longitudes2, chunk_size, dtype):
+        tile_rows, tile_cols = np.nonzero(tile <= radius_m)
+        rows.append(tile_rows + row)
+        cols.append(tile_cols + col)
+        distances.append(tile[tile_rows, tile_cols])
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=dtype)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(distances)
+
+
+def k_nearest(latitudes1, longitudes1, latitudes2, longitudes2, k: int,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64) -> tuple[np.ndarray, np.ndarray]:
+    """첫 번째 배열의 각 지점에 대해 두 번째 배열에서 가까운 k개 (인덱스, 거리m), 가까운 순"""
+    count = len(latitudes1)
+    k = min(k, len(latitudes2))
+    best_index = np.zeros((count, k), dtype=np.int64)
+    best_distance = np.full((count, k), np.inf, dtype=dtype)
+    if k == 0:
+        return best_index, best_distance
+
+    for row, col, tile in iter_distance_tiles(latitudes1, longitudes1, latitudes2, longitudes2, chunk_size, dtype):
+        rows = slice(row, row + tile.shape[0])
+        # 지금까지의 top-k와 이번 타일 후보를 합쳐 다시 top-k만 남긴다
+        merged_distance = np.concatenate((best_distance[rows], tile), axis=1)
+        tile_index = np.broadcast_to(np.arange(col, col + tile.shape[1]), tile.shape)
+        merged_index = np.concatenate((best_index[rows], tile_index), axis=1)
+        keep = np.argpartition(merged_distance, k - 1, axis=1)[:, :k]
+        best_distance[rows] = np.take_along_axis(merged_distance, keep, axis=1)
+        best_index[rows] = np.take_along_axis(merged_index, keep, axis=1)
+
+    order = np.argsort(best_distance, axis=1)
+    return np.take_along_axis(best_index, order, axis=1), np.take_along_axis(best_distance, order, axis=1)
+
+
+def _python_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _time_best(func, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the NumPy haversine kernel.')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated target array sizes.')
+    parser.add_argument('--queries', type=int, default=1000, help='Query points for many-to-many runs.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    q_lat = rng.uniform(33.0, 38.6, args.queries)
+    q_lon = rng.uniform(124.6, 131.9, args.queries)
+
+    print(f"📊 하버사인 커널 벤치마크 (chunk {args.chunk_size}, 최선 {args.repeat}회)")
+    for size in (int(value) for value in args.sizes.split(',')):
+        lat = rng.uniform(33.0, 38.6, size)
+        lon = rng.uniform(124.6, 131.9, size)
+        print(f"  대상 {size:,}개")
+
+        python_points = list(zip(lat[:min(size, 10000)].tolist(), lon[:min(size, 10000)].tolist()))
+        python_ms = _time_best(lambda: [_python_haversine(37.5, 127.0, a, b) for a, b in python_points], 1)
+        python_ms *= size / len(python_points)
+        print(f"    점→배열  python 루프 {python_ms:9.2f}ms (추정)")
+
+        for dtype in (np.float64, np.float32):
+            point_ms = _time_best(lambda: haversine_to_point(37.5, 127.0, lat, lon, dtype), args.repeat)
+            within_ms = _time_best(lambda: pairs_within(q_lat, q_lon, lat, lon, 500, args.chunk_size, dtype), args.repeat)
+            knn_ms = _time_best(lambda: k_nearest(q_lat, q_lon, lat, lon, 5, args.chunk_size, dtype), args.repeat)
+            pairs_per_sec = args.queries * size / (within_ms / 1000)
+            print(f"    {np.dtype(dtype).name:<8} 점→배열 {point_ms:8.2f}ms | "
+                  f"{args.queries}×{size} 반경 {within_ms:9.1f}ms ({pairs_per_sec / 1e6:7.1f}M 쌍/초) | k=5 {knn_ms:9.1f}ms")
+
+        exact = haversine_to_point(37.5, 127.0, lat, lon, np.float64)
+        approx = haversine_to_point(37.5, 127.0, lat, lon, np.float32)
+        print(f"    float32 최대 오차 {np.max(np.abs(exact - approx)):.2f}m")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 -- 흡연구역 데이터베이스 초기화 스크립트
 -- Docker PostgreSQL 컨테이너 시작 시 자동 실행
+-- 이후 스키마 변경은 scripts/migrations/ 에 추가하고 schema_migrations.py로 적용
 
 -- 흡연구역 테이블 생성
 CREATE TABLE IF NOT EXISTS smoking_areas (
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""클라이언트 오프라인 최근접 검색용 정적 KD-tree 바이너리
+
+kdbush 방식의 암묵적(implicit) KD-tree: 점 배열을 재귀적으로 중앙값 기준 정렬해 두면
+범위 [left, right]의 가운데 점이 분할 노드가 되므로 노드/포인터를 따로 저장할 필요가 없다.
+
+파일 구조 (리틀 엔디언)
+- 헤더 16바이트: magic 'SAKD', version u16, node_size u16, count u32, coord_scale u32
+- ids: u32 × count
+- coords: (경도, 위도) i32 고정소수점 × count
+"""
+
+import argparse
+import heapq
+import math
+import struct
+import time
+
+from spatial_cells import EARTH_RADIUS_M
+
+
+MAGIC = b'SAKD'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+COORD_SCALE = 10_000_000  # DECIMAL(10, 7)과 같은 고정소수점
+DEFAULT_NODE_SIZE = 16
+
+
+def _sort_kd(ids: list[int], coords: list[int], node_size: int, left: int, right: int, axis: int):
+    """coords[2i + axis] 기준으로 [left, right]를 중앙값 분할 (kdbush의 sortKD)"""
+    stack = [(left, right, axis)]
+    while stack:
+        left, right, axis = stack.pop()
+        if right - left <= node_size:
+            continue
+        middle = (left + right) >> 1
+        order = sorted(range(left, right + 1), key=lambda i: coords[2 * i + axis])
+        ids[left:right + 1] = [ids[i] for i in order]
+        coords[2 * left:2 * right + 2] = [value for i in order for value in (coords[2 * i], coords[2 * i + 1])]
+        stack.append((left, middle - 1, 1 - axis))
+        stack.append((middle + 1, right, 1 - axis))
+
+
+def build_kdtree_blob(points, node_size: int = DEFAULT_NODE_SIZE) -> bytes:
+    """points: (id, longitude, latitude) 목록"""
+    ids = [int(area_id) for area_id, _, _ in points]
+    coords = []
+    for _, longitude, latitude in points:
+        coords.append(round(float(longitude) * COORD_SCALE))
+        coords.append(round(float(latitude) * COORD_SCALE))
+
+    _sort_kd(ids, coords, node_size, 0, len(ids) - 1, 0)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, node_size, len(ids), COORD_SCALE)
+    return header + struct.pack(f'<{len(ids)}I', *ids) + struct.pack(f'<{len(coords)}i', *coords)
+
+
+def _cos_distance(lat_rad: float, cos_lat: float, sin_lat: float, lon_rad: float,
+                  other_lat_rad: float, other_lon_rad: float) -> float:
+    """두 점 사이 중심각의 코사인 (클수록 가깝다)"""
+    return sin_lat * math.sin(other_lat_rad) + cos_lat * math.cos(other_lat_rad) * math.cos(other_lon_rad - lon_rad)
+
+
+def _distance_m(cos_angle: float) -> float:
+    return EARTH_RADIUS_M * math.acos(max(-1.0, min(1.0, cos_angle)))
+
+
+class KDTreeReader:
+    """build_kdtree_blob 결과를 읽어 k-최근접 질의에 답하는 참조 구현 (geokdbush 방식)"""
+
+    def __init__(self, data: bytes):
+        magic, version, node_size, count, scale = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('지원하지 않는 KD-tree 파일입니다.')
+        self.node_size = node_size
+        self.count = count
+        offset = HEADER.size
+        self.ids = struct.unpack_from(f'<{count}I', data, offset)
+        raw = struct.unpack_from(f'<{2 * count}i', data, offset + 4 * count)
+        self.coords = [value / scale for value in raw]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'KDTreeReader':
+        with open(path, 'rb') as fp:
+            return cls(fp.read())
+
+    def _box_cos_distance(self, lon: float, lat_rad: float, cos_lat: float, sin_lat: float,
+                          min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> float:
+        """질의점과 경위도 박스 사이 최단 거리의 코사인 (하한)"""
+        if min_lon <= lon <= max_lon:
+            if lat_rad < math.radians(min_lat):
+                return math.cos(math.radians(min_lat) - lat_rad)
+            if lat_rad > math.radians(max_lat):
+                return math.cos(lat_rad - math.radians(max_lat))
+            return 1.0
+
+        # 가까운 쪽 경도 경계선 위에서 질의점과 가장 가까운 위도를 찾는다
+        closest_lon = min_lon if (min_lon - lon) % 360 <= (lon - max_lon) % 360 else max_lon
+        lon_delta = math.radians(closest_lon - lon)
+        cos_lon_delta = math.cos(lon_delta)
+        lon_rad = math.radians(lon)
+        closest_lon_rad = math.radians(closest_lon)
+
+        best = max(
+            _cos_distance(lat_rad, cos_lat, sin_lat, lon_rad, math.radians(min_lat), closest_lon_rad),
+            _cos_distance(lat_rad, cos_lat, sin_lat, lon_rad, math.radians(max_lat), closest_lon_rad),
+        )
+        if cos_lon_delta > 0:
+            extremum_lat = math.atan(sin_lat / (cos_lat * cos_lon_delta)) if cos_lat else math.copysign(math.pi / 2, sin_lat)
+            if math.radians(min_lat) < extremum_lat < math.radians(max_lat):
+                best = max(best, _cos_distance(lat_rad, cos_lat, sin_lat, lon_rad, extremum_lat, closest_lon_rad))
+        return best
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                max_distance_m: float | None = None) -> list[tuple[int, float]]:
+        """가까운 순서의 (id, 거리m) 목록"""
+        if not self.count:
+            return []
+
+        lat_rad = math.radians(latitude)
+        lon_rad = math.radians(longitude)
+        cos_lat = math.cos(lat_rad)
+        sin_lat = math.sin(lat_rad)
+        min_cos = math.cos(min(max_distance_m / EARTH_RADIUS_M, math.pi)) if max_distance_m is not None else -1.0
+
+        ids = self.ids
+        coords = self.coords
+        node_size = self.node_size
+        results = []
+        sequence = 0
+
+        # (-cos 거리, 순번, 종류, 값): 종류 0은 확정된 점, 1은 노드 (left, right, axis, 박스)
+        queue = [(-1.0, sequence, 1, (0, self.count - 1, 0, -180.0, -90.0, 180.0, 90.0))]
+        while queue:
+            negative_cos, _, kind, payload = heapq.heappop(queue)
+            if -negative_cos < min_cos:
+                break
+
+            if kind == 0:
+                results.append((payload, _distance_m(-negative_cos)))
+                if len(results) == k:
+                    break
+                continue
+
+            left, right, axis, min_lon, min_lat, max_lon, max_lat = payload
+            if right - left <= node_size:
+                for i in range(left, right + 1):
+                    cos_angle = _cos_distance(lat_rad, cos_lat, sin_lat, lon_rad,
+                                              math.radians(coords[2 * i + 1]), math.radians(coords[2 * i]))
+                    sequence += 1
+                    heapq.heappush(queue, (-cos_angle, sequence, 0, ids[i]))
+                continue
+
+            middle = (left + right) >> 1
+            mid_lon = coords[2 * middle]
+            mid_lat = coords[2 * middle + 1]
+            cos_angle = _cos_distance(lat_rad, cos_lat, sin_lat, lon_rad, math.radians(mid_lat), math.radians(mid_lon))
+            sequence += 1
+            heapq.heappush(queue, (-cos_angle, sequence, 0, ids[middle]))
+
+            if axis == 0:
+                children = (
+                    (left, middle - 1, 1, min_lon, min_lat, mid_lon, max_lat),
+                    (middle + 1, right, 1, mid_lon, min_lat, max_lon, max_lat),
+                )
+            else:
+                children = (
+                    (left, middle - 1, 0, min_lon, min_lat, max_lon, mid_lat),
+                    (middle + 1, right, 0, min_lon, mid_lat, max_lon, max_lat),
+                )
+            for child in children:
+                if child[0] > child[1]:
+                    continue
+                bound = self._box_cos_distance(longitude, lat_rad, cos_lat, sin_lat, *child[3:])
+                sequence += 1
+                heapq.heappush(queue, (-bound, sequence, 1, child))
+
+        return results
+
+
+class KDTreeExportWriter:
+    """내보내기 스캔에서 좌표만 모아 종료 시 KD-tree 바이너리를 기록"""
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        self.output_file = output_file
+        self.count = 0
+
+    def open(self):
+        self._points = []
+
+    def write_rows(self, rows):
+        self._points.extend((row[0], float(row[6]), float(row[7])) for row in rows)
+        self.count += len(rows)
+
+    def close(self):
+        with open(self.output_file, 'wb') as fp:
+            fp.write(build_kdtree_blob(self._points))
+        self._points = []
+
+    def abort(self):
+        self._points = []
+
+
+def main():
+    from marker_clusters import load_export_points
+
+    parser = argparse.ArgumentParser(description='Build or query a static KD-tree of smoking areas.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build a KD-tree blob from a JSON export.')
+    build_parser.add_argument('export_file')
+    build_parser.add_argument('-o', '--output', default='smoking_areas.kdtree.bin')
+    build_parser.add_argument('--node-size', type=int, default=DEFAULT_NODE_SIZE)
+
+    query_parser = subparsers.add_parser('query', help='k-nearest query against a KD-tree blob.')
+    query_parser.add_argument('kdtree_file')
+    query_parser.add_argument('--lat', type=float, required=True)
+    query_parser.add_argument('--lng', type=float, required=True)
+    query_parser.add_argument('-k', type=int, default=5)
+    query_parser.add_argument('--max-distance', type=float, default=None, help='Meters.')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        points = load_export_points(args.export_file)
+        blob = build_kdtree_blob(points, args.node_size)
+        with open(args.output, 'wb') as fp:
+            fp.write(blob)
+        print(f"✅ {len(points)}개 지점 KD-tree ({len(blob):,} bytes): {args.output}")
+        return
+
+    reader = KDTreeReader.from_file(args.kdtree_file)
+    start = time.perf_counter()
+    results = reader.nearest(args.lat, args.lng, args.k, args.max_distance)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for area_id, distance in results:
+        print(f"  {area_id}: {distance:.1f}m")
+    print(f"⏱️ {len(results)}개, {elapsed_ms:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
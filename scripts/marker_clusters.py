@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""줌 레벨별 마커 클러스터 사전 계산 (supercluster 방식의 계층형 greedy 클러스터링)
+
+최대 줌부터 한 단계씩 내려가며, 이전 단계 결과를 격자 인덱스에 넣고
+반경(픽셀) 안의 이웃을 가중 중심으로 합친다. 결과는 줌별 타일 버킷에 보관해
+bbox + 줌 질의가 화면 안의 타일만 훑도록 한다.
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import defaultdict
+
+from spatial_cells import MAX_MERCATOR_LAT
+
+
+DEFAULT_RADIUS_PX = 60
+DEFAULT_EXTENT_PX = 512
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 16
+
+
+def _project(longitude: float, latitude: float) -> tuple[float, float]:
+    lat = max(min(latitude, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    x = longitude / 360.0 + 0.5
+    y = 0.5 - math.asinh(math.tan(math.radians(lat))) / (2 * math.pi)
+    return x, min(max(y, 0.0), 1.0)
+
+
+def _unproject(x: float, y: float) -> tuple[float, float]:
+    longitude = (x - 0.5) * 360.0
+    latitude = math.degrees(math.atan(math.sinh((0.5 - y) * 2 * math.pi)))
+    return longitude, latitude
+
+
+class ClusterIndex:
+    def __init__(self, radius_px: int = DEFAULT_RADIUS_PX, extent_px: int = DEFAULT_EXTENT_PX,
+                 min_zoom: int = DEFAULT_MIN_ZOOM, max_zoom: int = DEFAULT_MAX_ZOOM):
+        self.radius_px = radius_px
+        self.extent_px = extent_px
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        # zoom -> [(x, y, count, id 또는 None)]
+        self.levels: dict[int, list[tuple]] = {}
+        self._buckets: dict[int, dict[tuple[int, int], list[tuple]]] = {}
+
+    def build(self, points):
+        """points: (id, longitude, latitude) 목록"""
+        # [x, y, count, id, 처리된 줌]
+        current = [[*_project(lon, lat), 1, area_id, math.inf] for area_id, lon, lat in points]
+        self.levels[self.max_zoom + 1] = [tuple(item[:4]) for item in current]
+
+        for zoom in range(self.max_zoom, self.min_zoom - 1, -1):
+            current = self._cluster(current, zoom)
+            self.levels[zoom] = [tuple(item[:4]) for item in current]
+
+        self._index_levels()
+        return self
+
+    def _cluster(self, items: list[list], zoom: int) -> list[list]:
+        radius = self.radius_px / (self.extent_px * (1 << zoom))
+        grid = defaultdict(list)
+        for item in items:
+            grid[(int(item[0] / radius), int(item[1] / radius))].append(item)
+
+        clusters = []
+        for item in items:
+            if item[4] <= zoom:
+                continue
+            item[4] = zoom
+
+            cx, cy = int(item[0] / radius), int(item[1] / radius)
+            weight_x = item[0] * item[2]
+            weight_y = item[1] * item[2]
+            count = item[2]
+            radius_sq = radius * radius
+
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for neighbor in grid.get((gx, gy), ()):
+                        if neighbor[4] <= zoom:
+                            continue
+                        dx = neighbor[0] - item[0]
+                        dy = neighbor[1] - item[1]
+                        if dx * dx + dy * dy > radius_sq:
+                            continue
+                        neighbor[4] = zoom
+                        weight_x += neighbor[0] * neighbor[2]
+                        weight_y += neighbor[1] * neighbor[2]
+                        count += neighbor[2]
+
+            if count == item[2]:
+                clusters.append([item[0], item[1], item[2], item[3], math.inf])
+            else:
+                clusters.append([weight_x / count, weight_y / count, count, None, math.inf])
+        return clusters
+
+    def _index_levels(self):
+        self._buckets = {}
+        for zoom, items in self.levels.items():
+            scale = 1 << zoom
+            buckets = defaultdict(list)
+            for item in items:
+                buckets[(min(int(item[0] * scale), scale - 1), min(int(item[1] * scale), scale - 1))].append(item)
+            self._buckets[zoom] = dict(buckets)
+
+    def get_clusters(self, west: float, south: float, east: float, north: float, zoom: int) -> list[dict]:
+        """bbox(경위도)와 줌에 해당하는 클러스터/단일 지점 목록"""
+        zoom = max(self.min_zoom, min(int(zoom), self.max_zoom + 1))
+        x_min, y_min = _project(west, north)
+        x_max, y_max = _project(east, south)
+
+        scale = 1 << zoom
+        buckets = self._buckets[zoom]
+        results = []
+        for tx in range(int(x_min * scale), min(int(x_max * scale), scale - 1) + 1):
+            for ty in range(int(y_min * scale), min(int(y_max * scale), scale - 1) + 1):
+                for x, y, count, area_id in buckets.get((tx, ty), ()):
+                    if x_min <= x <= x_max and y_min <= y <= y_max:
+                        longitude, latitude = _unproject(x, y)
+                        results.append({
+                            'longitude': longitude,
+                            'latitude': latitude,
+                            'point_count': count,
+                            'id': area_id,
+                        })
+        return results
+
+    def to_dict(self) -> dict:
+        zooms = {}
+        for zoom, items in sorted(self.levels.items()):
+            zooms[str(zoom)] = [
+                [round(lon, 7), round(lat, 7), count, area_id]
+                for lon, lat, count, area_id in ((*_unproject(x, y), count, area_id) for x, y, count, area_id in items)
+            ]
+        return {
+            'radius_px': self.radius_px,
+            'extent_px': self.extent_px,
+            'min_zoom': self.min_zoom,
+            'max_zoom': self.max_zoom,
+            'zooms': zooms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ClusterIndex':
+        index = cls(data['radius_px'], data['extent_px'], data['min_zoom'], data['max_zoom'])
+        index.levels = {
+            int(zoom): [(*_project(lon, lat), count, area_id) for lon, lat, count, area_id in items]
+            for zoom, items in data['zooms'].items()
+        }
+        index._index_levels()
+        return index
+
+
+class ClusterExportWriter:
+    """내보내기 스캔에서 좌표만 모아 종료 시 클러스터 JSON을 기록"""
+
+    def __init__(self, output_file: str, metadata: dict | None = None):
+        self.output_file = output_file
+        self.metadata = dict(metadata or {})
+        self.count = 0
+
+    def open(self):
+        self._points = []
+
+    def write_rows(self, rows):
+        self._points.extend((row[0], float(row[6]), float(row[7])) for row in rows)
+        self.count += len(rows)
+
+    def close(self):
+        index = ClusterIndex().build(self._points)
+        data = index.to_dict()
+        data['metadata'] = self.metadata
+        with open(self.output_file, 'w', encoding='utf-8') as fp:
+            json.dump(data, fp, ensure_ascii=False, separators=(',', ':'))
+        self._points = []
+
+    def abort(self):
+        self._points = []
+
+
+def load_export_points(export_file: str) -> list[tuple]:
+    with open(export_file, 'r', encoding='utf-8') as fp:
+        data = json.load(fp)
+    return [
+        (area['id'], area['coordinates']['longitude'], area['coordinates']['latitude'])
+        for area in data['smoking_areas']
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute per-zoom marker clusters.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build clusters from a JSON export.')
+    build_parser.add_argument('export_file')
+    build_parser.add_argument('-o', '--output', default='smoking_areas_clusters.json')
+    build_parser.add_argument('--radius', type=int, default=DEFAULT_RADIUS_PX)
+    build_parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM)
+
+    query_parser = subparsers.add_parser('query', help='Query clusters for a bbox and zoom.')
+    query_parser.add_argument('cluster_file')
+    query_parser.add_argument('--bbox', required=True, help='west,south,east,north')
+    query_parser.add_argument('--zoom', type=int, required=True)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        points = load_export_points(args.export_file)
+        start = time.perf_counter()
+        index = ClusterIndex(radius_px=args.radius, max_zoom=args.max_zoom).build(points)
+        elapsed = time.perf_counter() - start
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            json.dump(index.to_dict(), fp, ensure_ascii=False, separators=(',', ':'))
+        print(f"✅ {len(points)}개 지점 클러스터링 ({elapsed:.2f}초): {args.output}")
+        for zoom in range(index.min_zoom, index.max_zoom + 1, 4):
+            print(f"  z{zoom}: {len(index.levels[zoom])}개")
+        return
+
+    with open(args.cluster_file, 'r', encoding='utf-8') as fp:
+        index = ClusterIndex.from_dict(json.load(fp))
+    west, south, east, north = (float(value) for value in args.bbox.split(','))
+    start = time.perf_counter()
+    clusters = index.get_clusters(west, south, east, north, args.zoom)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps(clusters, ensure_ascii=False, indent=2))
+    print(f"⏱️ {len(clusters)}개, {elapsed_ms:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+-- 흡연구역 기본 테이블
+CREATE TABLE IF NOT EXISTS smoking_areas (
+    id SERIAL PRIMARY KEY,
+    category VARCHAR(20) NOT NULL,
+    submitted_category VARCHAR(20),
+    address TEXT NOT NULL,
+    detail TEXT,
+    postal_code VARCHAR(10),
+    longitude DECIMAL(10, 7) NOT NULL,
+    latitude DECIMAL(10, 7) NOT NULL,
+    status VARCHAR(10) DEFAULT 'active',
+    report_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
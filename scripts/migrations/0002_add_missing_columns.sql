@@ -0,0 +1,8 @@
+-- 초기 버전 테이블에 없던 컬럼 보정 (reseed_from_raw._ensure_table_shape 대체)
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS submitted_category VARCHAR(20);
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS detail TEXT;
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS postal_code VARCHAR(10);
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS status VARCHAR(10) DEFAULT 'active';
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS report_count INTEGER DEFAULT 0;
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
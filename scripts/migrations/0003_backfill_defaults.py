@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""기존 행의 status/report_count 기본값 채우기 (최초 1회)
+
+마이그레이터가 모든 마이그레이션을 한 트랜잭션에서 실행하므로 배치로 나눠도 행 잠금은 커밋까지 유지되고
+배치마다 NULL 행을 다시 찾느라 테이블을 반복해서 읽게 된다 - 컬럼마다 UPDATE 한 번으로 채운다.
+"""
+
+
+def _backfill(cursor, column, default_sql):
+    cursor.execute(f"UPDATE smoking_areas SET {column} = {default_sql} WHERE {column} IS NULL")
+    return cursor.rowcount
+
+
+def upgrade(cursor):
+    status_count = _backfill(cursor, 'status', "'active'")
+    report_count = _backfill(cursor, 'report_count', '0')
+    print(f"    ↳ status {status_count}개, report_count {report_count}개 기본값 채움")
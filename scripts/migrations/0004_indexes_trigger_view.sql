@@ -0,0 +1,34 @@
+-- 인덱스
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_location ON smoking_areas(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_category ON smoking_areas(category);
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_status ON smoking_areas(status);
+
+-- 업데이트 트리거 함수
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_smoking_areas_updated_at ON smoking_areas;
+CREATE TRIGGER update_smoking_areas_updated_at
+    BEFORE UPDATE ON smoking_areas
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- 활성 흡연구역 뷰
+CREATE OR REPLACE VIEW active_smoking_areas AS
+SELECT
+    id,
+    category,
+    submitted_category,
+    address,
+    detail,
+    postal_code,
+    longitude,
+    latitude,
+    report_count,
+    created_at
+FROM smoking_areas
+WHERE status = 'active';
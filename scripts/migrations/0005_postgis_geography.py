@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""PostGIS geography 컬럼 + GiST 인덱스 + 반경/KNN 검색 함수
+
+PostGIS 확장을 설치할 수 없는 환경에서는 건너뛴다 (DatabaseManager.find_nearby/find_nearest는 셀 키 검색으로 대신한다).
+건너뛰면 schema_version에 incomplete로 남고, 나중에 확장을 쓸 수 있게 되면 needs_reapply()가 True가 되어
+다음 migrate()에서 자동으로 다시 적용된다
+(`python3 schema_migrations.py --reapply 5`로 바로 적용해도 된다).
+"""
+
+from nearby_search import postgis_search_installed
+
+SETUP_SQL = """
+ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS geog geography(Point, 4326);
+
+-- 경도/위도 변경 시 geography 컬럼 동기화
+CREATE OR REPLACE FUNCTION sync_smoking_area_geog()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.geog = ST_SetSRID(ST_MakePoint(NEW.longitude::float8, NEW.latitude::float8), 4326)::geography;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_smoking_areas_geog ON smoking_areas;
+CREATE TRIGGER sync_smoking_areas_geog
+    BEFORE INSERT OR UPDATE OF longitude, latitude ON smoking_areas
+    FOR EACH ROW EXECUTE FUNCTION sync_smoking_area_geog();
+"""
+
+INDEX_AND_FUNCTIONS_SQL = """
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_geog ON smoking_areas USING GIST (geog);
+
+-- 반경 검색: ST_DWithin 인덱스 스캔 후 거리순 정렬
+CREATE OR REPLACE FUNCTION smoking_areas_within(
+    p_lat double precision,
+    p_lng double precision,
+    p_radius_m double precision,
+    p_limit integer DEFAULT 50
+)
+RETURNS TABLE (
+    id integer,
+    category varchar,
+    submitted_category varchar,
+    address text,
+    detail text,
+    postal_code varchar,
+    longitude numeric,
+    latitude numeric,
+    report_count integer,
+    created_at timestamp,
+    distance_meters double precision
+) AS $$
+    SELECT
+        s.id, s.category, s.submitted_category, s.address, s.detail, s.postal_code,
+        s.longitude, s.latitude, s.report_count, s.created_at,
+        ST_Distance(s.geog, q.pt) AS distance_meters
+    FROM smoking_areas s,
+         (SELECT ST_SetSRID(ST_MakePoint(p_lng, p_lat), 4326)::geography AS pt) q
+    WHERE s.status = 'active'
+      AND ST_DWithin(s.geog, q.pt, p_radius_m)
+    ORDER BY s.geog <-> q.pt
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- 최근접 k개: GiST KNN (<->) 정렬
+CREATE OR REPLACE FUNCTION smoking_areas_nearest(
+    p_lat double precision,
+    p_lng double precision,
+    p_k integer DEFAULT 10
+)
+RETURNS TABLE (
+    id integer,
+    category varchar,
+    submitted_category varchar,
+    address text,
+    detail text,
+    postal_code varchar,
+    longitude numeric,
+    latitude numeric,
+    report_count integer,
+    created_at timestamp,
+    distance_meters double precision
+) AS $$
+    SELECT
+        s.id, s.category, s.submitted_category, s.address, s.detail, s.postal_code,
+        s.longitude, s.latitude, s.report_count, s.created_at,
+        ST_Distance(s.geog, q.pt) AS distance_meters
+    FROM smoking_areas s,
+         (SELECT ST_SetSRID(ST_MakePoint(p_lng, p_lat), 4326)::geography AS pt) q
+    WHERE s.status = 'active'
+    ORDER BY s.geog <-> q.pt
+    LIMIT p_k;
+$$ LANGUAGE sql STABLE;
+"""
+
+
+def _postgis_usable(cursor) -> bool:
+    """PostGIS가 이미 설치되어 있거나 이 역할로 CREATE EXTENSION이 성공하는지 (시도 후 되돌림)
+
+    관리형 Postgres는 pg_available_extensions에 postgis를 보여 주면서도 생성 권한을 주지 않는 경우가 많다.
+    """
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'postgis';")
+    if cursor.fetchone() is not None:
+        return True
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis';")
+    if cursor.fetchone() is None:
+        return False
+
+    cursor.execute('SAVEPOINT probe_postgis;')
+    try:
+        cursor.execute('CREATE EXTENSION postgis;')
+        return True
+    except Exception:
+        return False
+    finally:
+        cursor.execute('ROLLBACK TO SAVEPOINT probe_postgis;')
+        cursor.execute('RELEASE SAVEPOINT probe_postgis;')
+
+
+def needs_reapply(cursor) -> bool:
+    """PostGIS가 없어 건너뛰었는데 지금은 확장을 쓸 수 있으면 True"""
+    return not postgis_search_installed(cursor) and _postgis_usable(cursor)
+
+
+def _enable_postgis(cursor) -> bool:
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis';")
+    if cursor.fetchone() is None:
+        return False
+
+    cursor.execute('SAVEPOINT enable_postgis;')
+    try:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS postgis;')
+    except Exception as e:
+        cursor.execute('ROLLBACK TO SAVEPOINT enable_postgis;')
+        print(f"    ⚠️ PostGIS 확장 생성 실패: {e}")
+        return False
+    cursor.execute('RELEASE SAVEPOINT enable_postgis;')
+    return True
+
+
+def _backfill_geog(cursor) -> int:
+    """geog가 빈 행을 UPDATE 한 번으로 채운다 (마이그레이션 트랜잭션 안이라 배치로 나눠도 잠금이 줄지 않는다)"""
+    cursor.execute(
+        """
+        UPDATE smoking_areas
+        SET geog = ST_SetSRID(ST_MakePoint(longitude::float8, latitude::float8), 4326)::geography
+        WHERE geog IS NULL
+        """
+    )
+    return cursor.rowcount
+
+
+def upgrade(cursor) -> bool:
+    """모두 적용했으면 True, PostGIS가 없어 건너뛰었으면 False (schema_version에 incomplete로 남는다)"""
+    if not _enable_postgis(cursor):
+        print("    ⚠️ PostGIS를 사용할 수 없어 geography 컬럼 설정을 건너뜁니다 (확장을 쓸 수 있게 되면 다음 마이그레이션 때 자동 적용).")
+        return False
+
+    cursor.execute(SETUP_SQL)
+    filled = _backfill_geog(cursor)
+    # 인덱스는 백필 이후에 만들어 행 단위 인덱스 갱신 비용을 피한다
+    cursor.execute(INDEX_AND_FUNCTIONS_SQL)
+    print(f"    ↳ geog 컬럼 {filled}개 행 채움, GiST 인덱스 생성")
+    return True
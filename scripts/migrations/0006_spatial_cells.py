@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""PostGIS 없이 쓰는 계층형 공간 셀 키 컬럼 (spatial_cells.CELL_COLUMNS)"""
+
+from spatial_cells import CELL_COLUMNS, backfill_missing_cells
+
+
+def upgrade(cursor):
+    for column in CELL_COLUMNS:
+        cursor.execute(f'ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS {column} BIGINT;')
+
+    filled = backfill_missing_cells(cursor)
+
+    for column in CELL_COLUMNS:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_smoking_areas_{column} ON smoking_areas({column});')
+    print(f"    ↳ 셀 키 {filled}개 행 채움, 인덱스 {len(CELL_COLUMNS)}개 생성")
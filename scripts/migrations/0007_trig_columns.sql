@@ -0,0 +1,8 @@
+-- 거리 계산용 삼각함수 값 미리 계산 (stored generated columns)
+-- 후보 행마다 sin/cos/radians를 다시 계산하지 않고 곱셈-덧셈만으로 구면 거리를 비교한다
+ALTER TABLE smoking_areas
+    ADD COLUMN IF NOT EXISTS lat_sin double precision GENERATED ALWAYS AS (sin(radians(latitude::float8))) STORED,
+    ADD COLUMN IF NOT EXISTS lat_cos double precision GENERATED ALWAYS AS (cos(radians(latitude::float8))) STORED,
+    ADD COLUMN IF NOT EXISTS lon_rad double precision GENERATED ALWAYS AS (radians(longitude::float8)) STORED,
+    ADD COLUMN IF NOT EXISTS lon_sin double precision GENERATED ALWAYS AS (sin(radians(longitude::float8))) STORED,
+    ADD COLUMN IF NOT EXISTS lon_cos double precision GENERATED ALWAYS AS (cos(radians(longitude::float8))) STORED;
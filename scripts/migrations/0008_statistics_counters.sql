@@ -0,0 +1,133 @@
+-- 주소 → 시도 + 시군구 파싱 (예: '서울특별시 중구 을지로 30' → '서울특별시 중구')
+CREATE OR REPLACE FUNCTION parse_district(p_address text)
+RETURNS text AS $$
+DECLARE
+    m text[];
+BEGIN
+    m := regexp_match(p_address, '^\s*(\S+(?:특별시|광역시|특별자치시|특별자치도|도))\s+(\S+(?:시|군|구))(?:\s|$)');
+    IF m IS NOT NULL THEN
+        RETURN m[1] || ' ' || m[2];
+    END IF;
+
+    -- 시군구가 없는 특별자치시 (세종)
+    m := regexp_match(p_address, '^\s*(\S+특별자치시)');
+    IF m IS NOT NULL THEN
+        RETURN m[1];
+    END IF;
+
+    RETURN '기타';
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+ALTER TABLE smoking_areas
+    ADD COLUMN IF NOT EXISTS district TEXT GENERATED ALWAYS AS (parse_district(address)) STORED;
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_district ON smoking_areas(district);
+
+-- 활성 흡연구역 통계 카운터 (dimension: total / category / district)
+CREATE TABLE IF NOT EXISTS smoking_area_stats (
+    dimension VARCHAR(20) NOT NULL,
+    key TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key)
+);
+
+-- 전체 재계산 (초기화 및 보정용)
+CREATE OR REPLACE FUNCTION refresh_smoking_area_stats()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM smoking_area_stats;
+    INSERT INTO smoking_area_stats (dimension, key, count)
+    SELECT 'total', 'all', COUNT(*) FROM smoking_areas WHERE status = 'active'
+    UNION ALL
+    SELECT 'category', category, COUNT(*) FROM smoking_areas WHERE status = 'active' GROUP BY category
+    UNION ALL
+    SELECT 'district', district, COUNT(*) FROM smoking_areas WHERE status = 'active' GROUP BY district;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 문장 단위 트리거: 변경된 행 집합(transition table)만 집계해 카운터에 더한다
+CREATE OR REPLACE FUNCTION smoking_area_stats_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH changed AS (
+        SELECT category, district, 1 AS delta FROM new_rows WHERE status = 'active'
+    ), deltas AS (
+        SELECT 'total' AS dimension, 'all' AS key, SUM(delta) AS delta FROM changed
+        UNION ALL SELECT 'category', category, SUM(delta) FROM changed GROUP BY category
+        UNION ALL SELECT 'district', district, SUM(delta) FROM changed GROUP BY district
+    )
+    INSERT INTO smoking_area_stats (dimension, key, count)
+    SELECT dimension, key, delta FROM deltas WHERE delta <> 0
+    ON CONFLICT (dimension, key) DO UPDATE SET count = smoking_area_stats.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION smoking_area_stats_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH changed AS (
+        SELECT category, district, 1 AS delta FROM new_rows WHERE status = 'active'
+        UNION ALL
+        SELECT category, district, -1 FROM old_rows WHERE status = 'active'
+    ), deltas AS (
+        SELECT 'total' AS dimension, 'all' AS key, SUM(delta) AS delta FROM changed
+        UNION ALL SELECT 'category', category, SUM(delta) FROM changed GROUP BY category
+        UNION ALL SELECT 'district', district, SUM(delta) FROM changed GROUP BY district
+    )
+    INSERT INTO smoking_area_stats (dimension, key, count)
+    SELECT dimension, key, delta FROM deltas WHERE delta <> 0
+    ON CONFLICT (dimension, key) DO UPDATE SET count = smoking_area_stats.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION smoking_area_stats_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH changed AS (
+        SELECT category, district, -1 AS delta FROM old_rows WHERE status = 'active'
+    ), deltas AS (
+        SELECT 'total' AS dimension, 'all' AS key, SUM(delta) AS delta FROM changed
+        UNION ALL SELECT 'category', category, SUM(delta) FROM changed GROUP BY category
+        UNION ALL SELECT 'district', district, SUM(delta) FROM changed GROUP BY district
+    )
+    INSERT INTO smoking_area_stats (dimension, key, count)
+    SELECT dimension, key, delta FROM deltas WHERE delta <> 0
+    ON CONFLICT (dimension, key) DO UPDATE SET count = smoking_area_stats.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION smoking_area_stats_on_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM smoking_area_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS smoking_area_stats_insert ON smoking_areas;
+CREATE TRIGGER smoking_area_stats_insert
+    AFTER INSERT ON smoking_areas
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION smoking_area_stats_on_insert();
+
+DROP TRIGGER IF EXISTS smoking_area_stats_update ON smoking_areas;
+CREATE TRIGGER smoking_area_stats_update
+    AFTER UPDATE ON smoking_areas
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION smoking_area_stats_on_update();
+
+DROP TRIGGER IF EXISTS smoking_area_stats_delete ON smoking_areas;
+CREATE TRIGGER smoking_area_stats_delete
+    AFTER DELETE ON smoking_areas
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION smoking_area_stats_on_delete();
+
+DROP TRIGGER IF EXISTS smoking_area_stats_truncate ON smoking_areas;
+CREATE TRIGGER smoking_area_stats_truncate
+    AFTER TRUNCATE ON smoking_areas
+    FOR EACH STATEMENT EXECUTE FUNCTION smoking_area_stats_on_truncate();
+
+SELECT refresh_smoking_area_stats();
@@ -0,0 +1,9 @@
+-- 행정구역 경계 폴리곤으로 배정한 지역 코드 (region_assignment.py)
+ALTER TABLE smoking_areas
+    ADD COLUMN IF NOT EXISTS sido_code VARCHAR(10),
+    ADD COLUMN IF NOT EXISTS sigungu_code VARCHAR(10),
+    ADD COLUMN IF NOT EXISTS emd_code VARCHAR(10);
+
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_sido_code ON smoking_areas(sido_code);
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_sigungu_code ON smoking_areas(sigungu_code);
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_emd_code ON smoking_areas(emd_code);
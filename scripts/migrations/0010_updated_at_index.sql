@@ -0,0 +1,2 @@
+-- 증분 내보내기(delta_export.py)의 updated_at 워터마크 조회용
+CREATE INDEX IF NOT EXISTS idx_smoking_areas_updated_at ON smoking_areas(updated_at);
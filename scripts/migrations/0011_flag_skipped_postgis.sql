@@ -0,0 +1,4 @@
+-- incomplete 컬럼이 생기기 전에 PostGIS 없이 0005를 건너뛴 DB 표시 (확장을 쓸 수 있게 되면 migrate()가 다시 적용한다)
+UPDATE schema_version SET incomplete = TRUE
+WHERE version = 5
+  AND to_regprocedure('smoking_areas_nearest(double precision, double precision, integer)') IS NULL;
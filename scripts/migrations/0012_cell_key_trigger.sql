@@ -0,0 +1,44 @@
+-- 셀 키(cell_z10/z13/z16)를 DB에서 계산해 API 등 어떤 경로로 들어온 행에도 채운다
+-- spatial_cells.cell_key()와 같은 계산: Web Mercator 타일 (x, y)의 비트를 교차 배치한 정수
+CREATE OR REPLACE FUNCTION smoking_area_cell_key(p_latitude double precision, p_longitude double precision, p_zoom integer)
+RETURNS bigint AS $$
+DECLARE
+    n bigint := 1::bigint << p_zoom;
+    lat double precision := greatest(least(p_latitude, 85.05112878), -85.05112878);
+    x bigint;
+    y bigint;
+    key bigint := 0;
+BEGIN
+    x := trunc((p_longitude + 180.0) / 360.0 * n);
+    y := trunc((1.0 - asinh(tan(radians(lat))) / pi()) / 2.0 * n);
+    x := least(greatest(x, 0), n - 1);
+    y := least(greatest(y, 0), n - 1);
+
+    FOR bit IN 0 .. p_zoom - 1 LOOP
+        key := key | (((x >> bit) & 1) << (2 * bit)) | (((y >> bit) & 1) << (2 * bit + 1));
+    END LOOP;
+    RETURN key;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION set_smoking_area_cells()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.cell_z10 := smoking_area_cell_key(NEW.latitude::float8, NEW.longitude::float8, 10);
+    NEW.cell_z13 := smoking_area_cell_key(NEW.latitude::float8, NEW.longitude::float8, 13);
+    NEW.cell_z16 := smoking_area_cell_key(NEW.latitude::float8, NEW.longitude::float8, 16);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS smoking_area_cells ON smoking_areas;
+CREATE TRIGGER smoking_area_cells
+    BEFORE INSERT OR UPDATE OF latitude, longitude ON smoking_areas
+    FOR EACH ROW EXECUTE FUNCTION set_smoking_area_cells();
+
+-- 트리거 설치 전에 셀 키 없이 들어온 행
+UPDATE smoking_areas
+SET cell_z10 = smoking_area_cell_key(latitude::float8, longitude::float8, 10),
+    cell_z13 = smoking_area_cell_key(latitude::float8, longitude::float8, 13),
+    cell_z16 = smoking_area_cell_key(latitude::float8, longitude::float8, 16)
+WHERE cell_z16 IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL;
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""주변 흡연구역 검색 쿼리 빌더
+
+- legacy: API getNearbyAreas와 같은 acos 하버사인 (행마다 삼각함수 재계산)
+- fast: 위경도 바운딩 박스(인덱스) + 미리 계산한 lat_sin/lat_cos/lon_sin/lon_cos 곱셈-덧셈 비교
+"""
+
+import math
+
+from spatial_cells import EARTH_RADIUS_M, cell_prefilter_sql
+
+
+NEARBY_COLUMNS = """
+    id, category, submitted_category, address, detail, postal_code,
+    longitude, latitude, report_count, created_at
+"""
+
+# 마이그레이션 0005가 만드는 PostGIS 검색 함수 (to_regprocedure 형식)
+POSTGIS_SEARCH_FUNCTIONS = (
+    'smoking_areas_within(double precision, double precision, double precision, integer)',
+    'smoking_areas_nearest(double precision, double precision, integer)',
+)
+
+
+def postgis_search_installed(cursor) -> bool:
+    """PostGIS 검색 함수가 모두 있는지 (PostGIS 없이 마이그레이션했다면 False)"""
+    cursor.execute(
+        'SELECT ' + ' AND '.join(['to_regprocedure(%s) IS NOT NULL'] * len(POSTGIS_SEARCH_FUNCTIONS)),
+        POSTGIS_SEARCH_FUNCTIONS,
+    )
+    return cursor.fetchone()[0]
+
+
+def bounding_box(latitude: float, longitude: float, radius_meters: float) -> tuple[float, float, float, float]:
+    """반경을 포함하는 (남, 북, 서, 동) 경계"""
+    dlat = math.degrees(radius_meters / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlng = math.degrees(radius_meters / (EARTH_RADIUS_M * cos_lat))
+    return latitude - dlat, latitude + dlat, longitude - dlng, longitude + dlng
+
+
+def build_legacy_nearby_query(latitude: float, longitude: float, radius_meters: float, limit: int = 50) -> tuple[str, tuple]:
+    sql = f"""
+        SELECT
+            {NEARBY_COLUMNS},
+            (
+                6371000 * acos(
+                    cos(radians(%s)) * cos(radians(latitude)) *
+                    cos(radians(longitude) - radians(%s)) +
+                    sin(radians(%s)) * sin(radians(latitude))
+                )
+            ) AS distance_meters
+        FROM smoking_areas
+        WHERE status = 'active'
+          AND (
+            6371000 * acos(
+                cos(radians(%s)) * cos(radians(latitude)) *
+                cos(radians(longitude) - radians(%s)) +
+                sin(radians(%s)) * sin(radians(latitude))
+            )
+          ) <= %s
+        ORDER BY distance_meters ASC
+        LIMIT %s
+    """
+    params = (latitude, longitude, latitude, latitude, longitude, latitude, radius_meters, limit)
+    return sql, params
+
+
+def build_nearby_query(latitude: float, longitude: float, radius_meters: float, limit: int = 50,
+                       prefilter: str = 'bbox') -> tuple[str, tuple]:
+    """바운딩 박스 또는 셀 키로 후보를 좁히고 미리 계산한 삼각함수 컬럼으로 정확한 거리 비교
+
+    cos(d/R) = sinφ₁·sinφ₂ + cosφ₁·cosφ₂·(cosλ₁·cosλ₂ + sinλ₁·sinλ₂) 이므로
+    쿼리 지점 쪽 값만 미리 계산해 두면 후보 행마다 곱셈-덧셈만 남는다.
+    """
+    lat_rad = math.radians(latitude)
+    lon_rad = math.radians(longitude)
+    q_sin = math.sin(lat_rad)
+    q_cos_cos = math.cos(lat_rad) * math.cos(lon_rad)
+    q_cos_sin = math.cos(lat_rad) * math.sin(lon_rad)
+    min_dot = math.cos(min(radius_meters / EARTH_RADIUS_M, math.pi))
+
+    dot_sql = '(lat_sin * %s + lat_cos * (lon_cos * %s + lon_sin * %s))'
+    dot_params = (q_sin, q_cos_cos, q_cos_sin)
+
+    if prefilter == 'cells':
+        filter_sql, filter_params = cell_prefilter_sql(latitude, longitude, radius_meters)
+        filter_params = tuple(filter_params)
+    else:
+        south, north, west, east = bounding_box(latitude, longitude, radius_meters)
+        filter_sql = '(latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s)'
+        filter_params = (south, north, west, east)
+
+    sql = f"""
+        SELECT
+            {NEARBY_COLUMNS},
+            6371000 * acos(LEAST(1.0, dot)) AS distance_meters
+        FROM (
+            SELECT
+                {NEARBY_COLUMNS},
+                {dot_sql} AS dot
+            FROM smoking_areas
+            WHERE status = 'active' AND {filter_sql}
+        ) candidates
+        WHERE dot >= %s
+        ORDER BY dot DESC
+        LIMIT %s
+    """
+    return sql, dot_params + filter_params + (min_dot, limit)
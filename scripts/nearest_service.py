@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""메모리 내 최근접 흡연구역 질의 서비스
+
+배치 작업(커버리지 분석, 중복 제거, 제보 분류)에서 지점마다 Postgres 하버사인 쿼리를 보내는 대신
+활성 흡연구역을 한 번 NumPy 배열로 읽어 두고 BallTree(haversine)로 질의한다.
+scikit-learn이 없으면 haversine_kernel의 타일 단위 전수 계산으로 대신한다.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from haversine_kernel import k_nearest, pairs_within
+from spatial_cells import EARTH_RADIUS_M
+
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:  # scikit-learn이 없는 환경
+    BallTree = None
+
+
+class NearestAreaService:
+    """nearest(lat, lng, k) / within(lat, lng, radius)
+
+    단일 좌표(float)를 넘기면 (id, 거리m) 목록을, 배열을 넘기면 지점별 결과를 반환한다.
+    refresh_interval초가 지나면 다음 질의 전에 MAX(updated_at)과 활성 행 수를 확인해
+    바뀐 경우에만 다시 읽는다 (0이면 자동 확인하지 않음).
+    호출자가 연 트랜잭션 안에서 읽었다면 커밋/롤백은 호출자에게 맡긴다.
+    """
+
+    def __init__(self, connection, refresh_interval: float = 0, leaf_size: int = 40, use_tree: bool = True):
+        self.connection = connection
+        self.refresh_interval = refresh_interval
+        self.leaf_size = leaf_size
+        self.use_tree = use_tree and BallTree is not None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.latitudes = np.empty(0)
+        self.longitudes = np.empty(0)
+        self._tree = None
+        self._version = None
+        self._checked_at = 0.0
+        self.load()
+
+    @contextmanager
+    def _read_cursor(self):
+        """읽기용 커서 - 트랜잭션을 이 서비스가 시작한 경우에만 끝낸다 (idle in transaction 방지)"""
+        owns_transaction = self.connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+        cursor = self.connection.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            if owns_transaction:
+                self.connection.rollback()
+
+    def _current_version(self, cursor) -> tuple:
+        cursor.execute("SELECT MAX(updated_at), COUNT(*) FROM smoking_areas WHERE status = 'active'")
+        return tuple(cursor.fetchone())
+
+    def load(self):
+        with self._read_cursor() as cursor:
+            version = self._current_version(cursor)
+            cursor.execute("""
+                SELECT id, latitude::float8, longitude::float8
+                FROM smoking_areas
+                WHERE status = 'active'
+                ORDER BY id
+            """)
+            rows = cursor.fetchall()
+
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        self.ids = data[:, 0].astype(np.int64)
+        self.latitudes = data[:, 1]
+        self.longitudes = data[:, 2]
+        self._tree = None
+        if self.use_tree and len(rows):
+            self._tree = BallTree(np.radians(data[:, 1:]), leaf_size=self.leaf_size, metric='haversine')
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    def refresh(self, force: bool = False) -> bool:
+        """데이터가 바뀌었으면 다시 읽고 True를 반환"""
+        with self._read_cursor() as cursor:
+            version = self._current_version(cursor)
+        self._checked_at = time.monotonic()
+        if not force and version == self._version:
+            return False
+        self.load()
+        return True
+
+    def _maybe_refresh(self):
+        if self.refresh_interval and time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.refresh()
+
+    @staticmethod
+    def _as_points(latitude, longitude) -> tuple[np.ndarray, np.ndarray, bool]:
+        single = np.ndim(latitude) == 0
+        return np.atleast_1d(latitude).astype(np.float64), np.atleast_1d(longitude).astype(np.float64), single
+
+    def nearest(self, latitude, longitude, k: int = 1):
+        """k개 최근접: 단일 좌표면 [(id, 거리m)], 배열이면 (ids, 거리m) 2차원 배열"""
+        self._maybe_refresh()
+        lats, lngs, single = self._as_points(latitude, longitude)
+        k = min(k, len(self.ids))
+        if k == 0:
+            empty = np.empty((len(lats), 0))
+            return [] if single else (empty.astype(np.int64), empty)
+
+        if self._tree is not None:
+            angles, index = self._tree.query(np.radians(np.column_stack((lats, lngs))), k=k)
+            distances = angles * EARTH_RADIUS_M
+        else:
+            index, distances = k_nearest(lats, lngs, self.latitudes, self.longitudes, k)
+
+        ids = self.ids[index]
+        if single:
+            return list(zip(ids[0].tolist(), distances[0].tolist()))
+        return ids, distances
+
+    def within(self, latitude, longitude, radius_m: float):
+        """반경 내 지점: 단일 좌표면 [(id, 거리m)] (가까운 순), 배열이면 지점별 목록"""
+        self._maybe_refresh()
+        lats, lngs, single = self._as_points(latitude, longitude)
+
+        results = []
+        if self._tree is not None:
+            index_list, angle_list = self._tree.query_radius(
+                np.radians(np.column_stack((lats, lngs))), r=radius_m / EARTH_RADIUS_M,
+                return_distance=True, sort_results=True,
+            )
+            for index, angles in zip(index_list, angle_list):
+                results.append(list(zip(self.ids[index].tolist(), (angles * EARTH_RADIUS_M).tolist())))
+        else:
+            results = [[] for _ in range(len(lats))]
+            rows, cols, distances = pairs_within(lats, lngs, self.latitudes, self.longitudes, radius_m)
+            for i in np.argsort(distances, kind='stable'):
+                results[rows[i]].append((int(self.ids[cols[i]]), float(distances[i])))
+
+        return results[0] if single else results
+
+
+def main():
+    from database_manager import DatabaseManager
+    from nearby_search import build_nearby_query
+
+    parser = argparse.ArgumentParser(description='Benchmark the in-process nearest-area service against SQL.')
+    parser.add_argument('--queries', type=int, default=500, help='Number of random query points.')
+    parser.add_argument('--radius', type=float, default=1000, help='Search radius in meters.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--brute', action='store_true', help='Skip the BallTree and use the NumPy kernel.')
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return
+
+    try:
+        start = time.perf_counter()
+        service = NearestAreaService(db_manager.connection, use_tree=not args.brute)
+        load_ms = (time.perf_counter() - start) * 1000
+        if not len(service.ids):
+            print("❌ 활성 흡연구역이 없어 벤치마크를 실행할 수 없습니다.")
+            return
+
+        rng = random.Random(args.seed)
+        anchors = rng.choices(range(len(service.ids)), k=args.queries)
+        lats = np.array([service.latitudes[i] + rng.uniform(-0.01, 0.01) for i in anchors])
+        lngs = np.array([service.longitudes[i] + rng.uniform(-0.01, 0.01) for i in anchors])
+
+        print(f"📊 최근접 서비스 벤치마크: 행 {len(service.ids)}개, 쿼리 {args.queries}회, 반경 {args.radius:.0f}m")
+        print(f"  인덱스 로드 {load_ms:.1f}ms ({'BallTree' if service._tree is not None else 'NumPy 전수'})")
+
+        cursor = db_manager.connection.cursor()
+        sql_timings = []
+        sql_ids = []
+        for lat, lng in zip(lats, lngs):
+            sql, params = build_nearby_query(float(lat), float(lng), args.radius, limit=100000)
+            query_start = time.perf_counter()
+            cursor.execute(sql, params)
+            sql_ids.append({row[0] for row in cursor.fetchall()})
+            sql_timings.append((time.perf_counter() - query_start) * 1000)
+        cursor.close()
+
+        single_timings = []
+        for lat, lng in zip(lats, lngs):
+            query_start = time.perf_counter()
+            service.within(float(lat), float(lng), args.radius)
+            single_timings.append((time.perf_counter() - query_start) * 1000)
+
+        batch_start = time.perf_counter()
+        batch_results = service.within(lats, lngs, args.radius)
+        batch_ms = (time.perf_counter() - batch_start) * 1000
+
+        sql_total = sum(sql_timings)
+        print(f"  SQL        중앙값 {statistics.median(sql_timings):8.3f}ms | 합계 {sql_total:9.1f}ms")
+        print(f"  in-process 중앙값 {statistics.median(single_timings):8.3f}ms | 합계 {sum(single_timings):9.1f}ms")
+        print(f"  배치 질의  합계 {batch_ms:9.1f}ms")
+        print(f"  🚀 속도 향상: 단건 {sql_total / sum(single_timings):.1f}배, 배치 {sql_total / batch_ms:.1f}배")
+
+        mismatches = sum(1 for expected, got in zip(sql_ids, batch_results) if expected != {area_id for area_id, _ in got})
+        print(f"  ⚠️ 결과가 다른 쿼리: {mismatches}개" if mismatches else "  ✅ 모든 쿼리 결과 일치")
+    finally:
+        db_manager.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,15 @@
 import pandas as pd
 import os
 import glob
-import json
+
+from source_table import SourceTable, sources_path, write_compact_json
 
 class AddressExtractor:
     def __init__(self):
         self.data_dir = "../data"
         self.results = []
+        # 결과 레코드는 (file_id, row_index)만 갖고 원본 행은 여기서 꺼낸다
+        self.sources = SourceTable()
 
     def get_csv_files(self):
         """data 폴더의 모든 CSV 파일 목록 가져오기"""
@@ -56,6 +59,11 @@ class AddressExtractor:
                 print("  ⚠️ 주소 필드 없음\n")
                 continue
 
+            file_id = self.sources.add(filepath, df, encoding)
+            lat_fields = [col for col in df.columns if '위도' in col or 'latitude' in col.lower()]
+            lng_fields = [col for col in df.columns if '경도' in col or 'longitude' in col.lower()]
+            extracted_count = 0
+
             # 각 행에서 주소 추출
             for idx, row in df.iterrows():
                 address_data = {}
@@ -67,16 +75,12 @@ class AddressExtractor:
                 if address_data:
                     # 기본 정보 추가
                     address_info = {
-                        'file': os.path.basename(filepath),
+                        'file_id': file_id,
                         'row_index': idx,
                         'addresses': address_data,
-                        'all_data': row.to_dict()
                     }
 
                     # 위도/경도 정보가 있다면 추가
-                    lat_fields = [col for col in df.columns if '위도' in col or 'latitude' in col.lower()]
-                    lng_fields = [col for col in df.columns if '경도' in col or 'longitude' in col.lower()]
-
                     if lat_fields and lng_fields:
                         try:
                             address_info['latitude'] = float(row[lat_fields[0]])
@@ -85,8 +89,9 @@ class AddressExtractor:
                             pass
 
                     all_addresses.append(address_info)
+                    extracted_count += 1
 
-            print(f"  ✅ {len([a for a in all_addresses if a['file'] == os.path.basename(filepath)])}개 주소 추출\n")
+            print(f"  ✅ {extracted_count}개 주소 추출\n")
 
         return all_addresses
 
@@ -109,11 +114,11 @@ class AddressExtractor:
         return address_fields
 
     def save_results(self, addresses, output_file="extracted_addresses.json"):
-        """결과를 JSON 파일로 저장"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(addresses, f, ensure_ascii=False, indent=2)
+        """결과를 JSON 파일로 저장 (원본 행은 .sources.json 보조 테이블로 따로)"""
+        write_compact_json(addresses, output_file)
+        source_file = self.sources.save(sources_path(output_file))
 
-        print(f"💾 결과 저장: {output_file}")
+        print(f"💾 결과 저장: {output_file} (원본 행: {source_file})")
 
     def print_summary(self, addresses):
         """추출 결과 요약 출력"""
@@ -122,7 +127,7 @@ class AddressExtractor:
         print("="*60)
 
         total_addresses = len(addresses)
-        files_processed = len(set(addr['file'] for addr in addresses))
+        files_processed = len(set(self.sources.file_name(addr) for addr in addresses))
         addresses_with_coords = len([addr for addr in addresses if 'latitude' in addr and 'longitude' in addr])
 
         print(f"처리된 파일: {files_processed}개")
@@ -134,7 +139,7 @@ class AddressExtractor:
         print("\n📁 파일별 추출 현황:")
         file_stats = {}
         for addr in addresses:
-            file = addr['file']
+            file = self.sources.file_name(addr)
             if file not in file_stats:
                 file_stats[file] = {'total': 0, 'with_coords': 0}
             file_stats[file]['total'] += 1
@@ -148,7 +153,7 @@ class AddressExtractor:
         # 샘플 주소 몇 개 출력
         print("\n🏠 추출된 주소 샘플:")
         for addr in addresses[:5]:
-            print(f"  📍 {addr['file']}: {list(addr['addresses'].values())[0] if addr['addresses'] else 'N/A'}")
+            print(f"  📍 {self.sources.file_name(addr)}: {list(addr['addresses'].values())[0] if addr['addresses'] else 'N/A'}")
             if 'latitude' in addr:
                 print(f"     좌표: ({addr['latitude']}, {addr['longitude']})")
 
@@ -6,6 +6,8 @@ import requests
 import re
 from urllib.parse import quote
 
+from source_table import SourceTable, write_compact_json
+
 class AddressFixer:
     def __init__(self):
         self.postcodify_url = "https://api.poesis.kr/post/search.php"
@@ -109,14 +111,15 @@ class AddressFixer:
         except Exception as e:
             return False, None
 
-    def fix_failed_addresses(self, failed_addresses):
-        """실패한 주소들 수정 시도"""
+    def fix_failed_addresses(self, failed_addresses, sources=None):
+        """실패한 주소들 수정 시도 (sources: 검증 결과의 원본 행 보조 테이블)"""
+        sources = sources or SourceTable()
         fixed_results = []
 
         for failed in failed_addresses:
             address = failed['original_address']
-            row_data = failed.get('row_data', {})
-            file_name = failed['file']
+            row_data = sources.row_for(failed)
+            file_name = sources.file_name(failed)
 
             print(f"\n🔧 수정 시도: {address}")
             print(f"   파일: {file_name}")
@@ -141,10 +144,15 @@ class AddressFixer:
                         'postcode': result.get('postcode5', ''),
                         'validated_address': f"{result.get('ko_common', '')} {result.get('ko_doro', '')}".strip(),
                         'jibeon_address': f"{result.get('ko_common', '')} {result.get('ko_jibeon', '')}".strip(),
-                        'file': file_name,
-                        'row_data': row_data
+                        # 원본 파일/행은 validated_addresses.sources.json의 (file_id, row_index)
+                        'file_id': failed.get('file_id'),
+                        'row_index': failed.get('row_index'),
                     }
 
+                    # 예전 검증 결과(file_id 없음)는 파일 이름을 그대로 남긴다
+                    if 'file_id' not in failed:
+                        fixed_result['file'] = file_name
+
                     # 기존 좌표 정보가 있다면 추가
                     if 'original_latitude' in failed:
                         fixed_result['original_latitude'] = failed['original_latitude']
@@ -173,18 +181,18 @@ if __name__ == "__main__":
     # 기존 검증 결과 로드
     with open('validated_addresses.json', 'r', encoding='utf-8') as f:
         results = json.load(f)
+    sources = SourceTable.for_results('validated_addresses.json')
 
     failed_addresses = results['invalid_addresses']
 
     print(f"🔧 {len(failed_addresses)}개 실패 주소 수정 시도")
-    fixed_results = fixer.fix_failed_addresses(failed_addresses)
+    fixed_results = fixer.fix_failed_addresses(failed_addresses, sources)
 
     print(f"\n📊 수정 결과:")
     print(f"✅ 수정 성공: {len(fixed_results)}개")
     print(f"❌ 수정 실패: {len(failed_addresses) - len(fixed_results)}개")
 
     # 수정 결과 저장
-    with open('fixed_addresses.json', 'w', encoding='utf-8') as f:
-        json.dump(fixed_results, f, ensure_ascii=False, indent=2)
+    write_compact_json(fixed_results, 'fixed_addresses.json')
 
     print(f"💾 수정 결과 저장: fixed_addresses.json")
\ No newline at end of file
@@ -9,11 +9,15 @@ import glob
 from urllib.parse import quote
 import json
 
+from source_table import SourceTable
+
 class AddressParser:
     def __init__(self):
         self.postcodify_url = "https://api.poesis.kr/post/search.php"
         self.data_dir = "../data"
         self.results = []
+        # 결과 레코드는 (file_id, row_index)만 갖고 원본 행은 여기서 꺼낸다
+        self.sources = SourceTable()
 
     def get_csv_files(self):
         """data 폴더의 모든 CSV 파일 목록 가져오기"""
@@ -107,6 +111,7 @@ class AddressParser:
 
         print(f"컬럼들: {list(df.columns)}")
         print(f"총 {len(df)}개 행")
+        file_id = self.sources.add(filepath, df, encoding)
 
         # 주소 추출 및 검증
         valid_addresses = []
@@ -126,21 +131,19 @@ class AddressParser:
                 if is_valid:
                     print(f"    ✅ 검증 성공")
                     valid_addresses.append({
-                        'file': os.path.basename(filepath),
+                        'file_id': file_id,
                         'row_index': idx,
                         'original_address': address,
                         'postcode': result.get('postcode', ''),
                         'address': result.get('address', ''),
                         'details': result.get('details', {}),
-                        'row_data': row.to_dict()
                     })
                 else:
                     print(f"    ❌ 검증 실패")
                     invalid_addresses.append({
-                        'file': os.path.basename(filepath),
+                        'file_id': file_id,
                         'row_index': idx,
                         'original_address': address,
-                        'row_data': row.to_dict()
                     })
             else:
                 print(f"  ⚠️ 주소 필드를 찾을 수 없음 (행 {idx})")
@@ -150,6 +153,7 @@ class AddressParser:
 
         return {
             'file': filepath,
+            'file_id': file_id,
             'encoding': encoding,
             'valid_addresses': valid_addresses,
             'invalid_addresses': invalid_addresses,
@@ -6,15 +6,21 @@ import json
 import re
 from collections import defaultdict
 
+from source_table import SourceTable
+
 class FailedAddressAnalyzer:
     def __init__(self, validation_results_file="validated_addresses.json"):
         self.validation_results_file = validation_results_file
         self.data_dir = "../data"
+        self.sources = None
 
     def load_validation_results(self):
-        """검증 결과 로드"""
+        """검증 결과 로드 (원본 행은 .sources.json 보조 테이블에서)"""
         with open(self.validation_results_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            results = json.load(f)
+        if self.sources is None:
+            self.sources = SourceTable.for_results(self.validation_results_file)
+        return results
 
     def analyze_failed_addresses(self):
         """검증 실패한 주소들 분석"""
@@ -29,14 +35,14 @@ class FailedAddressAnalyzer:
 
         for failed in failed_addresses:
             address = failed['original_address']
-            file_name = failed['file']
+            file_name = self.sources.file_name(failed)
 
             # 실패 유형 분석
             failure_type = self.categorize_failure_type(address)
             failure_types[failure_type].append({
                 'address': address,
                 'file': file_name,
-                'row_data': failed.get('row_data', {})
+                'row_data': self.sources.row_for(failed)
             })
 
         # 유형별 출력
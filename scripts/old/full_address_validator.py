@@ -6,14 +6,23 @@ import requests
 import time
 import os
 import glob
+import sys
 from urllib.parse import quote
-import json
+
+# 상위 scripts/ 폴더의 공용 모듈(pipeline_metrics 등) 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+from source_table import SourceTable, sources_path, write_compact_json
 
 class FullAddressValidator:
     def __init__(self):
         self.postcodify_url = "https://api.poesis.kr/post/search.php"
         self.data_dir = "../data"
         self.results = []
+        # 결과 레코드는 (file_id, row_index)만 갖고 원본 행은 여기서 꺼낸다
+        self.sources = SourceTable()
+        self.metrics = pipeline_metrics('full_address_validator')
 
     def get_csv_files(self):
         """data 폴더의 모든 CSV 파일 목록 가져오기"""
@@ -70,7 +79,8 @@ class FullAddressValidator:
                 'ref': 'localhost'
             }
 
-            response = requests.get(self.postcodify_url, params=params, timeout=10)
+            with self.metrics.timer('postcodify.search'):
+                response = requests.get(self.postcodify_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -107,7 +117,8 @@ class FullAddressValidator:
         for i, filepath in enumerate(csv_files, 1):
             print(f"📁 [{i}/{len(csv_files)}] 처리 중: {os.path.basename(filepath)}")
 
-            df, encoding = self.read_csv_with_encoding(filepath)
+            with self.metrics.timer('csv.read'):
+                df, encoding = self.read_csv_with_encoding(filepath)
             if df is None:
                 print("  ❌ 파일 읽기 실패\n")
                 continue
@@ -122,6 +133,9 @@ class FullAddressValidator:
             print(f"  주소 필드: {address_fields}")
             print(f"  총 {len(df)}개 행 처리")
 
+            file_id = self.sources.add(filepath, df, encoding)
+            lat_fields = [col for col in df.columns if '위도' in col or 'latitude' in col.lower()]
+            lng_fields = [col for col in df.columns if '경도' in col or 'longitude' in col.lower()]
             valid_count = 0
             invalid_count = 0
 
@@ -132,18 +146,15 @@ class FullAddressValidator:
                 if address:
                     # API 호출 제한을 위한 지연
                     time.sleep(0.2)
+                    self.metrics.increment('throttle_sleep_seconds', 0.2)
 
                     is_valid, result = self.validate_address_with_postcodify(address)
 
                     if is_valid:
                         valid_count += 1
 
-                        # 위도/경도 정보 추가
-                        lat_fields = [col for col in df.columns if '위도' in col or 'latitude' in col.lower()]
-                        lng_fields = [col for col in df.columns if '경도' in col or 'longitude' in col.lower()]
-
                         validated_address = {
-                            'file': os.path.basename(filepath),
+                            'file_id': file_id,
                             'row_index': idx,
                             'original_address': address,
                             'field_used': field_used,
@@ -152,7 +163,6 @@ class FullAddressValidator:
                             'jibeon_address': f"{result.get('ko_common', '')} {result.get('ko_jibeon', '')}".strip(),
                             'building_name': result.get('building_name', ''),
                             'other_addresses': result.get('other_addresses', ''),
-                            'row_data': row.to_dict()
                         }
 
                         # 기존 좌표 정보가 있다면 추가
@@ -167,17 +177,17 @@ class FullAddressValidator:
                     else:
                         invalid_count += 1
                         all_results['invalid_addresses'].append({
-                            'file': os.path.basename(filepath),
+                            'file_id': file_id,
                             'row_index': idx,
                             'original_address': address,
                             'field_used': field_used,
-                            'row_data': row.to_dict()
                         })
 
             print(f"  ✅ 유효: {valid_count}개, ❌ 무효: {invalid_count}개")
 
             all_results['file_stats'].append({
                 'file': os.path.basename(filepath),
+                'file_id': file_id,
                 'total_rows': len(df),
                 'valid_addresses': valid_count,
                 'invalid_addresses': invalid_count,
@@ -189,11 +199,14 @@ class FullAddressValidator:
         return all_results
 
     def save_results(self, results, output_file="validated_addresses.json"):
-        """결과를 JSON 파일로 저장"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        """결과를 JSON 파일로 저장 (원본 행은 .sources.json 보조 테이블로 따로)"""
+        with self.metrics.stage('save_results'):
+            write_compact_json(results, output_file)
+            source_file = self.sources.save(sources_path(output_file))
 
-        print(f"💾 결과 저장: {output_file}")
+        print(f"💾 결과 저장: {output_file} (원본 행: {source_file})")
+        for path in self.metrics.write_reports(directory=os.path.dirname(os.path.abspath(output_file))):
+            print(f"📈 메트릭 저장: {path}")
 
     def print_summary(self, results):
         """결과 요약 출력"""
@@ -224,16 +237,23 @@ class FullAddressValidator:
         if total_invalid > 0:
             print(f"\n❌ 검증 실패 주소 샘플 (총 {total_invalid}개 중 10개):")
             for invalid in results['invalid_addresses'][:10]:
-                print(f"  - {invalid['original_address']} ({invalid['file']})")
+                print(f"  - {invalid['original_address']} ({self.sources.file_name(invalid)})")
 
 if __name__ == "__main__":
-    validator = FullAddressValidator()
-
-    # 전체 파일 처리
-    print("🚀 전체 51개 파일에 대해 주소 검증을 시작합니다.")
-    print("⏰ 예상 소요 시간: 20-30분 (API 호출 제한 고려)")
-
-    results = validator.process_all_files(max_files=None)
-
-    validator.print_summary(results)
-    validator.save_results(results)
\ No newline at end of file
+    # --profile: 단계별 cProfile/collapsed stack 기록 (full_address_validator_profile_*)
+    # --memory: 단계별 최고 RSS/tracemalloc 상위 할당을 메트릭 리포트에 기록
+    if '--memory' in sys.argv:
+        pipeline_metrics('full_address_validator').track_memory()
+    with profile_run('full_address_validator', enabled='--profile' in sys.argv):
+        validator = FullAddressValidator()
+
+        # 전체 파일 처리
+        print("🚀 전체 51개 파일에 대해 주소 검증을 시작합니다.")
+        print("⏰ 예상 소요 시간: 20-30분 (API 호출 제한 고려)")
+
+        with validator.metrics.stage('validate_files') as stage:
+            results = validator.process_all_files(max_files=None)
+            stage.rows = len(results['valid_addresses']) + len(results['invalid_addresses'])
+
+        validator.print_summary(results)
+        validator.save_results(results)
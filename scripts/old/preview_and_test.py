@@ -7,8 +7,9 @@ import os
 from datetime import datetime
 
 class PreviewAndTest:
-    def __init__(self, input_file="data/total_smoking_place.csv"):
-        self.input_file = input_file
+    def __init__(self, input_file=None):
+        # PREPROCESSED_CSV: 다른 폴더에서 실행할 때(파이프라인 오케스트레이터 등) 입력 경로 지정
+        self.input_file = input_file or os.getenv('PREPROCESSED_CSV', "data/total_smoking_place.csv")
         self.postcodify_url = "https://api.poesis.kr/post/search.php"
 
     def check_file_exists(self):
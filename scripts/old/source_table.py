@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""검증/추출 결과가 참조하는 원본 CSV 행 (컬럼 단위 보조 테이블)
+
+결과 레코드마다 row.to_dict()를 붙이는 대신 (file_id, row_index)만 남기고,
+원본 컬럼 값은 파일마다 한 번씩 컬럼별 리스트로 <결과 파일>.sources.json에 저장한다.
+원본 행이 필요할 때만 SourceTable.load()로 읽어 row_for(record)로 꺼낸다.
+
+    sources = SourceTable()
+    file_id = sources.add(filepath, df, encoding)
+    record = {'file_id': file_id, 'row_index': idx, ...}   # 파일 이름도 sources.file_name(record)로
+    sources.save(sources_path('validated_addresses.json'))
+"""
+
+import json
+import math
+import os
+
+
+SOURCES_SUFFIX = '.sources.json'
+SOURCES_FORMAT = 1
+
+
+def sources_path(result_path):
+    """validated_addresses.json → validated_addresses.sources.json"""
+    base, _ = os.path.splitext(result_path)
+    return base + SOURCES_SUFFIX
+
+
+def write_compact_json(data, output_file):
+    """들여쓰기 없는 JSON (결과 파일 크기의 대부분이 indent=2 공백이었다)"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _clean(value):
+    """NaN → None (JSON 표준 값으로)"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class SourceTable:
+    def __init__(self):
+        # 파일마다 {'file', 'encoding', 'columns', 'values'(컬럼별 리스트) 또는 'values_json'(그 리스트의 JSON 문자열)}
+        self.files = []
+
+    def add(self, filepath, df, encoding=None):
+        """읽은 CSV를 등록하고 file_id 반환 (row_index는 read_csv 기본 인덱스 = 행 위치)
+
+        컬럼 값은 바로 JSON 문자열로 직렬화해 두고 DataFrame은 붙잡지 않는다.
+        save()까지 남는 메모리가 DataFrame이나 파이썬 리스트로 들고 있을 때의 절반 정도다.
+        """
+        values = [[_clean(value) for value in df[column].tolist()] for column in df.columns]
+        self.files.append({
+            'file': os.path.basename(filepath),
+            'encoding': encoding,
+            'columns': [str(column) for column in df.columns],
+            'values_json': json.dumps(values, ensure_ascii=False, separators=(',', ':')),
+        })
+        return len(self.files) - 1
+
+    def _values(self, entry):
+        if 'values' not in entry:
+            entry['values'] = json.loads(entry.pop('values_json'))
+        return entry['values']
+
+    def row(self, file_id, row_index):
+        """원본 행 dict (예전 row_data와 같은 형태, 결측은 None)"""
+        entry = self.files[file_id]
+        return {column: values[row_index] for column, values in zip(entry['columns'], self._values(entry))}
+
+    def file_name(self, record):
+        """결과 레코드의 원본 파일 이름 (예전 결과 파일은 record['file'])"""
+        if 'file' in record:
+            return record['file']
+        return self.files[record['file_id']]['file']
+
+    def row_for(self, record):
+        """결과 레코드의 원본 행 (row_data/all_data가 들어 있는 예전 결과 파일도 지원)"""
+        for legacy_key in ('row_data', 'all_data'):
+            if legacy_key in record:
+                return record[legacy_key]
+        if 'file_id' not in record:
+            return {}
+        return self.row(record['file_id'], record['row_index'])
+
+    def save(self, output_file):
+        """{'format', 'files': [{'file', 'encoding', 'columns', 'values'}]} - 직렬화해 둔 값은 그대로 이어 쓴다"""
+        def compact(value):
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(f'{{"format":{SOURCES_FORMAT},"files":[')
+            for index, entry in enumerate(self.files):
+                if index:
+                    f.write(',')
+                values_json = entry['values_json'] if 'values_json' in entry else compact(entry['values'])
+                f.write(f'{{"file":{compact(entry["file"])},"encoding":{compact(entry["encoding"])},'
+                        f'"columns":{compact(entry["columns"])},"values":{values_json}}}')
+            f.write(']}')
+        return output_file
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        table = cls()
+        table.files = data['files']
+        return table
+
+    @classmethod
+    def for_results(cls, result_path):
+        """결과 파일 옆의 .sources.json (없으면 빈 테이블 - 예전 결과 파일은 row_data를 그대로 쓴다)"""
+        path = sources_path(result_path)
+        return cls.load(path) if os.path.exists(path) else cls()
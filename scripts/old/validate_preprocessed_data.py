@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
+import sys
 import pandas as pd
 import requests
 import time
@@ -8,9 +10,15 @@ import json
 from datetime import datetime
 from urllib.parse import quote
 
+# 상위 scripts/ 폴더의 공용 모듈(pipeline_metrics 등) 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+
 class PreprocessedDataValidator:
-    def __init__(self, input_file="data/total_smoking_place.csv"):
-        self.input_file = input_file
+    def __init__(self, input_file=None):
+        # PREPROCESSED_CSV: 다른 폴더에서 실행할 때(파이프라인 오케스트레이터 등) 입력 경로 지정
+        self.input_file = input_file or os.getenv('PREPROCESSED_CSV', "data/total_smoking_place.csv")
         self.postcodify_url = "https://api.poesis.kr/post/search.php"
         self.validation_results = []
         self.stats = {
@@ -20,6 +28,7 @@ class PreprocessedDataValidator:
             'start_time': None,
             'end_time': None
         }
+        self.metrics = pipeline_metrics('validate_preprocessed_data')
 
     def load_preprocessed_data(self):
         """전처리된 CSV 파일 로드"""
@@ -71,7 +80,8 @@ class PreprocessedDataValidator:
                 'ref': 'localhost'
             }
 
-            response = requests.get(self.postcodify_url, params=params, timeout=10)
+            with self.metrics.timer('postcodify.search'):
+                response = requests.get(self.postcodify_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -178,6 +188,7 @@ class PreprocessedDataValidator:
 
             # API 호출 제한 (0.2초 대기)
             time.sleep(0.2)
+            self.metrics.increment('throttle_sleep_seconds', 0.2)
 
             # 진행률 표시 (10개마다)
             if (idx + 1) % 10 == 0:
@@ -216,6 +227,10 @@ class PreprocessedDataValidator:
             json.dump(report, f, ensure_ascii=False, indent=2)
         print(f"✅ 상세 리포트 JSON 저장: {output_json}")
 
+        self.metrics.print_summary()
+        for path in self.metrics.write_reports(timestamp):
+            print(f"📈 메트릭 저장: {path}")
+
         return output_csv, output_json
 
     def print_final_summary(self):
@@ -243,12 +258,15 @@ class PreprocessedDataValidator:
         print("="*60)
 
         # 1. 데이터 로드
-        df = self.load_preprocessed_data()
+        with self.metrics.stage('load_csv') as stage:
+            df = self.load_preprocessed_data()
+            stage.rows = len(df) if df is not None else 0
         if df is None:
             return False
 
         # 2. 주소 검증 실행
-        validated_df = self.process_all_addresses(df)
+        with self.metrics.stage('validate_addresses', rows=len(df)):
+            validated_df = self.process_all_addresses(df)
 
         # 3. 결과 저장
         csv_file, json_file = self.save_results(validated_df)
@@ -262,6 +280,15 @@ class PreprocessedDataValidator:
 
         return True
 
+def main():
+    """메인 실행 함수 (성공 여부 반환)"""
+    # --profile: 단계별 cProfile/collapsed stack 기록 (validate_preprocessed_data_profile_*)
+    # --memory: 단계별 최고 RSS/tracemalloc 상위 할당을 메트릭 리포트에 기록
+    if '--memory' in sys.argv:
+        pipeline_metrics('validate_preprocessed_data').track_memory()
+    with profile_run('validate_preprocessed_data', enabled='--profile' in sys.argv):
+        validator = PreprocessedDataValidator()
+        return validator.run()
+
 if __name__ == "__main__":
-    validator = PreprocessedDataValidator()
-    validator.run()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""파이프라인 실행 메트릭 (단계별 소요 시간/처리량, 외부 API·DB 지연 히스토그램, 캐시 적중률)
+
+- stage(name): 단계 벽시계 시간과 처리 행 수 → rows/sec
+- timer(name) / observe(name, seconds): 고정 버킷 지연 히스토그램 (kakao.*, postcodify.*, db.* 등)
+- cache(name, hit): 캐시 적중/미스 카운터
+- increment(name, amount): 그 밖의 누적 값 (대기 시간, 실패 수 등)
+- track_memory(): (선택) 단계 경계마다 최고 RSS와 tracemalloc 증가 상위 위치 - METRICS_MEMORY=1 또는 --memory
+
+같은 프로세스의 모든 모듈이 pipeline_metrics() 하나를 공유하고, 진입점이 끝날 때
+write_reports()로 pipeline_metrics_{timestamp}.json(final_summary_*.json 옆)과
+METRICS_PROMETHEUS_DIR가 설정된 경우 node_exporter textfile 형식(.prom)을 남긴다.
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# 초 단위 상한 (Prometheus 기본 버킷과 같은 간격)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_PREFIX = 'smoking_pipeline'
+
+MEMORY_TOP_ALLOCATIONS = 10
+_MB = 1024 * 1024
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class LatencyHistogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # 마지막 칸 = +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """버킷 안에서 선형 보간한 근사 분위수 (+Inf 버킷은 관측 최대값으로 막는다)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        result = []
+        running = 0
+        for bound, count in zip(list(LATENCY_BUCKETS) + [math.inf], self.counts):
+            running += count
+            result.append(('+Inf' if bound == math.inf else repr(bound), running))
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 6),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class StageRecord:
+    __slots__ = ('name', 'seconds', 'rows')
+
+    def __init__(self, name: str, rows: int | None = None):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = rows
+
+    def to_dict(self) -> dict:
+        record = {'name': self.name, 'seconds': round(self.seconds, 6)}
+        if self.rows is not None:
+            record['rows'] = self.rows
+            record['rows_per_sec'] = round(self.rows / self.seconds, 2) if self.seconds > 0 else None
+        return record
+
+
+def _rss_bytes() -> tuple[int | None, int | None]:
+    """(현재 RSS, 최고 RSS) 바이트 - /proc이 없으면 getrusage의 누적 최고값만"""
+    try:
+        values = {}
+        with open('/proc/self/status', encoding='ascii') as fp:
+            for line in fp:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, value = line.split(':', 1)
+                    values[key] = int(value.split()[0]) * 1024
+        return values.get('VmRSS'), values.get('VmHWM')
+    except OSError:
+        pass
+    if resource is None:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None, peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _reset_rss_peak() -> bool:
+    """리눅스 4.0+: VmHWM을 현재 RSS로 되돌린다 (실패하면 최고 RSS는 프로세스 누적값)"""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as fp:
+            fp.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _megabytes(value: int | None) -> float | None:
+    return round(value / _MB, 2) if value is not None else None
+
+
+class MemoryTracker:
+    """단계 경계마다 최고 RSS, tracemalloc 사용량/최고값, 단계 중 늘어난 할당 상위 위치를 기록
+
+    PipelineMetrics.stage 리스너로 붙는다. 단계가 중첩되면 안쪽 단계에서 최고값을 초기화하므로
+    바깥 단계의 최고값은 초기화 직전 값과 안쪽 단계 최고값을 이어 받아 계산한다.
+    스냅샷 비용이 힙 크기에 비례하므로 필요할 때만 켠다.
+    """
+
+    def __init__(self, top: int = MEMORY_TOP_ALLOCATIONS, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.records: list[dict] = []
+        self.stage_scoped_rss = False
+        self._stack: list[dict] = []
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.stage_scoped_rss = _reset_rss_peak()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def enter_stage(self, name: str):
+        if self._stack:
+            outer = self._stack[-1]
+            outer['traced_peak'] = max(outer['traced_peak'], tracemalloc.get_traced_memory()[1])
+            outer['rss_peak'] = max(outer['rss_peak'], _rss_bytes()[1] or 0)
+        self._stack.append({'name': name, 'snapshot': self._snapshot(), 'traced_peak': 0, 'rss_peak': 0})
+        tracemalloc.reset_peak()
+        if self.stage_scoped_rss:
+            _reset_rss_peak()
+
+    def exit_stage(self, name: str):
+        if not self._stack or self._stack[-1]['name'] != name:
+            return
+        entry = self._stack.pop()
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        rss_current, rss_peak = _rss_bytes()
+        traced_peak = max(traced_peak, entry['traced_peak'])
+        rss_peak = max(rss_peak or 0, entry['rss_peak']) or None
+
+        snapshot = self._snapshot()
+        growth = [stat for stat in snapshot.compare_to(entry['snapshot'], 'lineno') if stat.size_diff > 0]
+        self.records.append({
+            'stage': '/'.join([outer['name'] for outer in self._stack] + [name]),
+            'rss_mb': _megabytes(rss_current),
+            'rss_peak_mb': _megabytes(rss_peak),
+            'traced_mb': _megabytes(traced_current),
+            'traced_peak_mb': _megabytes(traced_peak),
+            'traced_growth_mb': _megabytes(sum(stat.size_diff for stat in growth)),
+            'top_allocations': [
+                {
+                    'location': f'{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'size_kb': round(stat.size / 1024, 1),
+                    'count_diff': stat.count_diff,
+                }
+                for stat in growth[:self.top]
+            ],
+        })
+
+        if self._stack:
+            outer = self._stack[-1]
+            outer['traced_peak'] = max(outer['traced_peak'], traced_peak)
+            outer['rss_peak'] = max(outer['rss_peak'], rss_peak or 0)
+
+    def to_dict(self) -> dict:
+        return {
+            'rss_peak_scope': 'stage' if self.stage_scoped_rss else 'process',
+            'tracemalloc_frames': self.frames,
+            'stages': list(self.records),
+        }
+
+
+def _short_path(filename: str) -> str:
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+class PipelineMetrics:
+    def __init__(self, pipeline: str = 'pipeline'):
+        self.pipeline = pipeline
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.stages: list[StageRecord] = []
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.caches: dict[str, list[int]] = {}
+        self.counters: dict[str, float] = {}
+        # enter_stage(name)/exit_stage(name)을 받는 객체 (--profile 모드의 단계별 구간 나누기)
+        self.stage_listeners: list = []
+        self.memory: MemoryTracker | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        """with metrics.stage('geocode') as stage: ... stage.rows = n"""
+        record = StageRecord(name, rows)
+        for listener in self.stage_listeners:
+            listener.enter_stage(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            with self._lock:
+                self.stages.append(record)
+            for listener in reversed(self.stage_listeners):
+                listener.exit_stage(name)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def cache(self, name: str, hit: bool, count: int = 1):
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += count
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def track_memory(self, top: int = MEMORY_TOP_ALLOCATIONS) -> MemoryTracker:
+        """이후 단계마다 메모리 기록을 남긴다 (리포트의 memory 항목)"""
+        if self.memory is None:
+            self.memory = MemoryTracker(top)
+            self.memory.start()
+            self.stage_listeners.append(self.memory)
+        return self.memory
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            report = {
+                'pipeline': self.pipeline,
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now().isoformat(),
+                'wall_seconds': round(time.perf_counter() - self._started, 6),
+                'stages': [record.to_dict() for record in self.stages],
+                'latency': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                'caches': {
+                    name: {'hits': hits, 'misses': misses,
+                           'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None}
+                    for name, (hits, misses) in sorted(self.caches.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+            }
+        if self.memory is not None:
+            report['memory'] = self.memory.to_dict()
+        return report
+
+    def write_json(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(self.to_dict(), fp, ensure_ascii=False, indent=2)
+        return path
+
+    def prometheus_text(self) -> str:
+        report = self.to_dict()
+        base = {'pipeline': self.pipeline}
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[str, dict, float]]):
+            lines.append(f'# HELP {PROMETHEUS_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{PROMETHEUS_PREFIX}_{name}{suffix}{_labels({**base, **labels})} {_number(value)}')
+
+        metric('last_run_timestamp_seconds', 'gauge', 'Unix time the run report was written.',
+               [('', {}, time.time())])
+        metric('wall_seconds', 'gauge', 'Total wall time of the run.', [('', {}, report['wall_seconds'])])
+        metric('stage_seconds', 'gauge', 'Wall time per pipeline stage.',
+               [('', {'stage': stage['name']}, stage['seconds']) for stage in report['stages']])
+        metric('stage_rows', 'gauge', 'Rows processed per pipeline stage.',
+               [('', {'stage': stage['name']}, stage['rows']) for stage in report['stages'] if 'rows' in stage])
+
+        samples = []
+        for name, histogram in sorted(self.histograms.items()):
+            for bound, count in histogram.cumulative():
+                samples.append(('_bucket', {'operation': name, 'le': bound}, count))
+            samples.append(('_sum', {'operation': name}, histogram.total))
+            samples.append(('_count', {'operation': name}, histogram.count))
+        metric('latency_seconds', 'histogram', 'Latency of provider calls and DB statements.', samples)
+
+        metric('cache_requests_total', 'counter', 'Cache lookups by result.', [
+            ('', {'cache': name, 'result': result}, stats[key])
+            for name, stats in report['caches'].items() for result, key in (('hit', 'hits'), ('miss', 'misses'))
+        ])
+        metric('events_total', 'counter', 'Other accumulated run values.',
+               [('', {'event': name}, value) for name, value in report['counters'].items()])
+        if 'memory' in report:
+            records = report['memory']['stages']
+            metric('stage_rss_peak_bytes', 'gauge', 'Peak resident set size per stage.',
+                   [('', {'stage': record['stage']}, int(record['rss_peak_mb'] * _MB))
+                    for record in records if record['rss_peak_mb'] is not None])
+            metric('stage_traced_peak_bytes', 'gauge', 'Peak tracemalloc-traced Python memory per stage.',
+                   [('', {'stage': record['stage']}, int(record['traced_peak_mb'] * _MB)) for record in records])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> str:
+        """textfile collector가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체한다"""
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fp:
+            fp.write(self.prometheus_text())
+        os.replace(temp_path, path)
+        return path
+
+    def write_reports(self, timestamp: str | None = None, directory: str = '.') -> list[str]:
+        """pipeline_metrics_{timestamp}.json (+ METRICS_PROMETHEUS_DIR/smoking_pipeline_{pipeline}.prom)"""
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = [self.write_json(os.path.join(directory, f'pipeline_metrics_{timestamp}.json'))]
+
+        prometheus_path = self.prometheus_path()
+        if prometheus_path:
+            paths.append(self.write_prometheus(prometheus_path))
+        return paths
+
+    def prometheus_path(self) -> str | None:
+        """METRICS_PROMETHEUS_DIR/smoking_pipeline_{pipeline}.prom (설정이 없으면 None)"""
+        prometheus_dir = os.getenv('METRICS_PROMETHEUS_DIR', '').strip('"')
+        if not prometheus_dir:
+            return None
+        os.makedirs(prometheus_dir, exist_ok=True)
+        return os.path.join(prometheus_dir, f'{PROMETHEUS_PREFIX}_{self.pipeline}.prom')
+
+    def print_summary(self):
+        report = self.to_dict()
+        print(f"\n⏱️ 단계별 소요 시간 (전체 {report['wall_seconds']:.2f}초)")
+        for stage in report['stages']:
+            line = f"  {stage['name']:<24} {stage['seconds']:9.3f}초"
+            if stage.get('rows_per_sec'):
+                line += f" | {stage['rows']:,}행 ({stage['rows_per_sec']:,.1f}행/초)"
+            print(line)
+        for name, histogram in report['latency'].items():
+            print(f"  {name:<24} {histogram['count']:7,}회 | p50 {histogram['p50_ms']:.1f}ms "
+                  f"p95 {histogram['p95_ms']:.1f}ms max {histogram['max_ms']:.1f}ms")
+        for name, cache in report['caches'].items():
+            if cache['hit_rate'] is not None:
+                print(f"  {name:<24} 캐시 적중률 {cache['hit_rate'] * 100:.1f}% "
+                      f"({cache['hits']:,}/{cache['hits'] + cache['misses']:,})")
+        if 'memory' in report:
+            print(f"\n🧠 단계별 메모리 (최고 RSS 기준: {report['memory']['rss_peak_scope']})")
+            for record in report['memory']['stages']:
+                line = (f"  {record['stage']:<24} RSS 최고 {record['rss_peak_mb'] or 0:8.1f}MB | "
+                        f"Python 최고 {record['traced_peak_mb']:8.1f}MB (증가 {record['traced_growth_mb']:.1f}MB)")
+                if record['top_allocations']:
+                    top = record['top_allocations'][0]
+                    line += f" | 최대 증가 {top['location']} {top['size_diff_kb'] / 1024:.1f}MB"
+                print(line)
+
+
+def _labels(labels: dict) -> str:
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    if value is None:
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_shared_metrics: PipelineMetrics | None = None
+_shared_lock = threading.Lock()
+
+
+def pipeline_metrics(pipeline: str | None = None) -> PipelineMetrics:
+    """프로세스 전체가 공유하는 메트릭 수집기 (처음 이름을 넘긴 진입점의 pipeline 이름을 쓴다)"""
+    global _shared_metrics
+
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = PipelineMetrics(pipeline or 'pipeline')
+            if os.getenv('METRICS_MEMORY', '').strip('"').lower() in {'1', 'true', 'yes'}:
+                _shared_metrics.track_memory()
+        elif pipeline and _shared_metrics.pipeline == 'pipeline':
+            _shared_metrics.pipeline = pipeline
+        return _shared_metrics
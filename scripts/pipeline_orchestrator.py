@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""전처리 → 검증 → 좌표 → DB 적재 → 우편번호 보정을 한 번에 돌리는 DAG 실행기
+
+    preview ─┐
+             │ (서로 독립 - 병렬 실행)
+    validate ──▶ add_coordinates ──▶ db_setup ──▶ fix_postcodes
+
+- 단계마다 입력 파일(앞 단계 출력 포함), 코드(스크립트와 그 스크립트가 import하는 scripts/ 모듈), 설정(환경변수)을
+  해시한 키로 .pipeline_cache/<단계>/<키>/ 에 출력과 manifest.json을 남기고, 키가 같으면 다시 돌리지 않는다
+- 각 단계는 기존 스크립트를 그 캐시 폴더를 작업 디렉토리로 하는 별도 프로세스로 실행한다
+  (타임스탬프 파일명은 그대로 두고 선언한 glob으로 출력을 찾는다)
+- DB 단계(db_setup, fix_postcodes)는 DB 상태가 출력이라 파일로 확인할 수 없다 - DB를 따로 초기화했다면 --force db_setup
+
+    python3 pipeline_orchestrator.py --input data/total_smoking_place.csv
+    python3 pipeline_orchestrator.py --plan                     # 실행 없이 단계별 캐시 상태만
+    python3 pipeline_orchestrator.py --until add_coordinates     # 해당 단계와 선행 단계만
+"""
+
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from pipeline_metrics import pipeline_metrics
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = '.pipeline_cache'
+DEFAULT_INPUT = 'data/total_smoking_place.csv'
+DEFAULT_WORKERS = 2
+MANIFEST = 'manifest.json'
+STAGE_LOG = 'stage.log'
+# 캐시 키 구성이 바뀌면 올려서 기존 캐시를 모두 무효화한다
+CACHE_FORMAT = 1
+
+DB_CONFIG_ENV = ('DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER')
+
+
+@dataclass(frozen=True)
+class StageOutput:
+    """앞 단계 출력 참조 (stage 단계의 outputs[name])"""
+    stage: str
+    name: str
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    script: str
+    args: tuple = ()
+    # 환경변수 이름 → 파일 경로 또는 StageOutput
+    inputs: dict = field(default_factory=dict)
+    # 파일을 주고받지 않지만 순서가 필요한 선행 단계 (선행 단계가 다시 돌면 이 단계도 다시 돈다)
+    after: tuple = ()
+    # 출력 이름 → 작업 폴더 안 glob (여러 개면 마지막 것)
+    outputs: dict = field(default_factory=dict)
+    # 값이 바뀌면 다시 돌려야 하는 환경변수 (API 키/비밀번호는 넣지 않는다)
+    config_env: tuple = ()
+    # import로 찾을 수 없는 코드 파일 glob (scripts/ 기준, 예: 마이그레이션)
+    extra_code: tuple = ()
+
+    @property
+    def dependencies(self) -> list[str]:
+        upstream = [ref.stage for ref in self.inputs.values() if isinstance(ref, StageOutput)]
+        return list(dict.fromkeys(upstream + list(self.after)))
+
+
+def default_stages(input_csv: str) -> tuple[Stage, ...]:
+    return (
+        Stage('preview', 'old/preview_and_test.py', inputs={'PREPROCESSED_CSV': input_csv}),
+        Stage('validate', 'old/validate_preprocessed_data.py',
+              inputs={'PREPROCESSED_CSV': input_csv},
+              outputs={'validated_csv': 'validated_total_smoking_place_*.csv',
+                       'report': 'validation_report_*.json'}),
+        Stage('add_coordinates', 'add_coordinates.py',
+              inputs={'INPUT_CSV': StageOutput('validate', 'validated_csv')},
+              outputs={'final_csv': 'final_smoking_places_with_coordinates_*.csv',
+                       'summary': 'final_summary_*.json'},
+              config_env=('KAKAO_API_URL',)),
+        Stage('db_setup', 'database_manager.py', args=('setup',),
+              inputs={'FINAL_CSV': StageOutput('add_coordinates', 'final_csv')},
+              outputs={'api_data': 'smoking_areas_api_data_*.json'},
+              config_env=DB_CONFIG_ENV + ('REGION_BOUNDARY_DIR',),
+              extra_code=('migrations/*.sql', 'migrations/*.py')),
+        Stage('fix_postcodes', 'fix_postal_codes.py', after=('db_setup',), config_env=DB_CONFIG_ENV),
+    )
+
+
+class StageFailed(Exception):
+    pass
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _local_imports(path: str) -> set[str]:
+    """path가 import하는 모듈 중 scripts/ (또는 같은 폴더)에 있는 파일"""
+    with open(path, 'rb') as fp:
+        tree = ast.parse(fp.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+
+    found = set()
+    for name in names:
+        for directory in (os.path.dirname(path), SCRIPTS_DIR):
+            candidate = os.path.join(directory, f'{name}.py')
+            if os.path.exists(candidate):
+                found.add(os.path.abspath(candidate))
+                break
+    return found
+
+
+class PipelineOrchestrator:
+    def __init__(self, stages, cache_dir: str = DEFAULT_CACHE_DIR, workers: int = DEFAULT_WORKERS,
+                 force: set[str] | None = None, python: str = sys.executable):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.workers = workers
+        self.force = force or set()
+        self.python = python
+        self.metrics = pipeline_metrics('orchestrator')
+        self._code_hashes: dict[str, str] = {}
+        self._file_hash_index_path = os.path.join(self.cache_dir, 'file_hashes.json')
+        self._file_hash_index = self._load_json(self._file_hash_index_path) or {}
+
+        for stage in stages:
+            unknown = [name for name in stage.dependencies if name not in self.stages]
+            if unknown:
+                raise ValueError(f"{stage.name}: 알 수 없는 선행 단계 {unknown}")
+
+    @staticmethod
+    def _load_json(path: str):
+        try:
+            with open(path, encoding='utf-8') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def _input_hash(self, path: str) -> str:
+        """외부 입력 파일 해시 (크기/수정시각이 같으면 지난번 해시 재사용)"""
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise StageFailed(f"입력 파일 없음: {path}")
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        cached = self._file_hash_index.get(path)
+        if cached and cached[:2] == signature:
+            return cached[2]
+        digest = file_sha256(path)
+        self._file_hash_index[path] = signature + [digest]
+        return digest
+
+    def _code_version(self, stage: Stage) -> dict[str, str]:
+        script = os.path.join(SCRIPTS_DIR, stage.script)
+        seen, queue = set(), [os.path.abspath(script)]
+        while queue:
+            path = queue.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            queue.extend(_local_imports(path) - seen)
+        for pattern in stage.extra_code:
+            seen.update(os.path.abspath(path) for path in glob.glob(os.path.join(SCRIPTS_DIR, pattern)))
+
+        version = {}
+        for path in sorted(seen):
+            if path not in self._code_hashes:
+                self._code_hashes[path] = file_sha256(path)
+            version[os.path.relpath(path, SCRIPTS_DIR)] = self._code_hashes[path]
+        return version
+
+    def stage_key(self, stage: Stage, manifests: dict[str, dict]) -> tuple[str, dict[str, str]]:
+        """(캐시 키, 실행 시 넘길 환경변수 → 입력 경로)"""
+        input_paths, input_hashes = {}, {}
+        for env_name, ref in stage.inputs.items():
+            if isinstance(ref, StageOutput):
+                output = manifests[ref.stage]['outputs'].get(ref.name)
+                if output is None:
+                    raise StageFailed(f"{ref.stage} 단계에 {ref.name} 출력이 없습니다")
+                input_paths[env_name] = os.path.join(manifests[ref.stage]['directory'], output['path'])
+                input_hashes[env_name] = output['sha256']
+            else:
+                input_paths[env_name] = os.path.abspath(ref)
+                input_hashes[env_name] = self._input_hash(ref)
+
+        material = {
+            'format': CACHE_FORMAT,
+            'stage': stage.name,
+            'command': [stage.script, *stage.args],
+            'code': self._code_version(stage),
+            'config': {name: os.getenv(name) for name in stage.config_env},
+            'inputs': input_hashes,
+            'outputs': stage.outputs,
+            'after': {name: manifests[name]['run_id'] for name in stage.after},
+        }
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest(), input_paths
+
+    def _stage_dir(self, stage: Stage, key: str) -> str:
+        return os.path.join(self.cache_dir, stage.name, key[:16])
+
+    def cached_manifest(self, stage: Stage, key: str) -> dict | None:
+        directory = self._stage_dir(stage, key)
+        manifest = self._load_json(os.path.join(directory, MANIFEST))
+        if not manifest or manifest.get('key') != key:
+            return None
+        if not all(os.path.exists(os.path.join(directory, output['path'])) for output in manifest['outputs'].values()):
+            return None
+        manifest['directory'] = directory
+        return manifest
+
+    def execute(self, stage: Stage, key: str, input_paths: dict[str, str]) -> dict:
+        directory = self._stage_dir(stage, key)
+        partial = f'{directory}.partial'
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+
+        command = [self.python, os.path.join(SCRIPTS_DIR, stage.script), *stage.args]
+        env = dict(os.environ, **input_paths)
+        started = datetime.now()
+        start = time.perf_counter()
+        with open(os.path.join(partial, STAGE_LOG), 'w', encoding='utf-8') as log:
+            returncode = subprocess.run(
+                command, cwd=partial, env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            ).returncode
+        seconds = time.perf_counter() - start
+        self.metrics.observe(f'stage.{stage.name}', seconds)
+        if returncode != 0:
+            raise StageFailed(f"종료 코드 {returncode} (로그: {os.path.join(partial, STAGE_LOG)})")
+
+        outputs = {}
+        for name, pattern in stage.outputs.items():
+            matches = sorted(glob.glob(os.path.join(partial, pattern)))
+            if not matches:
+                raise StageFailed(f"출력 {name} ({pattern})이 만들어지지 않았습니다 (로그: {os.path.join(partial, STAGE_LOG)})")
+            outputs[name] = {'path': os.path.basename(matches[-1]), 'sha256': file_sha256(matches[-1])}
+
+        manifest = {
+            'stage': stage.name,
+            'key': key,
+            'run_id': f'{started.isoformat()}#{key[:16]}',
+            'command': command[1:],
+            'inputs': input_paths,
+            'outputs': outputs,
+            'started': started.isoformat(),
+            'seconds': round(seconds, 3),
+        }
+        with open(os.path.join(partial, MANIFEST), 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(partial, directory)
+        manifest['directory'] = directory
+        return manifest
+
+    def select(self, until: str | None = None) -> list[str]:
+        """위상 정렬된 실행 대상 (until이 있으면 그 단계와 선행 단계만)"""
+        order, visiting = [], set()
+
+        def visit(name: str):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"순환 의존: {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].dependencies:
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in ([until] if until else self.stages):
+            visit(name)
+        return order
+
+    def plan(self, until: str | None = None):
+        """실행 없이 캐시 상태 출력 (앞 단계가 캐시에 없으면 그 뒤는 알 수 없음)"""
+        manifests = {}
+        for name in self.select(until):
+            stage = self.stages[name]
+            if any(dependency not in manifests for dependency in stage.dependencies):
+                print(f"  ❔ {name}: 앞 단계 실행 후 결정")
+                continue
+            try:
+                key, _ = self.stage_key(stage, manifests)
+            except StageFailed as e:
+                print(f"  ❌ {name}: {e}")
+                continue
+            manifest = None if name in self.force else self.cached_manifest(stage, key)
+            if manifest:
+                manifests[name] = manifest
+                print(f"  ✅ {name}: 캐시 ({manifest['started']}, {manifest['seconds']}초) {manifest['directory']}")
+            else:
+                print(f"  🔄 {name}: 실행 필요 ({key[:16]})")
+
+    def run(self, until: str | None = None) -> dict[str, dict]:
+        selected = self.select(until)
+        pending = list(selected)
+        manifests: dict[str, dict] = {}
+        failed: dict[str, str] = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    blocked = [dependency for dependency in stage.dependencies if dependency in failed]
+                    if blocked:
+                        pending.remove(name)
+                        failed[name] = f"선행 단계 실패 ({', '.join(blocked)})"
+                        print(f"  ⏭️ {name}: {failed[name]}")
+                        continue
+                    if any(dependency not in manifests for dependency in stage.dependencies):
+                        continue
+
+                    pending.remove(name)
+                    try:
+                        key, input_paths = self.stage_key(stage, manifests)
+                    except StageFailed as e:
+                        failed[name] = str(e)
+                        print(f"  ❌ {name}: {e}")
+                        continue
+                    manifest = None if name in self.force else self.cached_manifest(stage, key)
+                    self.metrics.cache('stage_output', manifest is not None)
+                    if manifest:
+                        manifests[name] = manifest
+                        print(f"  ✅ {name}: 캐시 사용 ({key[:16]}, 원래 {manifest['seconds']}초)")
+                    else:
+                        print(f"  ▶️ {name}: 실행 ({key[:16]})")
+                        running[pool.submit(self.execute, stage, key, input_paths)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        manifests[name] = future.result()
+                        print(f"  ✅ {name}: 완료 ({manifests[name]['seconds']}초)")
+                    except StageFailed as e:
+                        failed[name] = str(e)
+                        print(f"  ❌ {name}: {e}")
+
+        self._write_latest(manifests)
+        with open(self._file_hash_index_path, 'w', encoding='utf-8') as fp:
+            json.dump(self._file_hash_index, fp, ensure_ascii=False)
+        if failed:
+            raise StageFailed(', '.join(failed))
+        return manifests
+
+    def _write_latest(self, manifests: dict[str, dict]):
+        """단계별 최근 출력 경로 (latest.json) - 캐시 폴더를 뒤지지 않고 결과를 찾을 수 있게"""
+        path = os.path.join(self.cache_dir, 'latest.json')
+        latest = self._load_json(path) or {}
+        for name, manifest in manifests.items():
+            latest[name] = {
+                'directory': manifest['directory'],
+                'outputs': {output: os.path.join(manifest['directory'], value['path'])
+                            for output, value in manifest['outputs'].items()},
+                'started': manifest['started'],
+            }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(latest, fp, ensure_ascii=False, indent=2)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description='Run the smoking-area data pipeline as a cached DAG of stages.')
+    parser.add_argument('--input', default=DEFAULT_INPUT, help='Preprocessed source CSV (total_smoking_place.csv).')
+    parser.add_argument('--cache-dir', default=os.getenv('PIPELINE_CACHE_DIR', DEFAULT_CACHE_DIR))
+    parser.add_argument('--until', default=None, help='Run only this stage and the stages it depends on.')
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help='Re-run a stage even if its cached output is current (repeatable, or "all").')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Independent stages run in parallel.')
+    parser.add_argument('--plan', action='store_true', help='Show which stages are cached without running anything.')
+    args = parser.parse_args()
+
+    # 스크립트들이 읽는 .env를 캐시 키의 설정 값에도 반영
+    load_dotenv(os.path.join(SCRIPTS_DIR, '.env'))
+    stages = default_stages(args.input)
+    force = {stage.name for stage in stages} if 'all' in args.force else set(args.force)
+    orchestrator = PipelineOrchestrator(stages, args.cache_dir, args.workers, force)
+    for name in sorted(force | ({args.until} if args.until else set())):
+        if name not in orchestrator.stages:
+            parser.error(f'unknown stage: {name} (choose from {", ".join(orchestrator.stages)})')
+
+    if args.plan:
+        print(f"🗺️ 파이프라인 계획 (캐시: {orchestrator.cache_dir})")
+        orchestrator.plan(args.until)
+        return
+
+    print(f"🚀 파이프라인 실행 (캐시: {orchestrator.cache_dir}, 병렬 {args.workers})")
+    start = time.perf_counter()
+    try:
+        manifests = orchestrator.run(args.until)
+    except StageFailed as e:
+        print(f"\n❌ 실패한 단계: {e}")
+        sys.exit(1)
+    finally:
+        orchestrator.metrics.write_reports(directory=orchestrator.cache_dir)
+
+    print(f"\n🎉 완료 ({time.perf_counter() - start:.1f}초)")
+    for name, manifest in manifests.items():
+        for output, value in manifest['outputs'].items():
+            print(f"  📄 {name}.{output}: {os.path.join(manifest['directory'], value['path'])}")
+
+
+if __name__ == '__main__':
+    main()
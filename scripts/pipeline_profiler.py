@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""진입점 공용 --profile 모드
+
+- cProfile: pipeline_metrics 단계(stage)마다 별도 Profile로 나눠 기록하고, 전체 합본과 단계별 .pstats를 남긴다
+- 샘플링 스레드: interval마다 모든 스레드의 호출 스택을 모아 flamegraph.pl / speedscope가 읽는
+  collapsed stack 파일(`단계;함수;함수 횟수`)로 남긴다 - 카카오 호출 대기나 작업자 스레드도 보인다
+- 요약: 단계별 tottime 상위 함수 텍스트 (_pick_numeric, _clean_str 같은 행 단위 헬퍼가 따로 드러난다)
+
+    with profile_run('reseed', enabled=args.profile):
+        seeder.run()
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from pipeline_metrics import pipeline_metrics
+
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+OUTSIDE_STAGE = '(no stage)'
+# 라이브러리 함수에 묻히지 않도록 이 폴더 코드만 따로 순위를 매긴다
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_UNSAFE_NAME = re.compile(r'[^0-9A-Za-z가-힣_.-]+')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ',')
+
+
+class PipelineProfiler:
+    def __init__(self, name: str, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.name = name
+        self.interval = interval
+        self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.samples: Counter = Counter()
+        self._stages: list[str] = []
+        self._active: cProfile.Profile | None = None
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    @property
+    def section(self) -> str:
+        return '/'.join(self._stages) or OUTSIDE_STAGE
+
+    def _switch(self):
+        if self._active is not None:
+            self._active.disable()
+        profile = self.profiles.get(self.section)
+        if profile is None:
+            profile = self.profiles[self.section] = cProfile.Profile()
+        self._active = profile
+        profile.enable()
+
+    # pipeline_metrics 단계 경계에서 호출된다
+    def enter_stage(self, name: str):
+        self._stages.append(name)
+        self._switch()
+
+    def exit_stage(self, name: str):
+        if self._stages and self._stages[-1] == name:
+            self._stages.pop()
+        self._switch()
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            section = self.section
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                stack.append(section)
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        metrics = pipeline_metrics()
+        metrics.stage_listeners.append(self)
+        self._switch()
+        self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if self._active is not None:
+            self._active.disable()
+            self._active = None
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        listeners = pipeline_metrics().stage_listeners
+        if self in listeners:
+            listeners.remove(self)
+
+    def _stats(self, profiles) -> pstats.Stats | None:
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        return stats
+
+    def summary_text(self, limit: int = TOP_FUNCTIONS) -> str:
+        stream = io.StringIO()
+        for section, profile in self.profiles.items():
+            stats = self._stats([profile])
+            if stats is None:
+                continue
+            stream.write(f'===== {section} =====\n')
+            stats.stream = stream
+            stats.sort_stats('tottime').print_stats(limit)
+            stream.write(f'----- {section}: scripts/ 함수 -----\n')
+            stats.print_stats(re.escape(SCRIPTS_DIR), limit)
+        return stream.getvalue()
+
+    def write(self, directory: str = '.') -> list[str]:
+        """{name}_profile_{timestamp}.pstats (+ 단계별 .pstats, .collapsed, .txt)"""
+        base = os.path.join(directory, f'{self.name}_profile_{self.timestamp}')
+        paths = []
+
+        combined = self._stats(self.profiles.values())
+        if combined is not None:
+            combined.dump_stats(f'{base}.pstats')
+            paths.append(f'{base}.pstats')
+        for section, profile in self.profiles.items():
+            stats = self._stats([profile])
+            if stats is None:
+                continue
+            path = f'{base}.{_UNSAFE_NAME.sub("_", section).strip("_") or "main"}.pstats'
+            stats.dump_stats(path)
+            paths.append(path)
+
+        with open(f'{base}.collapsed', 'w', encoding='utf-8') as fp:
+            for stack, count in sorted(self.samples.items()):
+                fp.write(f'{stack} {count}\n')
+        paths.append(f'{base}.collapsed')
+
+        with open(f'{base}.txt', 'w', encoding='utf-8') as fp:
+            fp.write(self.summary_text())
+        paths.append(f'{base}.txt')
+        return paths
+
+    def print_top(self, limit: int = 10):
+        stats = self._stats(self.profiles.values())
+        if stats is None:
+            return
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        own = [entry for entry in entries if entry[0][0].startswith(SCRIPTS_DIR)]
+        for title, selected in ((f'자체 시간(tottime) 상위 {limit}개 함수', entries),
+                                (f'scripts/ 함수 자체 시간 상위 {limit}개', own)):
+            print(f"\n🔥 {title}")
+            for (filename, line, function), (_, calls, tottime, cumtime, _) in selected[:limit]:
+                print(f"  {tottime:8.3f}초 (누적 {cumtime:8.3f}초) {calls:>9,}회  "
+                      f"{function} ({os.path.basename(filename)}:{line})")
+
+
+@contextmanager
+def profile_run(name: str, enabled: bool = True, interval: float = DEFAULT_SAMPLE_INTERVAL, directory: str = '.'):
+    """enabled일 때만 블록 전체를 프로파일링하고 끝나면 결과 파일을 남긴다"""
+    if not enabled:
+        yield None
+        return
+
+    profiler = PipelineProfiler(name, interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.print_top()
+        for path in profiler.write(directory):
+            print(f"  프로파일 저장: {path}")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""카카오 API 호출용 토큰 버킷 (스레드 안전)
+
+같은 프로세스의 모든 카카오 호출(좌표 변환, 역지오코딩)이 kakao_rate_limiter() 하나를 공유해
+동시 작업자가 늘어나도 초당 호출 수가 KAKAO_RATE_LIMIT(기본: 1 / API_DELAY)를 넘지 않게 한다.
+"""
+
+import os
+import threading
+import time
+
+# API_DELAY가 없을 때의 호출 간격(초) - 기존 reseed_from_raw 기본값(가장 보수적인 값)을 유지한다
+DEFAULT_API_DELAY = 0.2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 확보할 때까지 기다리고 대기한 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_shared_limiter: TokenBucket | None = None
+_shared_lock = threading.Lock()
+
+
+def kakao_rate_limiter() -> TokenBucket:
+    """프로세스 전체가 공유하는 카카오 API 토큰 버킷"""
+    global _shared_limiter
+
+    with _shared_lock:
+        if _shared_limiter is None:
+            rate = os.getenv('KAKAO_RATE_LIMIT', '').strip('"')
+            if rate:
+                rate = float(rate)
+            else:
+                # 기존 API_DELAY(호출 간격, 초) 설정과 호환
+                delay = os.getenv('API_DELAY', '').strip('"')
+                rate = 1.0 / max(float(delay) if delay else DEFAULT_API_DELAY, 0.001)
+            _shared_limiter = TokenBucket(rate)
+        return _shared_limiter
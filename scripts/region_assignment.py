@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""행정구역 경계 폴리곤(시도/시군구/읍면동) 기반 지역 코드 배정
+
+REGION_BOUNDARY_DIR 폴더의 sido.geojson, sigungu.geojson, emd.geojson(WGS84)을 읽어
+레벨별 STR-tree를 만들고, 좌표 배열 전체를 한 번에 point-in-polygon 질의한다.
+
+경계 폴리곤은 DB에 없으므로 API(api_server)로 들어온 제보는 지역 코드 없이 저장된다.
+이 스크립트를 주기적으로(예: cron) 실행하면 코드가 빈 행만 골라 채운다.
+
+    python3 region_assignment.py                  # 지역 코드가 빈 행만
+    python3 region_assignment.py --all            # 전체 재계산
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely.geometry import shape
+except ImportError:  # 경계 기반 배정을 쓰지 않는 환경
+    shapely = None
+
+
+REGION_LEVELS = ('sido', 'sigungu', 'emd')
+REGION_COLUMNS = tuple(f'{level}_code' for level in REGION_LEVELS)
+
+# 공개 경계 데이터마다 코드 속성명이 달라 후보를 순서대로 확인한다
+CODE_PROPERTY_CANDIDATES = {
+    'sido': ['sido_code', 'CTPRVN_CD', 'SIDO_CD', 'sido'],
+    'sigungu': ['sigungu_code', 'SIG_CD', 'SIGUNGU_CD', 'sgg'],
+    'emd': ['emd_code', 'EMD_CD', 'ADM_DR_CD', 'adm_cd'],
+}
+
+
+def boundary_dir_from_env() -> str | None:
+    boundary_dir = os.getenv('REGION_BOUNDARY_DIR', '').strip('"')
+    return boundary_dir if boundary_dir and os.path.isdir(boundary_dir) else None
+
+
+class RegionAssigner:
+    def __init__(self, boundary_dir: str):
+        self.boundary_dir = boundary_dir
+        if shapely is None:
+            raise RuntimeError('지역 코드 배정에는 shapely 2.x가 필요합니다 (pip install shapely).')
+
+        self.trees = {}
+        self.codes: dict[str, np.ndarray] = {}
+
+        for level in REGION_LEVELS:
+            path = os.path.join(boundary_dir, f'{level}.geojson')
+            if not os.path.exists(path):
+                continue
+            geometries, codes = self._load_level(path, CODE_PROPERTY_CANDIDATES[level])
+            self.trees[level] = shapely.STRtree(geometries)
+            self.codes[level] = np.asarray(codes, dtype=object)
+            print(f"  🗺️ {level} 경계 {len(codes)}개 로드")
+
+        if not self.trees:
+            raise RuntimeError(f'경계 파일을 찾을 수 없습니다: {boundary_dir}')
+
+    @staticmethod
+    def _load_level(path: str, code_candidates: list[str]) -> tuple[list, list[str]]:
+        with open(path, 'r', encoding='utf-8') as fp:
+            collection = json.load(fp)
+
+        geometries = []
+        codes = []
+        for feature in collection.get('features', []):
+            properties = feature.get('properties') or {}
+            code = next((properties[key] for key in code_candidates if properties.get(key)), None)
+            if code is None or not feature.get('geometry'):
+                continue
+            geometries.append(shape(feature['geometry']))
+            codes.append(str(code))
+        return geometries, codes
+
+    def assign(self, latitudes, longitudes) -> dict[str, np.ndarray]:
+        """좌표 배열에 대해 레벨별 지역 코드 배열(object, 미배정은 None)을 반환"""
+        points = shapely.points(np.asarray(longitudes, dtype=float), np.asarray(latitudes, dtype=float))
+        result = {}
+        for level in REGION_LEVELS:
+            assigned = np.full(len(points), None, dtype=object)
+            tree = self.trees.get(level)
+            if tree is not None and len(points):
+                point_idx, polygon_idx = tree.query(points, predicate='within')
+                # 경계선 위의 점은 여러 폴리곤에 걸릴 수 있으므로 첫 번째만 사용
+                point_idx, first = np.unique(point_idx, return_index=True)
+                assigned[point_idx] = self.codes[level][polygon_idx[first]]
+            result[level] = assigned
+        return result
+
+    def assign_rows(self, latitudes, longitudes) -> list[tuple]:
+        """REGION_COLUMNS 순서의 튜플 목록"""
+        assigned = self.assign(latitudes, longitudes)
+        return list(zip(*(assigned[level] for level in REGION_LEVELS)))
+
+    def backfill(self, cursor, batch_size: int = 20000, only_missing: bool = True) -> int:
+        """DB의 기존 행에 지역 코드를 배치 단위로 채운다
+
+        batch_size씩 id 순으로 이어서 읽어(id > 마지막 id) 전체 행을 한 번에 메모리에 올리지 않는다.
+        """
+        from psycopg2.extras import execute_values
+
+        missing = f'AND {REGION_COLUMNS[0]} IS NULL' if only_missing else ''
+        assignments = ', '.join(f'{column} = v.{column}' for column in REGION_COLUMNS)
+        total = 0
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"""
+                SELECT id, latitude::float8, longitude::float8 FROM smoking_areas
+                WHERE id > %s {missing}
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            batch = cursor.fetchall()
+            if not batch:
+                return total
+            last_id = batch[-1][0]
+
+            ids = [row[0] for row in batch]
+            codes = self.assign_rows([row[1] for row in batch], [row[2] for row in batch])
+            execute_values(
+                cursor,
+                f"""
+                UPDATE smoking_areas AS s SET {assignments}
+                FROM (VALUES %s) AS v (id, {', '.join(REGION_COLUMNS)})
+                WHERE s.id = v.id
+                """,
+                [(row_id, *code) for row_id, code in zip(ids, codes)],
+            )
+            total += len(batch)
+            if len(batch) < batch_size:
+                return total
+
+
+_cached_assigner: RegionAssigner | None = None
+
+
+def region_codes_for(latitudes, longitudes) -> list[tuple]:
+    """REGION_BOUNDARY_DIR이 설정되어 있으면 지역 코드를, 아니면 None 튜플을 반환"""
+    global _cached_assigner
+
+    boundary_dir = boundary_dir_from_env()
+    if boundary_dir is None:
+        return [(None,) * len(REGION_COLUMNS)] * len(latitudes)
+
+    if _cached_assigner is None or _cached_assigner.boundary_dir != boundary_dir:
+        _cached_assigner = RegionAssigner(boundary_dir)
+    return _cached_assigner.assign_rows(latitudes, longitudes)
+
+
+def main():
+    import psycopg2
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description='Assign administrative region codes to smoking areas.')
+    parser.add_argument('--boundaries', default=None, help='Boundary GeoJSON directory (default: REGION_BOUNDARY_DIR).')
+    parser.add_argument('--all', action='store_true', help='Recompute codes for every row, not only missing ones.')
+    args = parser.parse_args()
+
+    load_dotenv()
+    boundary_dir = args.boundaries or boundary_dir_from_env()
+    if not boundary_dir:
+        print("❌ 경계 폴더를 지정하세요 (--boundaries 또는 REGION_BOUNDARY_DIR).")
+        return
+
+    assigner = RegionAssigner(boundary_dir)
+    connection = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5432'),
+        database=os.getenv('DB_NAME', 'smoking_areas_db'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+    try:
+        with connection:
+            with connection.cursor() as cursor:
+                updated = assigner.backfill(cursor, only_missing=not args.all)
+        print(f"✅ {updated}개 행에 지역 코드 배정 완료")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,6 @@
 
 import argparse
 import os
-import time
 import json
 from datetime import datetime
 
@@ -13,19 +12,34 @@ import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from coordinate_validation import flag_coordinates
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+from rate_limiter import kakao_rate_limiter
+from schema_migrations import SchemaMigrator
+from spatial_cells import CELL_COLUMNS, cell_keys
+from region_assignment import REGION_COLUMNS, region_codes_for
+from spatial_dedupe import DEFAULT_RADIUS_M, dedupe_rows, write_review_csv
+
 
 RAW_CSV_PATH = os.path.join('old', 'data', 'smoking_place_raw.csv')
 
+INSERT_SQL = (
+    'INSERT INTO smoking_areas (category, submitted_category, address, detail, postal_code, longitude, latitude, '
+    f'status, report_count, created_at, updated_at, {", ".join(CELL_COLUMNS + REGION_COLUMNS)}) VALUES %s'
+)
+
 
 class RawSmokingAreaSeeder:
-    def __init__(self, csv_path: str = RAW_CSV_PATH, mode: str = 'replace'):
+    def __init__(self, csv_path: str = RAW_CSV_PATH, mode: str = 'replace', dedupe_radius: float | None = None):
         load_dotenv()
 
         self.csv_path = csv_path
         self.mode = mode if mode in {'replace', 'append'} else 'replace'
+        self.dedupe_radius = dedupe_radius
+        self.metrics = pipeline_metrics('reseed')
         self.kakao_api_key = os.getenv('KAKAO_API_KEY')
         self.kakao_api_url = os.getenv('KAKAO_API_URL', 'https://dapi.kakao.com/v2/local/search/address.json')
-        self.api_delay = float(os.getenv('API_DELAY', 0.2))
 
         self.db_config = {
             'host': os.getenv('DB_HOST', 'localhost').strip('"'),
@@ -89,6 +103,38 @@ class RawSmokingAreaSeeder:
                 continue
         return None
 
+    def _row_fields(self, row: pd.Series) -> tuple[str | None, str, str, str | None, float | None, float | None]:
+        """원본 행 → (검색어, 카테고리, 주소, 상세, 기존 위도, 기존 경도)"""
+        query = self._build_query(row)
+        category = self._clean_str(row.get('카테고리')) or '공공데이타'
+        if category != '시민제보':
+            category = '공공데이타'
+        raw_address = self._clean_str(row.get('주소'))
+        detail = self._clean_str(row.get('상세')) or None
+        address = raw_address or query or ''
+
+        lat, lon = self._extract_existing_coord(row)
+        return query, category, address, detail, lat, lon
+
+    @staticmethod
+    def _build_record(category: str, address: str, detail: str | None, lat: float, lon: float) -> tuple:
+        """INSERT_SQL 컬럼 순서의 레코드 (행정구역 코드는 검증/중복 제거 뒤 일괄로 붙인다)"""
+        now = datetime.utcnow()
+        return (
+            category,
+            None,  # submitted_category
+            address,
+            detail,
+            None,
+            lon,
+            lat,
+            'active',
+            0,
+            now,
+            now,
+            *cell_keys(lat, lon),
+        )
+
     def _geocode_with_kakao(self, query: str) -> tuple[float | None, float | None, dict]:
         headers = {'Authorization': f'KakaoAK {self.kakao_api_key}'}
         params = {
@@ -96,7 +142,9 @@ class RawSmokingAreaSeeder:
             'analyze_type': 'similar',
         }
 
-        response = requests.get(self.kakao_api_url, headers=headers, params=params, timeout=10)
+        self.metrics.observe('kakao.rate_limit_wait', kakao_rate_limiter().acquire())
+        with self.metrics.timer('kakao.address_search'):
+            response = requests.get(self.kakao_api_url, headers=headers, params=params, timeout=10)
         meta = {'status_code': response.status_code}
 
         if response.status_code != 200:
@@ -125,25 +173,29 @@ class RawSmokingAreaSeeder:
         try:
             with conn:
                 with conn.cursor() as cur:
-                    self._ensure_table_shape(cur)
+                    with self.metrics.timer('db.migrate'):
+                        SchemaMigrator(conn).migrate(cur)
                     if self.mode == 'replace':
-                        cur.execute('TRUNCATE TABLE smoking_areas RESTART IDENTITY CASCADE;')
-                        execute_values(
-                            cur,
-                            'INSERT INTO smoking_areas (category, submitted_category, address, detail, postal_code, longitude, latitude, status, report_count, created_at, updated_at) VALUES %s',
-                            records,
-                        )
+                        with self.metrics.timer('db.truncate'):
+                            cur.execute('TRUNCATE TABLE smoking_areas RESTART IDENTITY CASCADE;')
+                        with self.metrics.timer('db.insert'):
+                            execute_values(
+                                cur,
+                                INSERT_SQL,
+                                records,
+                            )
                         print(f'  ↳ {len(records)}개 레코드로 테이블을 재구성했습니다.')
                         return
 
                     # append 모드: 기존 레코드와 중복을 피하며 신규만 추가
-                    cur.execute(
-                        """
-                        SELECT LOWER(TRIM(address)), LOWER(COALESCE(detail, ''))
-                        FROM smoking_areas
-                        """
-                    )
-                    existing_keys = {tuple(row) for row in cur.fetchall()}
+                    with self.metrics.timer('db.select_existing_keys'):
+                        cur.execute(
+                            """
+                            SELECT LOWER(TRIM(address)), LOWER(COALESCE(detail, ''))
+                            FROM smoking_areas
+                            """
+                        )
+                        existing_keys = {tuple(row) for row in cur.fetchall()}
 
                     new_records: list[tuple] = []
                     for record in records:
@@ -161,68 +213,59 @@ class RawSmokingAreaSeeder:
                         print('  ↳ 추가할 신규 레코드가 없어 데이터베이스는 변경되지 않았습니다.')
                         return
 
-                    execute_values(
-                        cur,
-                        'INSERT INTO smoking_areas (category, submitted_category, address, detail, postal_code, longitude, latitude, status, report_count, created_at, updated_at) VALUES %s',
-                        new_records,
-                    )
+                    with self.metrics.timer('db.insert'):
+                        execute_values(
+                            cur,
+                            INSERT_SQL,
+                            new_records,
+                        )
                     print(f'  ↳ 신규 {len(new_records)}개 레코드를 데이터베이스에 추가했습니다.')
         finally:
             conn.close()
 
-    @staticmethod
-    def _ensure_table_shape(cursor):
-        cursor.execute(
-            """
-            SELECT column_name FROM information_schema.columns
-            WHERE table_name = 'smoking_areas'
-            """
-        )
-        existing_columns = {row[0] for row in cursor.fetchall()}
-
-        migrations: list[tuple[str, str]] = [
-            (
-                'submitted_category',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS submitted_category VARCHAR(20);",
-            ),
-            (
-                'detail',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS detail TEXT;",
-            ),
-            (
-                'postal_code',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS postal_code VARCHAR(10);",
-            ),
-            (
-                'status',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS status VARCHAR(10) DEFAULT 'active';",
-            ),
-            (
-                'report_count',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS report_count INTEGER DEFAULT 0;",
-            ),
-            (
-                'created_at',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;",
-            ),
-            (
-                'updated_at',
-                "ALTER TABLE smoking_areas ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;",
-            ),
+    def _validate_records(self, records: list[tuple]) -> list[tuple]:
+        """국내 범위/축 뒤바뀜/0 좌표/시군구 이상치 행을 격리 CSV로 빼낸다"""
+        issues = flag_coordinates(
+            [record[6] for record in records],
+            [record[5] for record in records],
+            [record[2] for record in records],
+        ).tolist()
+        quarantined = [(record, issue) for record, issue in zip(records, issues) if issue]
+        if not quarantined:
+            return records
+
+        quarantine_path = f'quarantine_coordinates_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.csv'
+        pd.DataFrame(
+            [
+                {'category': record[0], 'address': record[2], 'detail': record[3],
+                 'latitude': record[6], 'longitude': record[5], 'coordinate_issue': issue}
+                for record, issue in quarantined
+            ]
+        ).to_csv(quarantine_path, index=False, encoding='utf-8-sig')
+        print(f'  좌표 검증: {len(quarantined)}개 격리 (격리 파일: {quarantine_path})')
+        return [record for record, issue in zip(records, issues) if not issue]
+
+    def _dedupe_records(self, records: list[tuple]) -> list[tuple]:
+        """근접 좌표 + 유사 주소 클러스터를 검토 CSV로 남기고, 정규화한 주소+상세까지 같은 행만 제거한다"""
+        rows = [
+            {'category': record[0], 'address': record[2], 'detail': record[3],
+             'latitude': record[6], 'longitude': record[5]}
+            for record in records
         ]
+        keep, clusters = dedupe_rows(rows, self.dedupe_radius, exact_only=True)
+        if not clusters:
+            print(f'  중복 후보 없음 (반경 {self.dedupe_radius:.0f}m)')
+            return records
 
-        for column, statement in migrations:
-            if column not in existing_columns:
-                cursor.execute(statement)
-
-        # 기존 행에 상태/리포트 카운트 기본값 채우기 (없을 경우만)
-        if 'status' not in existing_columns:
-            cursor.execute("UPDATE smoking_areas SET status = COALESCE(status, 'active');")
-        if 'report_count' not in existing_columns:
-            cursor.execute("UPDATE smoking_areas SET report_count = COALESCE(report_count, 0);")
+        review_path = f'dedupe_clusters_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.csv'
+        write_review_csv(review_path, clusters, rows)
+        print(f'  중복 후보 클러스터 {len(clusters)}개, 주소까지 같은 {len(records) - len(keep)}개 제거 (검토 파일: {review_path})')
+        return [records[index] for index in keep]
 
     def run(self):
-        df = self.load_dataframe()
+        with self.metrics.stage('load_csv') as stage:
+            df = self.load_dataframe()
+            stage.rows = len(df)
         total_rows = len(df)
         print(f'총 {total_rows}개 행 로드')
 
@@ -232,58 +275,54 @@ class RawSmokingAreaSeeder:
         api_calls = 0
         failures: list[dict] = []
 
-        for idx, row in df.iterrows():
-            query = self._build_query(row)
-            category = self._clean_str(row.get('카테고리')) or '공공데이타'
-            if category != '시민제보':
-                category = '공공데이타'
-            raw_address = self._clean_str(row.get('주소'))
-            detail = self._clean_str(row.get('상세')) or None
-            address = raw_address or query or ''
+        with self.metrics.stage('geocode', rows=total_rows):
+            for idx, row in df.iterrows():
+                query, category, address, detail, lat, lon = self._row_fields(row)
 
-            lat, lon = self._extract_existing_coord(row)
+                meta: dict[str, object] = {}
 
-            meta: dict[str, object] = {}
+                if lat is not None and lon is not None:
+                    reused += 1
+                    self.metrics.cache('existing_coordinates', hit=True)
+                else:
+                    if not query:
+                        failures.append({'index': idx, 'reason': '주소/상세 미존재'})
+                        continue
 
-            if lat is not None and lon is not None:
-                reused += 1
-            else:
-                if not query:
-                    failures.append({'index': idx, 'reason': '주소/상세 미존재'})
-                    continue
+                    self.metrics.cache('existing_coordinates', hit=False)
+                    lat, lon, meta = self._geocode_with_kakao(query)
+                    api_calls += 1
 
-                lat, lon, meta = self._geocode_with_kakao(query)
-                api_calls += 1
-                # 속도 제한
-                time.sleep(self.api_delay)
+                if lat is None or lon is None:
+                    failures.append({'index': idx, 'query': query, 'meta': meta})
+                    continue
 
-            if lat is None or lon is None:
-                failures.append({'index': idx, 'query': query, 'meta': meta})
-                continue
+                records.append(self._build_record(category, address, detail, lat, lon))
+                successes += 1
 
-            records.append((
-                category,
-                None,  # submitted_category
-                address,
-                detail,
-                None,
-                lon,
-                lat,
-                'active',
-                0,
-                datetime.utcnow(),
-                datetime.utcnow(),
-            ))
-            successes += 1
-
-            if successes % 25 == 0:
-                print(f'  진행 상황: {successes}/{total_rows} (API 호출 {api_calls}회, 기존 좌표 재사용 {reused}개)')
+                if successes % 25 == 0:
+                    print(f'  진행 상황: {successes}/{total_rows} (API 호출 {api_calls}회, 기존 좌표 재사용 {reused}개)')
 
+        self.metrics.increment('geocode_failures', len(failures))
         if not records:
             raise RuntimeError('삽입할 데이터가 없습니다. 원본 CSV와 카카오 응답을 확인하세요.')
 
         print(f'좌표 확보 완료: 총 {successes}개, API 호출 {api_calls}회, 기존 좌표 재사용 {reused}개, 실패 {len(failures)}개')
 
+        with self.metrics.stage('validate_coordinates', rows=len(records)):
+            records = self._validate_records(records)
+        if not records:
+            raise RuntimeError('좌표 검증을 통과한 데이터가 없습니다. 격리 파일을 확인하세요.')
+
+        if self.dedupe_radius:
+            with self.metrics.stage('dedupe', rows=len(records)):
+                records = self._dedupe_records(records)
+
+        # 행정구역 코드 일괄 배정 (경계 데이터가 설정된 경우)
+        with self.metrics.stage('assign_regions', rows=len(records)):
+            region_codes = region_codes_for([record[6] for record in records], [record[5] for record in records])
+            records = [record + codes for record, codes in zip(records, region_codes)]
+
         if failures:
             failure_log = {
                 'timestamp': datetime.utcnow().isoformat(),
@@ -299,9 +338,14 @@ class RawSmokingAreaSeeder:
             print(f'  실패 내역 저장: {failure_path}')
 
         print('데이터베이스 업데이트 시작')
-        self._insert_records(records)
+        with self.metrics.stage('db_insert', rows=len(records)):
+            self._insert_records(records)
         print('데이터베이스 업데이트 완료')
 
+        self.metrics.print_summary()
+        for path in self.metrics.write_reports(datetime.utcnow().strftime('%Y%m%d_%H%M%S')):
+            print(f'  메트릭 저장: {path}')
+
 
 def main():
     parser = argparse.ArgumentParser(description='Seed smoking area data into PostgreSQL.')
@@ -318,10 +362,36 @@ def main():
         help='Insertion mode: replace truncates the table, append adds only new rows.',
     )
 
+    parser.add_argument(
+        '--dedupe',
+        nargs='?',
+        type=float,
+        const=DEFAULT_RADIUS_M,
+        default=None,
+        metavar='RADIUS_M',
+        help=f'Write near-duplicate clusters within RADIUS_M meters to a review CSV and drop rows whose normalized '
+             f'address and detail exactly match (default radius: {DEFAULT_RADIUS_M:.0f}).',
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Write cProfile stats and collapsed stacks per stage (reseed_profile_*.pstats/.collapsed).',
+    )
+
+    parser.add_argument(
+        '--memory',
+        action='store_true',
+        help='Record peak RSS and top tracemalloc allocations per stage in the metrics report.',
+    )
+
     args = parser.parse_args()
 
-    seeder = RawSmokingAreaSeeder(csv_path=args.csv_path, mode=args.mode)
-    seeder.run()
+    if args.memory:
+        pipeline_metrics('reseed').track_memory()
+    with profile_run('reseed', enabled=args.profile):
+        seeder = RawSmokingAreaSeeder(csv_path=args.csv_path, mode=args.mode, dedupe_radius=args.dedupe)
+        seeder.run()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""좌표로부터 주소/우편번호 역지오코딩 백필 (api_server/scripts/updateCitizenReportAddresses.js의 병렬 버전)
+
+- 대상: 주소가 비었거나 좌표 형식("서울특별시 (37.5553, 126.9098)")인 행, 우편번호가 없는 행
+- 좌표를 수 m 격자로 스냅한 키로 캐시해 인접한 제보가 같은 조회 결과를 공유한다
+- 조회는 ThreadPoolExecutor로 동시에 보내되 rate_limiter의 공유 토큰 버킷을 지킨다
+- 결과는 청크마다 UPDATE ... FROM (VALUES ...) 한 번으로 반영한다
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import psycopg2
+import requests
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+from pipeline_metrics import pipeline_metrics
+from pipeline_profiler import profile_run
+from rate_limiter import kakao_rate_limiter
+
+
+DEFAULT_COORD2ADDRESS_URL = 'https://dapi.kakao.com/v2/local/geo/coord2address.json'
+COORDINATE_ADDRESS_PATTERN = r'\(\d+\.\d+,?\s*\d+\.\d+\)'
+
+DEFAULT_SNAP_METERS = 5.0
+DEFAULT_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 500
+MAX_RETRIES = 3
+
+SELECT_SQL = f"""
+    SELECT id, latitude::float8, longitude::float8,
+           (address IS NULL OR TRIM(address) = '' OR address ~ '{COORDINATE_ADDRESS_PATTERN}') AS needs_address,
+           (postal_code IS NULL OR TRIM(postal_code) = '') AS needs_postal_code
+    FROM smoking_areas
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+      AND (
+        address IS NULL OR TRIM(address) = '' OR address ~ '{COORDINATE_ADDRESS_PATTERN}'
+        OR postal_code IS NULL OR TRIM(postal_code) = ''
+      )
+    ORDER BY id
+"""
+
+UPDATE_SQL = """
+    UPDATE smoking_areas AS s
+    SET address = COALESCE(v.address, s.address),
+        postal_code = COALESCE(v.postal_code, s.postal_code)
+    FROM (VALUES %s) AS v (id, address, postal_code)
+    WHERE s.id = v.id
+"""
+
+
+def snap_key(latitude: float, longitude: float, snap_meters: float = DEFAULT_SNAP_METERS) -> tuple[int, int]:
+    """약 snap_meters 간격 격자의 셀 번호 (경도 간격은 위도에 맞춰 보정)"""
+    lat_step = snap_meters / 111_320.0
+    lon_step = lat_step / max(math.cos(math.radians(latitude)), 1e-6)
+    return round(latitude / lat_step), round(longitude / lon_step)
+
+
+class ReverseGeocoder:
+    def __init__(self, api_key: str, snap_meters: float = DEFAULT_SNAP_METERS, cache_path: str | None = None):
+        self.api_key = api_key
+        self.api_url = os.getenv('KAKAO_COORD2ADDRESS_URL', DEFAULT_COORD2ADDRESS_URL)
+        self.snap_meters = snap_meters
+        self.cache_path = cache_path
+        self.cache: dict[str, dict | None] = {}
+        self.api_calls = 0
+        self.cache_hits = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.limiter = kakao_rate_limiter()
+        self.metrics = pipeline_metrics('reverse_geocode')
+
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as fp:
+                self.cache = json.load(fp)
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['Authorization'] = f'KakaoAK {self.api_key}'
+            self._local.session = session
+        return session
+
+    def _cache_key(self, latitude: float, longitude: float) -> str:
+        lat_cell, lon_cell = snap_key(latitude, longitude, self.snap_meters)
+        return f'{lat_cell}:{lon_cell}'
+
+    def _request(self, latitude: float, longitude: float) -> tuple[bool, dict | None]:
+        """(응답 성공 여부, {'address': 도로명(없으면 지번) 주소, 'postal_code': 우편번호} 또는 None)
+
+        해당 좌표에 주소가 없는 경우는 성공 + None으로 캐시하고, 오류는 캐시하지 않아 다음 실행에서 다시 시도한다.
+        """
+        for attempt in range(MAX_RETRIES):
+            self.metrics.observe('kakao.rate_limit_wait', self.limiter.acquire())
+            with self._lock:
+                self.api_calls += 1
+            try:
+                with self.metrics.timer('kakao.coord2address'):
+                    response = self._session().get(
+                        self.api_url, params={'x': longitude, 'y': latitude}, timeout=5,
+                    )
+            except requests.RequestException as e:
+                print(f"  ⚠️ API 오류 ({latitude}, {longitude}): {e}")
+                time.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code != 200:
+                print(f"  ❌ API 오류 {response.status_code}: {response.text[:200]}")
+                return False, None
+
+            documents = response.json().get('documents') or []
+            if not documents:
+                return True, None
+            road_address = documents[0].get('road_address') or {}
+            address = documents[0].get('address') or {}
+            return True, {
+                'address': road_address.get('address_name') or address.get('address_name'),
+                'postal_code': road_address.get('zone_no') or None,
+            }
+        return False, None
+
+    def lookup_many(self, points: list[tuple[float, float]], workers: int = DEFAULT_WORKERS) -> list[dict | None]:
+        """좌표 목록을 스냅 키 단위로 한 번씩만 조회해 결과를 입력 순서대로 반환"""
+        keys = [self._cache_key(lat, lon) for lat, lon in points]
+        pending = {}
+        for key, point in zip(keys, points):
+            if key in self.cache:
+                self.cache_hits += 1
+            elif key not in pending:
+                pending[key] = point
+            else:
+                self.cache_hits += 1
+        self.metrics.cache('reverse_geocode', hit=True, count=len(points) - len(pending))
+        self.metrics.cache('reverse_geocode', hit=False, count=len(pending))
+
+        resolved = {}
+        if pending:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._request, lat, lon): key for key, (lat, lon) in pending.items()}
+                for future in as_completed(futures):
+                    ok, result = future.result()
+                    resolved[futures[future]] = result
+                    if ok:
+                        self.cache[futures[future]] = result
+
+        return [self.cache[key] if key in self.cache else resolved.get(key) for key in keys]
+
+    def save_cache(self):
+        if self.cache_path:
+            with open(self.cache_path, 'w', encoding='utf-8') as fp:
+                json.dump(self.cache, fp, ensure_ascii=False)
+
+
+def backfill(connection, geocoder: ReverseGeocoder, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             workers: int = DEFAULT_WORKERS, limit: int | None = None, dry_run: bool = False) -> dict:
+    cursor = connection.cursor()
+    cursor.execute(SELECT_SQL + (f' LIMIT {int(limit)}' if limit else ''))
+    rows = cursor.fetchall()
+    print(f"📊 역지오코딩 대상 {len(rows)}개")
+
+    stats = {'total': len(rows), 'updated': 0, 'failed': 0}
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        results = geocoder.lookup_many([(row[1], row[2]) for row in chunk], workers)
+
+        values = []
+        for (area_id, _, _, needs_address, needs_postal_code), result in zip(chunk, results):
+            if not result:
+                stats['failed'] += 1
+                continue
+            address = result['address'] if needs_address else None
+            postal_code = result['postal_code'] if needs_postal_code else None
+            if address is None and postal_code is None:
+                stats['failed'] += 1
+                continue
+            values.append((area_id, address, postal_code))
+
+        if values and not dry_run:
+            with geocoder.metrics.timer('db.update_chunk'):
+                execute_values(cursor, UPDATE_SQL, values, template='(%s, %s::text, %s::text)', page_size=len(values))
+                connection.commit()
+        stats['updated'] += len(values)
+        print(f"  진행: {min(start + chunk_size, len(rows))}/{len(rows)} "
+              f"(반영 {stats['updated']}, 실패 {stats['failed']}, API {geocoder.api_calls}회, 캐시 적중 {geocoder.cache_hits}회)")
+
+    cursor.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill addresses and postal codes by reverse geocoding.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--snap-meters', type=float, default=DEFAULT_SNAP_METERS,
+                        help='Coordinates within this grid share one lookup.')
+    parser.add_argument('--cache', default=None, help='JSON file to persist lookups across runs.')
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help='Resolve addresses without updating the DB.')
+    parser.add_argument('--profile', action='store_true', help='Write cProfile stats and collapsed stacks.')
+    parser.add_argument('--memory', action='store_true', help='Record per-stage peak memory in the metrics report.')
+    args = parser.parse_args()
+
+    if args.memory:
+        pipeline_metrics('reverse_geocode').track_memory()
+
+    load_dotenv()
+    api_key = os.getenv('KAKAO_API_KEY') or os.getenv('KAKAO_REST_API_KEY')
+    if not api_key:
+        print("❌ KAKAO_API_KEY가 설정되지 않았습니다.")
+        return
+
+    geocoder = ReverseGeocoder(api_key, args.snap_meters, args.cache)
+    connection = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5432'),
+        database=os.getenv('DB_NAME', 'smoking_areas_db'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+    try:
+        start = time.perf_counter()
+        with profile_run('reverse_geocode', enabled=args.profile):
+            with geocoder.metrics.stage('reverse_geocode') as stage:
+                stats = backfill(connection, geocoder, args.chunk_size, args.workers, args.limit, args.dry_run)
+                stage.rows = stats['total']
+        elapsed = time.perf_counter() - start
+    finally:
+        connection.close()
+        geocoder.save_cache()
+
+    print(f"✅ 완료 ({elapsed:.1f}초): 반영 {stats['updated']}개, 실패 {stats['failed']}개, "
+          f"API {geocoder.api_calls}회, 캐시 적중 {geocoder.cache_hits}회")
+    geocoder.metrics.write_reports()
+    if args.dry_run:
+        print("⚠️ DRY RUN 모드였습니다. 데이터베이스는 변경되지 않았습니다.")
+
+
+if __name__ == '__main__':
+    main()
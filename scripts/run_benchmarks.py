@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""데이터 파이프라인 핫패스 벤치마크 (크기별 측정 + 기준선 비교)
+
+- CSV 로드/인코딩 탐지, 주소 정규화, 기존 좌표 추출(_extract_existing_coord), 레코드 생성,
+  좌표 검증, execute_values / COPY 적재(임시 테이블), JSON 내보내기, 로컬 모의 카카오 서버 지오코딩
+- 크기마다 repeat회 실행한 최선값을 benchmark_results_{timestamp}.json에 남긴다
+- --baseline 파일과 비교해 허용 비율(--tolerance)보다 느려진 항목이 있으면 종료 코드 1
+
+    python3 run_benchmarks.py --sizes 1000,10000 --update-baseline   # 기준선 저장
+    python3 run_benchmarks.py --sizes 1000,10000                      # 비교 (회귀 시 실패)
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from synthetic_dataset import generate_frame
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = '1000,10000'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.3
+# 이보다 작은 차이는 측정 잡음으로 보고 회귀로 치지 않는다
+DEFAULT_MIN_DELTA_MS = 5.0
+
+BENCHMARKS: dict[str, tuple] = {}
+
+
+def benchmark(name: str, max_size: int | None = None, needs_db: bool = False):
+    """setup(size, context) → (측정할 함수, 처리 행 수)를 등록"""
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_size, needs_db)
+        return setup
+    return register
+
+
+class _BenchContext:
+    def __init__(self, seed: int, workdir: str):
+        self.seed = seed
+        self.workdir = workdir
+        self._frames: dict[int, pd.DataFrame] = {}
+        self._seeder = None
+        self._connection = None
+        self._connection_failed = False
+        self.mock_server = None
+
+    def frame(self, size: int) -> pd.DataFrame:
+        if size not in self._frames:
+            # smoking_place_raw.csv 스키마 (절반은 좌표 없음)
+            self._frames[size] = generate_frame(size, self.seed, missing_ratio=0.5)
+        return self._frames[size]
+
+    def csv_path(self, size: int, encoding: str = 'utf-8-sig') -> str:
+        path = os.path.join(self.workdir, f'raw_{size}_{encoding}.csv')
+        if not os.path.exists(path):
+            self.frame(size).to_csv(path, index=False, encoding=encoding)
+        return path
+
+    def seeder(self):
+        if self._seeder is None:
+            from reseed_from_raw import RawSmokingAreaSeeder
+            os.environ.setdefault('KAKAO_API_KEY', 'benchmark')
+            self._seeder = RawSmokingAreaSeeder()
+        return self._seeder
+
+    def records(self, size: int) -> list[tuple]:
+        from region_assignment import region_codes_for
+
+        seeder = self.seeder()
+        frame = self.frame(size)
+        lat = frame['latitude'].fillna(37.5).tolist()
+        lon = frame['longitutde'].fillna(127.0).tolist()
+        records = [
+            seeder._build_record(category, address, detail or None, la, lo)
+            for category, address, detail, la, lo in zip(frame['카테고리'], frame['주소'], frame['상세'], lat, lon)
+        ]
+        return [record + codes for record, codes in zip(records, region_codes_for(lat, lon))]
+
+    def connection(self):
+        """로컬 DB 연결 (실패하면 None - DB 벤치마크는 건너뛴다)"""
+        if self._connection is None and not self._connection_failed:
+            import psycopg2
+            try:
+                self._connection = psycopg2.connect(
+                    host=os.getenv('DB_HOST', 'localhost'),
+                    port=os.getenv('DB_PORT', '5432'),
+                    database=os.getenv('DB_NAME', 'smoking_areas_db'),
+                    user=os.getenv('DB_USER', 'postgres'),
+                    password=os.getenv('DB_PASSWORD', ''),
+                )
+            except psycopg2.Error as e:
+                print(f"  ⚠️ DB 연결 실패, DB 벤치마크 건너뜀: {e}")
+                self._connection_failed = True
+        return self._connection
+
+    def mock_url(self) -> str:
+        if self.mock_server is None:
+            self.mock_server = ThreadingHTTPServer(('127.0.0.1', 0), _MockKakaoHandler)
+            threading.Thread(target=self.mock_server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.mock_server.server_address[1]}/v2/local/search/address.json'
+
+    def close(self):
+        if self.mock_server is not None:
+            self.mock_server.shutdown()
+        if self._connection is not None:
+            self._connection.close()
+
+
+class _MockKakaoHandler(BaseHTTPRequestHandler):
+    """주소 검색 응답 형식만 흉내 내는 로컬 서버 (네트워크 지연 없이 클라이언트 비용만 잰다)"""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('query', [''])[0]
+        body = json.dumps({
+            'meta': {'total_count': 1},
+            'documents': [{'x': '126.9779', 'y': '37.5663', 'address_name': query, 'road_address': None}],
+        }, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ListCursor:
+    """stream_to_writers가 읽는 fetchmany만 제공하는 메모리 커서"""
+
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+        self.position = 0
+
+    def fetchmany(self, size: int) -> list[tuple]:
+        batch = self.rows[self.position:self.position + size]
+        self.position += size
+        return batch
+
+
+@benchmark('csv_load')
+def _bench_csv_load(size: int, context: _BenchContext):
+    seeder = context.seeder()
+    path = context.csv_path(size)
+
+    def run():
+        seeder.csv_path = path
+        return len(seeder.load_dataframe())
+    return run, size
+
+
+@benchmark('csv_encoding_detection')
+def _bench_encoding_detection(size: int, context: _BenchContext):
+    """cp949 → euc-kr → utf-8 순서로 시도하는 기존 검증기 경로 (UTF-8 파일이 가장 느린 경우)"""
+    sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'old'))
+    from full_address_validator import FullAddressValidator
+
+    validator = FullAddressValidator()
+    path = context.csv_path(size, 'utf-8')
+    return (lambda: len(validator.read_csv_with_encoding(path)[0])), size
+
+
+@benchmark('address_normalization')
+def _bench_address_normalization(size: int, context: _BenchContext):
+    from coordinate_validation import parse_districts
+    from spatial_dedupe import normalize_address
+
+    frame = context.frame(size)
+    addresses = frame['주소']
+    pairs = list(zip(frame['주소'].tolist(), frame['상세'].tolist()))
+
+    def run():
+        normalized = [normalize_address(address, detail) for address, detail in pairs]
+        parse_districts(addresses)
+        return len(normalized)
+    return run, size
+
+
+@benchmark('extract_existing_coord')
+def _bench_extract_existing_coord(size: int, context: _BenchContext):
+    seeder = context.seeder()
+    rows = [row for _, row in context.frame(size).iterrows()]
+
+    def run():
+        for row in rows:
+            seeder._extract_existing_coord(row)
+        return len(rows)
+    return run, size
+
+
+@benchmark('build_records')
+def _bench_build_records(size: int, context: _BenchContext):
+    """reseed 행 루프에서 지오코딩을 뺀 부분 (iterrows + 필드 정리 + 셀 키 계산)"""
+    seeder = context.seeder()
+    frame = context.frame(size)
+
+    def run():
+        records = []
+        for _, row in frame.iterrows():
+            _, category, address, detail, lat, lon = seeder._row_fields(row)
+            records.append(seeder._build_record(category, address, detail, lat or 37.5, lon or 127.0))
+        return len(records)
+    return run, size
+
+
+@benchmark('validate_coordinates')
+def _bench_validate_coordinates(size: int, context: _BenchContext):
+    from coordinate_validation import flag_coordinates
+
+    frame = context.frame(size)
+    lat = frame['latitude'].fillna(37.5)
+    lon = frame['longitutde'].fillna(127.0)
+    return (lambda: len(flag_coordinates(lat, lon, frame['주소']))), size
+
+
+def _bench_table(connection) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS bench_smoking_areas (LIKE smoking_areas INCLUDING DEFAULTS)')
+    connection.commit()
+    return 'bench_smoking_areas'
+
+
+@benchmark('db_execute_values', max_size=100_000, needs_db=True)
+def _bench_execute_values(size: int, context: _BenchContext):
+    from psycopg2.extras import execute_values
+    from reseed_from_raw import INSERT_SQL
+
+    connection = context.connection()
+    table = _bench_table(connection)
+    insert_sql = INSERT_SQL.replace('INSERT INTO smoking_areas ', f'INSERT INTO {table} ', 1)
+    records = context.records(size)
+
+    def run():
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {table}')
+            execute_values(cursor, insert_sql, records, page_size=1000)
+        connection.commit()
+        return len(records)
+    return run, size
+
+
+@benchmark('db_copy', max_size=100_000, needs_db=True)
+def _bench_copy(size: int, context: _BenchContext):
+    from reseed_from_raw import INSERT_SQL
+
+    connection = context.connection()
+    table = _bench_table(connection)
+    columns = INSERT_SQL.split('(', 1)[1].split(')', 1)[0]
+    records = context.records(size)
+
+    def run():
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {table}')
+            cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+        connection.commit()
+        return len(records)
+    return run, size
+
+
+@benchmark('json_export')
+def _bench_json_export(size: int, context: _BenchContext):
+    from export_writers import JsonExportWriter, stream_to_writers
+
+    frame = context.frame(size)
+    created_at = datetime(2025, 9, 20, 19, 0, 0)
+    rows = [
+        (index, category, None, address, detail or None, '04524', lon, lat, 0, created_at)
+        for index, (category, address, detail, lat, lon) in enumerate(zip(
+            frame['카테고리'], frame['주소'], frame['상세'],
+            frame['latitude'].fillna(37.5), frame['longitutde'].fillna(127.0),
+        ), 1)
+    ]
+    path = os.path.join(context.workdir, f'export_{size}.json')
+
+    def run():
+        writer = JsonExportWriter(path, metadata={'export_date': created_at.isoformat()})
+        return stream_to_writers(_ListCursor(rows), [writer])
+    return run, size
+
+
+@benchmark('geocode_mock_provider', max_size=2_000)
+def _bench_geocode(size: int, context: _BenchContext):
+    seeder = context.seeder()
+    seeder.kakao_api_url = context.mock_url()
+    queries = context.frame(size)['주소'].tolist()
+
+    def run():
+        for query in queries:
+            seeder._geocode_with_kakao(query)
+        return len(queries)
+    return run, size
+
+
+def _measure(func, repeat: int) -> tuple[list[float], int]:
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func()
+        timings.append(time.perf_counter() - start)
+    return timings, rows
+
+
+def run_benchmarks(names: list[str], sizes: list[int], repeat: int, seed: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix='smoking_bench_') as workdir:
+        context = _BenchContext(seed, workdir)
+        try:
+            for name in names:
+                setup, max_size, needs_db = BENCHMARKS[name]
+                if needs_db and context.connection() is None:
+                    continue
+                for size in sizes:
+                    if max_size and size > max_size:
+                        print(f"  {name:<24} {size:>9,}행  건너뜀 (최대 {max_size:,}행)")
+                        continue
+                    func, _ = setup(size, context)
+                    func()  # 워밍업 (임포트, 캐시, 연결)
+                    timings, rows = _measure(func, repeat)
+                    best = min(timings)
+                    result = {
+                        'benchmark': name,
+                        'size': size,
+                        'best_seconds': round(best, 6),
+                        'median_seconds': round(statistics.median(timings), 6),
+                        'rows_per_sec': round(rows / best, 1) if best > 0 else None,
+                    }
+                    results.append(result)
+                    print(f"  {name:<24} {size:>9,}행  최선 {best * 1000:10.2f}ms | "
+                          f"중앙값 {result['median_seconds'] * 1000:10.2f}ms | {result['rows_per_sec'] or 0:>12,.0f}행/초")
+        finally:
+            context.close()
+    return results
+
+
+def _result_key(result: dict) -> str:
+    return f"{result['benchmark']}@{result['size']}"
+
+
+def compare_with_baseline(results: list[dict], baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """허용치를 넘어 느려진 항목 설명 목록"""
+    previous = {_result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    print(f"\n📏 기준선 비교 (허용 {tolerance * 100:.0f}%, 최소 차이 {min_delta_ms:.0f}ms)")
+    for result in results:
+        before = previous.get(_result_key(result))
+        if before is None:
+            print(f"  🆕 {_result_key(result):<34} 기준선 없음")
+            continue
+        ratio = result['best_seconds'] / before['best_seconds'] if before['best_seconds'] else 1.0
+        delta_ms = (result['best_seconds'] - before['best_seconds']) * 1000
+        regressed = ratio > 1 + tolerance and delta_ms > min_delta_ms
+        mark = '❌' if regressed else ('🚀' if ratio < 1 - tolerance else '✅')
+        print(f"  {mark} {_result_key(result):<34} {before['best_seconds'] * 1000:10.2f}ms → "
+              f"{result['best_seconds'] * 1000:10.2f}ms ({ratio:5.2f}배)")
+        if regressed:
+            regressions.append(f"{_result_key(result)}: {ratio:.2f}배 느려짐 (+{delta_ms:.1f}ms)")
+    return regressions
+
+
+def _environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data pipeline hot paths and compare with a baseline.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma-separated dataset sizes.')
+    parser.add_argument('--only', default=None, help=f'Comma-separated subset of: {", ".join(BENCHMARKS)}.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark and size (best is kept).')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file to compare against.')
+    parser.add_argument('--update-baseline', action='store_true', help='Overwrite the baseline with this run.')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown ratio before failing (0.3 = 30%%).')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='Ignore slowdowns smaller than this many milliseconds.')
+    parser.add_argument('-o', '--output', default=None, help='Results file (default: benchmark_results_<timestamp>.json).')
+    args = parser.parse_args()
+
+    load_dotenv()
+    # 모의 서버 호출이 토큰 버킷에 막히지 않도록 (첫 호출 때 한 번 읽는다)
+    os.environ['KAKAO_RATE_LIMIT'] = '1000000'
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(value) for value in args.sizes.split(',')]
+
+    print(f"📊 파이프라인 벤치마크: {len(names)}개 항목, 크기 {', '.join(f'{size:,}' for size in sizes)}, 최선 {args.repeat}회")
+    results = run_benchmarks(names, sizes, args.repeat, args.seed)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'environment': _environment(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.output or f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as fp:
+        json.dump(report, fp, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as fp:
+            json.dump(report, fp, ensure_ascii=False, indent=2)
+        print(f"📌 기준선 갱신: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ 기준선 파일이 없습니다 ({args.baseline}). --update-baseline으로 먼저 저장하세요.")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as fp:
+        baseline = json.load(fp)
+    if baseline.get('environment') != report['environment']:
+        print("⚠️ 기준선과 실행 환경(Python/라이브러리/CPU)이 다릅니다. 비교 결과를 감안해서 보세요.")
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ 성능 회귀 {len(regressions)}건:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ 성능 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import importlib.util
+import os
+import re
+
+import psycopg2
+from psycopg2 import errors
+from dotenv import load_dotenv
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_([a-z0-9_]+)\.(sql|py)$')
+
+# 여러 프로세스가 동시에 마이그레이션하지 않도록 사용하는 advisory lock 키
+MIGRATION_LOCK_KEY = 7_402_026
+
+
+class SchemaMigrator:
+    """schema_version 테이블 기반 순차 마이그레이션 실행기
+
+    migrations/ 폴더의 `NNNN_설명.sql` 또는 `NNNN_설명.py` 파일을 번호 순으로 적용한다.
+    .py 마이그레이션은 `upgrade(cursor)` 함수를 정의해야 한다.
+    환경 때문에 작업을 건너뛸 수 있는 .py 마이그레이션은 건너뛰었을 때 upgrade()에서 False를 반환하고
+    `needs_reapply(cursor)`를 정의한다. 그 버전은 schema_version.incomplete로 표시되고,
+    migrate()는 표시된 버전에 대해서만 needs_reapply를 확인해 True면 다시 실행한다 (예: 나중에 설치한 PostGIS).
+    이미 최신 버전이고 표시된 버전이 없으면 버전 조회 쿼리 1회로 끝난다.
+    """
+
+    def __init__(self, connection, migrations_dir: str = MIGRATIONS_DIR):
+        self.connection = connection
+        self.migrations_dir = migrations_dir
+        self._modules = {}
+
+    def available_migrations(self) -> list[tuple[int, str, str]]:
+        """(버전, 이름, 경로) 목록을 버전 순으로 반환"""
+        migrations = []
+        for file_name in sorted(os.listdir(self.migrations_dir)):
+            match = MIGRATION_FILE_PATTERN.match(file_name)
+            if not match:
+                continue
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(self.migrations_dir, file_name)))
+
+        versions = [version for version, _, _ in migrations]
+        if len(versions) != len(set(versions)):
+            raise RuntimeError(f'마이그레이션 버전이 중복되었습니다: {self.migrations_dir}')
+        return migrations
+
+    def current_version(self, cursor) -> int:
+        return self.version_state(cursor)[0]
+
+    def version_state(self, cursor) -> tuple[int, list[int]]:
+        """(현재 버전, 작업을 건너뛰어 incomplete로 표시된 버전 목록)"""
+        cursor.execute('SAVEPOINT schema_version_check;')
+        try:
+            cursor.execute(
+                'SELECT COALESCE(MAX(version), 0), '
+                'COALESCE(array_agg(version ORDER BY version) FILTER (WHERE incomplete), %s) FROM schema_version;',
+                ([],),
+            )
+            version, incomplete = cursor.fetchone()
+        except errors.UndefinedTable:
+            cursor.execute('ROLLBACK TO SAVEPOINT schema_version_check;')
+            return 0, []
+        except errors.UndefinedColumn:
+            # incomplete 컬럼이 생기기 전의 schema_version (다음 잠금 구간에서 컬럼을 추가한다)
+            cursor.execute('ROLLBACK TO SAVEPOINT schema_version_check;')
+            cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version;')
+            version, incomplete = cursor.fetchone()[0], []
+        cursor.execute('RELEASE SAVEPOINT schema_version_check;')
+        return version, incomplete
+
+    @staticmethod
+    def _ensure_version_table(cursor):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                incomplete BOOLEAN NOT NULL DEFAULT FALSE
+            );
+            ALTER TABLE schema_version ADD COLUMN IF NOT EXISTS incomplete BOOLEAN NOT NULL DEFAULT FALSE;
+            """
+        )
+
+    def _load_module(self, path: str):
+        """.py 마이그레이션 모듈 (실행기 인스턴스마다 한 번만 import)"""
+        if path not in self._modules:
+            spec = importlib.util.spec_from_file_location(f'migration_{os.path.basename(path)[:-3]}', path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._modules[path] = module
+        return self._modules[path]
+
+    def _apply(self, cursor, path: str) -> bool:
+        """마이그레이션 실행 - 작업을 건너뛰었으면(upgrade()가 False 반환) False"""
+        if path.endswith('.sql'):
+            with open(path, 'r', encoding='utf-8') as fp:
+                cursor.execute(fp.read())
+            return True
+
+        return self._load_module(path).upgrade(cursor) is not False
+
+    def _reapply_ready(self, cursor, migrations, incomplete: list[int]) -> list[tuple[int, str, str]]:
+        """incomplete로 표시된 버전 중 needs_reapply(cursor)가 True인 것"""
+        ready = []
+        for version, name, path in migrations:
+            if version not in incomplete or not path.endswith('.py'):
+                continue
+            needs_reapply = getattr(self._load_module(path), 'needs_reapply', None)
+            if needs_reapply is not None and needs_reapply(cursor):
+                ready.append((version, name, path))
+        return ready
+
+    @staticmethod
+    def _record(cursor, version: int, name: str, complete: bool):
+        cursor.execute(
+            """
+            INSERT INTO schema_version (version, name, incomplete) VALUES (%s, %s, %s)
+            ON CONFLICT (version) DO UPDATE SET applied_at = CURRENT_TIMESTAMP, incomplete = EXCLUDED.incomplete;
+            """,
+            (version, name, not complete),
+        )
+
+    def migrate(self, cursor=None) -> int:
+        """미적용 마이그레이션(과 다시 실행할 수 있게 된 incomplete 마이그레이션)을 실행하고 적용한 개수를 반환
+
+        cursor를 넘기면 호출자의 트랜잭션 안에서 실행하고 커밋은 호출자에게 맡긴다.
+        """
+        owns_cursor = cursor is None
+        if owns_cursor:
+            cursor = self.connection.cursor()
+
+        try:
+            migrations = self.available_migrations()
+            latest = migrations[-1][0] if migrations else 0
+            current, incomplete = self.version_state(cursor)
+            if current >= latest and not (incomplete and self._reapply_ready(cursor, migrations, incomplete)):
+                return 0
+
+            # 동시 실행 방지 후 버전 재확인
+            cursor.execute('SELECT pg_advisory_xact_lock(%s);', (MIGRATION_LOCK_KEY,))
+            self._ensure_version_table(cursor)
+            current, incomplete = self.version_state(cursor)
+
+            applied = 0
+            for version, name, path in migrations:
+                if version <= current:
+                    continue
+                print(f"  🔧 마이그레이션 {version:04d}_{name} 적용")
+                self._record(cursor, version, name, self._apply(cursor, path))
+                applied += 1
+
+            for version, name, path in self._reapply_ready(cursor, migrations, incomplete):
+                if not self._apply(cursor, path):
+                    continue
+                print(f"  🔧 마이그레이션 {version:04d}_{name} 재적용 (건너뛴 작업 완료)")
+                self._record(cursor, version, name, True)
+                applied += 1
+
+            if owns_cursor:
+                self.connection.commit()
+            return applied
+
+        except Exception:
+            if owns_cursor:
+                self.connection.rollback()
+            raise
+        finally:
+            if owns_cursor:
+                cursor.close()
+
+    def reapply(self, version: int) -> bool:
+        """이미 기록된 마이그레이션을 다시 실행하고 작업을 모두 했는지 반환 (예: 확장 설치 후 재적용)"""
+        matches = [entry for entry in self.available_migrations() if entry[0] == version]
+        if not matches:
+            raise ValueError(f'마이그레이션 버전 {version}을(를) 찾을 수 없습니다.')
+        _, name, path = matches[0]
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s);', (MIGRATION_LOCK_KEY,))
+            self._ensure_version_table(cursor)
+            print(f"  🔧 마이그레이션 {version:04d}_{name} 재적용")
+            complete = self._apply(cursor, path)
+            self._record(cursor, version, name, complete)
+            self.connection.commit()
+            return complete
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations.')
+    parser.add_argument('--status', action='store_true', help='Show current/latest version without migrating.')
+    parser.add_argument('--reapply', type=int, metavar='VERSION', help='Re-run an already applied migration.')
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432'),
+        'database': os.getenv('DB_NAME', 'smoking_areas_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', ''),
+    }
+
+    connection = psycopg2.connect(**db_config)
+    try:
+        migrator = SchemaMigrator(connection)
+        if args.status:
+            with connection.cursor() as cursor:
+                current, incomplete = migrator.version_state(cursor)
+            migrations = migrator.available_migrations()
+            latest = migrations[-1][0] if migrations else 0
+            print(f"📋 스키마 버전: {current} (최신 {latest})")
+            if incomplete:
+                print(f"  ⚠️ 작업을 건너뛴 마이그레이션: {', '.join(map(str, incomplete))}")
+            return
+
+        if args.reapply is not None:
+            if migrator.reapply(args.reapply):
+                print(f"🎉 마이그레이션 {args.reapply} 재적용 완료")
+            else:
+                print(f"⚠️ 마이그레이션 {args.reapply}이(가) 이번에도 일부 작업을 건너뛰었습니다.")
+            return
+
+        applied = migrator.migrate()
+        if applied:
+            print(f"🎉 마이그레이션 {applied}개 적용 완료")
+        else:
+            print("✅ 스키마가 최신 상태입니다.")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""smoking-pipeline: 파이프라인 스크립트 통합 CLI
+
+    smoking-pipeline stats                   # database_manager.py stats
+    smoking-pipeline export json geojson     # database_manager.py export json geojson
+    smoking-pipeline seed --mode append      # reseed_from_raw.py --mode append
+    smoking-pipeline geocode | validate | fix-postcodes
+    smoking-pipeline --timings stats         # 모듈 import 시간과 로드된 무거운 라이브러리 출력
+
+- 이 파일은 표준 라이브러리와 pipeline_metrics만 import한다. pandas/requests/psycopg2/dotenv는
+  명령에 해당하는 스크립트를 import할 때 그 스크립트가 필요로 하는 만큼만 로드된다
+- 명령 모듈 import 시간(cli.import.<모듈>)과 명령 실행 직전까지의 시작 시간(cli.startup)을
+  pipeline_metrics 타이머로 기록하고, METRICS_PROMETHEUS_DIR이 있으면 .prom 파일로 남긴다
+- 명령 뒤의 인자는 기존 스크립트에 그대로 전달된다 (--profile, --memory 포함)
+"""
+
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+
+from pipeline_metrics import pipeline_metrics
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# 시작 시간을 좌우하는 라이브러리 (--timings에서 로드 여부를 보여준다)
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'psycopg2', 'dotenv')
+
+# 명령 → (scripts/ 기준 모듈 경로, 진입 함수, 스크립트에 앞에 붙일 인자, 설명)
+COMMANDS = {
+    'seed': ('reseed_from_raw', 'main', (), 'Seed smoking areas from the raw CSV via Kakao geocoding.'),
+    'geocode': ('add_coordinates', 'main', (), 'Add Kakao coordinates to the validated CSV ("geocode test" checks the API key).'),
+    'validate': ('old/validate_preprocessed_data', 'main', (), 'Validate preprocessed addresses with Postcodify.'),
+    'export': ('database_manager', 'main', ('export',), 'Export the database (formats: json geojson fgb compact clusters kdtree jsonl).'),
+    'stats': ('database_manager', 'main', ('stats',), 'Show database statistics and sample rows.'),
+    'fix-postcodes': ('fix_postal_codes', 'fix_postal_codes', (), 'Pad 4-digit postal codes in the database to 5 digits.'),
+}
+
+
+def _import_command(module_path: str):
+    """명령 모듈 import (scripts/old 모듈은 그 폴더를 sys.path에 추가)"""
+    directory, name = os.path.split(module_path)
+    search_dir = os.path.join(SCRIPTS_DIR, directory)
+    if search_dir not in sys.path:
+        sys.path.insert(0, search_dir)
+    return importlib.import_module(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='smoking-pipeline',
+        description='Smoking-area data pipeline commands.',
+        epilog='\n'.join(f'  {name:<14} {help_text}' for name, (*_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--timings', action='store_true', help='Print import/startup time and which heavy modules loaded.')
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help=f'One of: {", ".join(COMMANDS)}.')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments passed through to the command.')
+    args = parser.parse_args()
+
+    module_path, entry, prefix, _ = COMMANDS[args.command]
+    metrics = pipeline_metrics()
+    module_name = os.path.basename(module_path)
+
+    import_start = time.perf_counter()
+    module = _import_command(module_path)
+    import_seconds = time.perf_counter() - import_start
+    metrics.observe(f'cli.import.{module_name}', import_seconds)
+
+    # 기존 스크립트는 sys.argv를 직접 읽는다
+    sys.argv = [os.path.join(SCRIPTS_DIR, f'{module_path}.py'), *prefix, *args.args]
+    startup_seconds = time.perf_counter() - _START
+    metrics.observe('cli.startup', startup_seconds)
+    if args.timings:
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"⏱️ 시작 {startup_seconds * 1000:.0f}ms (import {module_name} {import_seconds * 1000:.0f}ms), "
+              f"로드된 라이브러리: {', '.join(loaded) or '없음'}")
+
+    try:
+        result = getattr(module, entry)()
+    finally:
+        # 명령이 .env를 읽은 뒤라 METRICS_PROMETHEUS_DIR도 반영된다
+        prometheus_path = metrics.prometheus_path()
+        if prometheus_path:
+            metrics.write_prometheus(prometheus_path)
+    return 1 if result is False else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""확장 없이 쓰는 계층형 공간 셀 키 (Web Mercator 타일 + Morton/quadkey 정수)
+
+줌 z의 셀 키는 타일 (x, y)의 비트를 교차 배치한 정수이므로
+상위 셀은 하위 키를 2비트씩 오른쪽으로 민 값과 같고, 인접한 셀은 가까운 정수 범위로 모인다.
+"""
+
+import math
+
+from psycopg2.extras import execute_values
+
+
+CELL_ZOOMS = (10, 13, 16)
+CELL_COLUMNS = tuple(f'cell_z{zoom}' for zoom in CELL_ZOOMS)
+
+EARTH_RADIUS_M = 6371000.0
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def _interleave(x: int, y: int, zoom: int) -> int:
+    key = 0
+    for bit in range(zoom):
+        key |= ((x >> bit) & 1) << (2 * bit)
+        key |= ((y >> bit) & 1) << (2 * bit + 1)
+    return key
+
+
+def tile_xy(latitude: float, longitude: float, zoom: int) -> tuple[int, int]:
+    """위경도를 줌 레벨의 타일 좌표로 변환"""
+    lat = max(min(latitude, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    n = 1 << zoom
+    x = int((longitude + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def cell_key(latitude: float, longitude: float, zoom: int) -> int:
+    # 마이그레이션 0012의 smoking_area_cell_key()와 같은 계산 (바꾸면 함께 바꾼다)
+    x, y = tile_xy(latitude, longitude, zoom)
+    return _interleave(x, y, zoom)
+
+
+def cell_keys(latitude: float, longitude: float) -> tuple[int, ...]:
+    """CELL_COLUMNS 순서의 셀 키 튜플"""
+    return tuple(cell_key(latitude, longitude, zoom) for zoom in CELL_ZOOMS)
+
+
+def _merge_ranges(keys: list[int]) -> list[tuple[int, int]]:
+    ranges: list[tuple[int, int]] = []
+    for key in sorted(set(keys)):
+        if ranges and key == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], key)
+        else:
+            ranges.append((key, key))
+    return ranges
+
+
+def cover_ranges(latitude: float, longitude: float, radius_meters: float, max_cells: int = 16) -> tuple[str, list[tuple[int, int]]]:
+    """(lat, lng, radius) 원을 덮는 셀 키 범위 계산
+
+    max_cells 이하의 셀로 덮을 수 있는 가장 세밀한 줌을 골라
+    (컬럼명, [(시작키, 끝키), ...])를 반환한다.
+    """
+    dlat = math.degrees(radius_meters / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlng = math.degrees(radius_meters / (EARTH_RADIUS_M * cos_lat))
+
+    south, north = latitude - dlat, latitude + dlat
+    west, east = longitude - dlng, longitude + dlng
+
+    for zoom, column in sorted(zip(CELL_ZOOMS, CELL_COLUMNS), reverse=True):
+        x_min, y_min = tile_xy(north, west, zoom)
+        x_max, y_max = tile_xy(south, east, zoom)
+        cell_count = (x_max - x_min + 1) * (y_max - y_min + 1)
+        if cell_count > max_cells and zoom != CELL_ZOOMS[0]:
+            continue
+
+        keys = [
+            _interleave(x, y, zoom)
+            for x in range(x_min, x_max + 1)
+            for y in range(y_min, y_max + 1)
+        ]
+        return column, _merge_ranges(keys)
+
+    raise AssertionError('unreachable')
+
+
+def cell_prefilter_sql(latitude: float, longitude: float, radius_meters: float, max_cells: int = 16) -> tuple[str, list[int]]:
+    """WHERE 절에 넣을 셀 범위 조건과 파라미터
+
+    셀 키가 아직 계산되지 않은 행(마이그레이션 0012의 트리거가 설치되기 전에 들어온 행 등)은 정확한 거리 검사로 넘긴다.
+    """
+    column, ranges = cover_ranges(latitude, longitude, radius_meters, max_cells)
+    clauses = []
+    params: list[int] = []
+    for start, end in ranges:
+        if start == end:
+            clauses.append(f'{column} = %s')
+            params.append(start)
+        else:
+            clauses.append(f'{column} BETWEEN %s AND %s')
+            params.extend([start, end])
+    clauses.append(f'{column} IS NULL')
+    return '(' + ' OR '.join(clauses) + ')', params
+
+
+def backfill_missing_cells(cursor, batch_size: int = 5000) -> int:
+    """셀 키가 비어 있는 행을 채우고 채운 행 수를 반환
+
+    셀 키는 Python에서 계산하므로 batch_size씩 읽어 메모리를 제한한다. 배치는 id 순으로 이어서 읽어
+    (id > 마지막 id) 매번 처음부터 NULL 행을 다시 찾지 않는다. 행 잠금은 호출자의 트랜잭션이 끝날 때 풀린다.
+    """
+    total = 0
+    last_id = 0
+    assignments = ', '.join(f'{column} = v.{column}' for column in CELL_COLUMNS)
+    while True:
+        cursor.execute(
+            f"""
+            SELECT id, latitude, longitude FROM smoking_areas
+            WHERE id > %s AND {CELL_COLUMNS[-1]} IS NULL
+            ORDER BY id
+            LIMIT %s
+            """,
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return total
+        last_id = rows[-1][0]
+
+        values = [(row_id, *cell_keys(float(lat), float(lon))) for row_id, lat, lon in rows]
+        execute_values(
+            cursor,
+            f"""
+            UPDATE smoking_areas AS s SET {assignments}
+            FROM (VALUES %s) AS v (id, {', '.join(CELL_COLUMNS)})
+            WHERE s.id = v.id
+            """,
+            values,
+        )
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""격자 해시 기반 근접 흡연구역 중복 탐지
+
+병합 반경 크기의 균일 격자에 점을 나눠 담고, 같은 셀과 앞쪽 이웃 셀(4방향)끼리만 후보 쌍을 만든다.
+후보 거리는 haversine_kernel로 한 번에 계산하고, 반경 안의 쌍에만 주소 유사도(difflib)를 적용한다.
+병합 판정된 쌍은 union-find로 묶어 검토용 클러스터로 출력한다.
+
+거리만으로는 병합하지 않는다 - 지오코딩된 행은 건물 좌표를 공유하므로 한 주소의 서로 다른 흡연구역이
+0m 거리에 놓인다. 반경 안에서도 정규화한 주소+상세가 같거나 유사도가 기준 이상인 쌍만 묶는다.
+"""
+
+import argparse
+import csv
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from haversine_kernel import haversine_pairwise
+from spatial_cells import EARTH_RADIUS_M
+
+
+DEFAULT_RADIUS_M = 30.0
+DEFAULT_ADDRESS_THRESHOLD = 0.85
+
+# 같은 셀 + 오른쪽/아래쪽 이웃만 보면 모든 인접 셀 쌍을 한 번씩 확인한다
+_FORWARD_OFFSETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_address(address: str | None, detail: str | None = None) -> str:
+    text = f"{address or ''} {detail or ''}".lower()
+    return _SPACES.sub('', text)
+
+
+def address_similarity(left: str, right: str) -> float:
+    if not left or not right:
+        return 0.0
+    if left == right:
+        return 1.0
+    return SequenceMatcher(None, left, right, autojunk=False).ratio()
+
+
+def _grid_cells(latitudes: np.ndarray, longitudes: np.ndarray, radius_m: float) -> tuple[np.ndarray, np.ndarray]:
+    """반경 이상 크기의 셀 좌표 - 경도 폭은 가장 고위도 지점 기준이라 어디서나 반경 이상이다"""
+    lat_step = math.degrees(radius_m / EARTH_RADIUS_M)
+    max_abs_lat = min(float(np.max(np.abs(latitudes))), 89.0)
+    lon_step = lat_step / math.cos(math.radians(max_abs_lat))
+    return np.floor(longitudes / lon_step).astype(np.int64), np.floor(latitudes / lat_step).astype(np.int64)
+
+
+def candidate_pairs(latitudes, longitudes, radius_m: float) -> tuple[np.ndarray, np.ndarray]:
+    """같은 셀/이웃 셀에 있는 (i, j) 후보 쌍 (i < j 순서는 보장하지 않음)"""
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    if len(latitudes) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    cell_x, cell_y = _grid_cells(latitudes, longitudes, radius_m)
+    buckets = defaultdict(list)
+    for index, key in enumerate(zip(cell_x.tolist(), cell_y.tolist())):
+        buckets[key].append(index)
+    buckets = {key: np.asarray(members, dtype=np.int64) for key, members in buckets.items()}
+
+    left_parts, right_parts = [], []
+    for (x, y), members in buckets.items():
+        if len(members) > 1:
+            upper_i, upper_j = np.triu_indices(len(members), k=1)
+            left_parts.append(members[upper_i])
+            right_parts.append(members[upper_j])
+        for dx, dy in _FORWARD_OFFSETS:
+            neighbors = buckets.get((x + dx, y + dy))
+            if neighbors is None:
+                continue
+            left_parts.append(np.repeat(members, len(neighbors)))
+            right_parts.append(np.tile(neighbors, len(members)))
+
+    if not left_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(left_parts), np.concatenate(right_parts)
+
+
+def _find(parents: list[int], index: int) -> int:
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+
+def find_duplicate_clusters(latitudes, longitudes, addresses, radius_m: float = DEFAULT_RADIUS_M,
+                            address_threshold: float = DEFAULT_ADDRESS_THRESHOLD) -> list[dict]:
+    """중복 클러스터 목록
+
+    addresses는 normalize_address로 정규화한 문자열 목록이다.
+    각 클러스터: {'members': [인덱스...] (첫 원소가 대표 = 입력 순서상 가장 앞), 'pairs': [(i, j, 거리m, 유사도)]}
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    left, right = candidate_pairs(latitudes, longitudes, radius_m)
+    if not len(left):
+        return []
+
+    distances = haversine_pairwise(latitudes[left], longitudes[left], latitudes[right], longitudes[right])
+    close = distances <= radius_m
+
+    parents = list(range(len(latitudes)))
+    accepted = []
+    for i, j, distance in zip(left[close].tolist(), right[close].tolist(), distances[close].tolist()):
+        similarity = address_similarity(addresses[i], addresses[j])
+        if similarity < address_threshold:
+            continue
+        accepted.append((min(i, j), max(i, j), distance, similarity))
+        root_i, root_j = _find(parents, i), _find(parents, j)
+        if root_i != root_j:
+            parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = defaultdict(list)
+    for i, j, distance, similarity in accepted:
+        groups[_find(parents, i)].append((i, j, round(distance, 2), round(similarity, 3)))
+
+    clusters = []
+    for root, pairs in sorted(groups.items()):
+        members = sorted({index for pair in pairs for index in pair[:2]})
+        clusters.append({'members': members, 'pairs': pairs})
+    return clusters
+
+
+def write_review_csv(path: str, clusters: list[dict], rows: list[dict]):
+    """클러스터별 구성원을 한 줄씩 기록 (keep=1이 대표)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as fp:
+        writer = csv.writer(fp)
+        writer.writerow(['cluster', 'keep', 'id', 'category', 'address', 'detail', 'latitude', 'longitude',
+                         'distance_to_keep_m', 'address_similarity'])
+        for number, cluster in enumerate(clusters, 1):
+            members = cluster['members']
+            keep = rows[members[0]]
+            for position, index in enumerate(members):
+                row = rows[index]
+                distance = float(haversine_pairwise([keep['latitude']], [keep['longitude']],
+                                                    [row['latitude']], [row['longitude']])[0])
+                similarity = address_similarity(
+                    normalize_address(keep['address'], keep['detail']),
+                    normalize_address(row['address'], row['detail']),
+                )
+                writer.writerow([
+                    number, int(position == 0), row.get('id', index), row.get('category'), row['address'],
+                    row['detail'], row['latitude'], row['longitude'], round(distance, 2), round(similarity, 3),
+                ])
+
+
+def dedupe_rows(rows: list[dict], radius_m: float = DEFAULT_RADIUS_M,
+                address_threshold: float = DEFAULT_ADDRESS_THRESHOLD,
+                exact_only: bool = False) -> tuple[list[int], list[dict]]:
+    """rows(latitude/longitude/address/detail 키)에서 남길 인덱스와 클러스터 목록
+
+    exact_only면 클러스터 전체가 아니라 같은 클러스터에서 앞선 행과 정규화한 주소+상세가 똑같은 행만 뺀다
+    (유사도로만 묶인 행은 검토 파일에만 남는다).
+    """
+    addresses = [normalize_address(row['address'], row['detail']) for row in rows]
+    clusters = find_duplicate_clusters(
+        [row['latitude'] for row in rows],
+        [row['longitude'] for row in rows],
+        addresses,
+        radius_m, address_threshold,
+    )
+    dropped = set()
+    for cluster in clusters:
+        if not exact_only:
+            dropped.update(cluster['members'][1:])
+            continue
+        seen = set()
+        for index in cluster['members']:
+            if addresses[index] in seen:
+                dropped.add(index)
+            seen.add(addresses[index])
+    return [index for index in range(len(rows)) if index not in dropped], clusters
+
+
+def main():
+    import time
+
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Find near-duplicate active smoking areas for review.')
+    parser.add_argument('--radius', type=float, default=DEFAULT_RADIUS_M, help='Merge radius in meters.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_ADDRESS_THRESHOLD,
+                        help='Minimum address similarity (0-1) for rows within the radius.')
+    parser.add_argument('-o', '--output', default=None)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return
+    try:
+        cursor = db_manager.connection.cursor()
+        # 제보가 많은 행, 같다면 먼저 등록된 행을 대표로 남긴다
+        cursor.execute("""
+            SELECT id, category, address, detail, latitude::float8, longitude::float8
+            FROM smoking_areas
+            WHERE status = 'active'
+            ORDER BY report_count DESC, id
+        """)
+        rows = [
+            {'id': row[0], 'category': row[1], 'address': row[2], 'detail': row[3],
+             'latitude': row[4], 'longitude': row[5]}
+            for row in cursor.fetchall()
+        ]
+        cursor.close()
+    finally:
+        db_manager.disconnect()
+
+    start = time.perf_counter()
+    _, clusters = dedupe_rows(rows, args.radius, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    duplicates = sum(len(cluster['members']) - 1 for cluster in clusters)
+    print(f"🔍 {len(rows)}개 중 중복 후보 클러스터 {len(clusters)}개 (제거 후보 {duplicates}개, {elapsed:.2f}초)")
+    if clusters:
+        output = args.output or f"dedupe_clusters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        write_review_csv(output, clusters, rows)
+        print(f"  검토 파일 저장: {output}")
+
+
+if __name__ == '__main__':
+    main()
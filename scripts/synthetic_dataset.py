@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""규모 테스트용 합성 흡연구역 데이터 생성기
+
+- 실제 시군구 중심점 주변에 핫스팟(역세권/상권) 단위로 모인 좌표와 한국식 도로명/지번 주소
+- 같은 지점을 다시 제보한 것 같은 근접 중복(좌표 수 m 흔들림, 상세 표기 차이)과 좌표 결측 비율 조절
+- smoking_place_raw.csv / final_smoking_places_with_coordinates_*.csv 스키마로 청크 단위 스트리밍 기록
+  (메모리는 청크 크기 + 중복 후보 저장소 크기로 고정되어 1천만 행도 같은 메모리로 만든다)
+- --seed-db: 좌표가 있는 행을 COPY로 로컬 DB smoking_areas에 바로 적재
+
+    python3 synthetic_dataset.py --rows 1000000 --schema both -o synthetic/
+    python3 synthetic_dataset.py --rows 100000 --schema none --seed-db replace
+"""
+
+import argparse
+import csv
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+RAW_COLUMNS = ('카테고리', '주소', '상세', '우편번호', 'latitude', 'longitutde')
+FINAL_COLUMNS = RAW_COLUMNS + (
+    '표준화주소', '지번주소', '검증상태', '검증일시', 'kakao_longitude', 'kakao_latitude', '좌표변환상태', '좌표변환일시',
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_MISSING_RATIO = 0.6       # 원천 469건 중 좌표 보유 188건
+DEFAULT_DUPLICATE_RATIO = 0.02
+DEFAULT_VERIFY_FAILURE_RATIO = 0.05
+DUPLICATE_POOL_SIZE = 10_000
+HOTSPOTS_PER_DISTRICT = 6
+
+# (시도 시군구, 위도, 경도, 상대 비중) - 시군구청 부근 좌표
+DISTRICTS = (
+    ('서울특별시 중구', 37.5638, 126.9976, 5), ('서울특별시 종로구', 37.5735, 126.9790, 4),
+    ('서울특별시 강남구', 37.5172, 127.0473, 6), ('서울특별시 서초구', 37.4837, 127.0324, 4),
+    ('서울특별시 송파구', 37.5145, 127.1059, 4), ('서울특별시 마포구', 37.5663, 126.9019, 4),
+    ('서울특별시 영등포구', 37.5264, 126.8962, 4), ('서울특별시 용산구', 37.5326, 126.9905, 3),
+    ('서울특별시 성동구', 37.5634, 127.0369, 2), ('서울특별시 광진구', 37.5385, 127.0823, 2),
+    ('서울특별시 동대문구', 37.5744, 127.0396, 2), ('서울특별시 노원구', 37.6542, 127.0568, 2),
+    ('서울특별시 관악구', 37.4781, 126.9515, 2), ('서울특별시 구로구', 37.4954, 126.8874, 2),
+    ('서울특별시 강서구', 37.5509, 126.8495, 2), ('부산광역시 중구', 35.1063, 129.0324, 2),
+    ('부산광역시 해운대구', 35.1631, 129.1636, 3), ('부산광역시 부산진구', 35.1629, 129.0532, 3),
+    ('부산광역시 동래구', 35.2049, 129.0837, 1), ('대구광역시 중구', 35.8693, 128.6062, 2),
+    ('대구광역시 수성구', 35.8582, 128.6306, 2), ('인천광역시 남동구', 37.4474, 126.7314, 2),
+    ('인천광역시 연수구', 37.4101, 126.6783, 2), ('인천광역시 부평구', 37.5070, 126.7219, 2),
+    ('광주광역시 동구', 35.1461, 126.9232, 1), ('광주광역시 서구', 35.1520, 126.8903, 1),
+    ('대전광역시 서구', 36.3554, 127.3838, 2), ('대전광역시 유성구', 36.3624, 127.3563, 1),
+    ('울산광역시 남구', 35.5438, 129.3300, 1), ('세종특별자치시', 36.4800, 127.2890, 1),
+    ('경기도 수원시', 37.2636, 127.0286, 3), ('경기도 성남시', 37.4200, 127.1265, 3),
+    ('경기도 고양시', 37.6584, 126.8320, 2), ('경기도 용인시', 37.2411, 127.1776, 2),
+    ('경기도 부천시', 37.5035, 126.7660, 2), ('경기도 안양시', 37.3943, 126.9568, 1),
+    ('경기도 화성시', 37.1995, 126.8314, 1), ('강원특별자치도 춘천시', 37.8813, 127.7298, 1),
+    ('강원특별자치도 강릉시', 37.7519, 128.8761, 1), ('충청북도 청주시', 36.6424, 127.4890, 1),
+    ('충청남도 천안시', 36.8151, 127.1139, 1), ('전북특별자치도 전주시', 35.8242, 127.1480, 1),
+    ('전라남도 목포시', 34.8118, 126.3922, 1), ('전라남도 여수시', 34.7604, 127.6622, 1),
+    ('경상북도 포항시', 36.0190, 129.3435, 1), ('경상북도 경주시', 35.8562, 129.2247, 1),
+    ('경상남도 창원시', 35.2280, 128.6811, 2), ('경상남도 김해시', 35.2285, 128.8894, 1),
+    ('제주특별자치도 제주시', 33.4996, 126.5312, 2), ('제주특별자치도 서귀포시', 33.2541, 126.5601, 1),
+)
+
+ROAD_NAMES = (
+    '중앙로', '시청로', '역전로', '문화로', '공원로', '번영로', '대학로', '시장로', '광장로', '평화로',
+    '희망로', '상공로', '구청로', '신흥로', '동부로', '서부로', '남부순환로', '북부로', '강변로', '산업로',
+)
+DONG_NAMES = ('중앙동', '신흥동', '대성동', '문화동', '역전동', '상공동', '평화동', '희망동', '남산동', '북정동')
+DETAILS = (
+    '건물 앞', '정문 옆', '후문 흡연부스', '주차장 입구', '출입구 우측', '1층 외부 테라스', '버스정류장 뒤',
+    '공원 흡연구역', '지하철역 3번 출구', '상가 뒤편', '옥상 정원', '광장 동측',
+)
+CATEGORIES = ('부분 개방형', '완전 개방형', '폐쇄형', '시민제보')
+CATEGORY_WEIGHTS = (0.45, 0.25, 0.2, 0.1)
+
+# 핫스팟 주변 표준편차(도) ≈ 300m, 시군구 전체 흩어짐 ≈ 2km
+HOTSPOT_SPREAD_DEG = 0.003
+DISTRICT_SPREAD_DEG = 0.02
+HOTSPOT_SHARE = 0.7
+DUPLICATE_JITTER_DEG = 0.00002  # 약 2m
+
+
+class SyntheticSmokingAreaGenerator:
+    def __init__(self, seed: int = 42, missing_ratio: float = DEFAULT_MISSING_RATIO,
+                 duplicate_ratio: float = DEFAULT_DUPLICATE_RATIO,
+                 verify_failure_ratio: float = DEFAULT_VERIFY_FAILURE_RATIO,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.rng = np.random.default_rng(seed)
+        self.missing_ratio = missing_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self.verify_failure_ratio = verify_failure_ratio
+        self.chunk_size = chunk_size
+
+        weights = np.array([district[3] for district in DISTRICTS], dtype=np.float64)
+        self.district_weights = weights / weights.sum()
+        self.centers = np.array([(district[1], district[2]) for district in DISTRICTS])
+        self.hotspots = self.centers[:, None, :] + self.rng.normal(
+            0, DISTRICT_SPREAD_DEG / 2, (len(DISTRICTS), HOTSPOTS_PER_DISTRICT, 2),
+        )
+        # 시군구마다 우편번호 앞자리 (실제 체계처럼 지역별로 모이게)
+        self.postal_bases = self.rng.choice(np.arange(100, 640), len(DISTRICTS), replace=False) * 100
+
+        self.generated = 0
+        self.duplicates = 0
+        self.missing = 0
+        self._pool: dict[str, list] = {}
+        self._pool_size = 0
+
+    def _fresh(self, count: int) -> dict[str, np.ndarray]:
+        rng = self.rng
+        district = rng.choice(len(DISTRICTS), count, p=self.district_weights)
+        hotspot = rng.integers(0, HOTSPOTS_PER_DISTRICT, count)
+        near_hotspot = rng.random(count) < HOTSPOT_SHARE
+
+        base = np.where(near_hotspot[:, None], self.hotspots[district, hotspot], self.centers[district])
+        spread = np.where(near_hotspot, HOTSPOT_SPREAD_DEG, DISTRICT_SPREAD_DEG)[:, None]
+        coords = base + rng.normal(0, 1, (count, 2)) * spread
+
+        names = [DISTRICTS[index][0] for index in district.tolist()]
+        roads = rng.integers(0, len(ROAD_NAMES), count).tolist()
+        numbers = rng.integers(1, 400, count).tolist()
+        side = (rng.random(count) < 0.15).tolist()
+        side_numbers = rng.integers(1, 60, count).tolist()
+        dongs = rng.integers(0, len(DONG_NAMES), count).tolist()
+        bunji = rng.integers(1, 900, count).tolist()
+        bunji_sub = rng.integers(0, 80, count).tolist()
+
+        return {
+            'category': np.array(CATEGORIES, dtype=object)[rng.choice(len(CATEGORIES), count, p=CATEGORY_WEIGHTS)],
+            'address': np.array([
+                f'{name} {ROAD_NAMES[road]}{f"{side_number}번길 " if is_side else " "}{number}'
+                for name, road, number, is_side, side_number in zip(names, roads, numbers, side, side_numbers)
+            ], dtype=object),
+            'jibun': np.array([
+                f'{name} {DONG_NAMES[dong]} {number}{f"-{sub}" if sub else ""}'
+                for name, dong, number, sub in zip(names, dongs, bunji, bunji_sub)
+            ], dtype=object),
+            'detail': np.array(DETAILS, dtype=object)[rng.integers(0, len(DETAILS), count)],
+            'postal_code': np.char.zfill((self.postal_bases[district] + rng.integers(0, 100, count)).astype(str), 5).astype(object),
+            'latitude': coords[:, 0].round(7),
+            'longitude': coords[:, 1].round(7),
+        }
+
+    def _remember(self, chunk: dict[str, np.ndarray]):
+        """중복 후보 저장소를 최근 행으로 채운다 (DUPLICATE_POOL_SIZE 개 상한)"""
+        take = min(len(chunk['address']), DUPLICATE_POOL_SIZE)
+        for key, values in chunk.items():
+            self._pool[key] = np.concatenate([self._pool.get(key, values[:0]), values[-take:]])[-DUPLICATE_POOL_SIZE:]
+        self._pool_size = len(self._pool['address'])
+
+    def _duplicates(self, count: int) -> dict[str, np.ndarray]:
+        picks = self.rng.integers(0, self._pool_size, count)
+        chunk = {key: values[picks].copy() for key, values in self._pool.items()}
+        jitter = self.rng.normal(0, DUPLICATE_JITTER_DEG, (count, 2))
+        chunk['latitude'] = (chunk['latitude'] + jitter[:, 0]).round(7)
+        chunk['longitude'] = (chunk['longitude'] + jitter[:, 1]).round(7)
+        # 같은 지점의 다른 제보처럼 상세 표기를 조금 바꾼다
+        respell = self.rng.random(count) < 0.5
+        chunk['detail'][respell] = np.array([detail.replace(' ', '') for detail in chunk['detail'][respell]], dtype=object)
+        return chunk
+
+    def chunks(self, rows: int):
+        """{'category', 'address', 'jibun', 'detail', 'postal_code', 'latitude', 'longitude', 'has_coordinates',
+        'verified'} 컬럼 배열 묶음을 chunk_size 행씩 생성"""
+        while self.generated < rows:
+            count = min(self.chunk_size, rows - self.generated)
+            duplicate_count = min(int(self.rng.binomial(count, self.duplicate_ratio)), count - 1)
+            fresh = self._fresh(count - duplicate_count)
+            self._remember(fresh)
+            if duplicate_count:
+                duplicates = self._duplicates(duplicate_count)
+                chunk = {key: np.concatenate([fresh[key], duplicates[key]]) for key in fresh}
+                order = self.rng.permutation(count)
+                chunk = {key: values[order] for key, values in chunk.items()}
+            else:
+                chunk = fresh
+
+            chunk['has_coordinates'] = self.rng.random(count) >= self.missing_ratio
+            chunk['verified'] = self.rng.random(count) >= self.verify_failure_ratio
+            self.generated += count
+            self.duplicates += duplicate_count
+            self.missing += int((~chunk['has_coordinates']).sum())
+            yield chunk
+
+
+def _coordinate_text(values: np.ndarray, present: np.ndarray) -> list[str]:
+    return [f'{value:.7f}' if keep else '' for value, keep in zip(values.tolist(), present.tolist())]
+
+
+def raw_rows(chunk: dict) -> list[tuple]:
+    lat = _coordinate_text(chunk['latitude'], chunk['has_coordinates'])
+    lon = _coordinate_text(chunk['longitude'], chunk['has_coordinates'])
+    return list(zip(chunk['category'], chunk['address'], chunk['detail'], chunk['postal_code'], lat, lon))
+
+
+def final_rows(chunk: dict, verified_at: str, geocoded_at: str) -> list[tuple]:
+    """add_coordinates.py 출력과 같은 형태 - 원본 좌표 컬럼은 비우고 카카오 좌표 컬럼에 기록"""
+    rows = []
+    for category, address, detail, postal_code, jibun, lat, lon, has_coordinates, verified in zip(
+        chunk['category'], chunk['address'], chunk['detail'], chunk['postal_code'], chunk['jibun'],
+        chunk['latitude'].tolist(), chunk['longitude'].tolist(),
+        chunk['has_coordinates'].tolist(), chunk['verified'].tolist(),
+    ):
+        if not verified:
+            rows.append((category, address, detail, '', '', '', '', '', '실패', verified_at, '', '', '', ''))
+            continue
+        geocoded = '성공' if has_coordinates else '실패'
+        rows.append((
+            category, address, detail, postal_code, '', '', address, jibun, '성공', verified_at,
+            f'{lon:.7f}' if has_coordinates else '', f'{lat:.7f}' if has_coordinates else '', geocoded, geocoded_at,
+        ))
+    return rows
+
+
+def generate_frame(rows: int, seed: int = 42, **options) -> pd.DataFrame:
+    """raw 스키마 DataFrame (벤치마크/테스트용 - 한 번에 메모리에 올려도 되는 크기에서만)"""
+    generator = SyntheticSmokingAreaGenerator(seed, **options)
+    frames = [
+        pd.DataFrame(raw_rows(chunk), columns=RAW_COLUMNS).replace({'latitude': {'': np.nan}, 'longitutde': {'': np.nan}})
+        for chunk in generator.chunks(rows)
+    ]
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RAW_COLUMNS)
+    frame['latitude'] = pd.to_numeric(frame['latitude'])
+    frame['longitutde'] = pd.to_numeric(frame['longitutde'])
+    return frame
+
+
+def seed_database(connection, chunks, mode: str = 'append') -> int:
+    """좌표가 있는 행을 smoking_areas에 COPY로 적재 (replace는 기존 행을 비운다)"""
+    from region_assignment import REGION_COLUMNS, region_codes_for
+    from schema_migrations import SchemaMigrator
+    from spatial_cells import CELL_COLUMNS, cell_keys
+
+    columns = ('category', 'address', 'detail', 'postal_code', 'longitude', 'latitude', 'status', 'report_count',
+               'created_at', 'updated_at') + CELL_COLUMNS + REGION_COLUMNS
+    copy_sql = f"COPY smoking_areas ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    inserted = 0
+    with connection:
+        with connection.cursor() as cursor:
+            SchemaMigrator(connection).migrate(cursor)
+            if mode == 'replace':
+                cursor.execute('TRUNCATE TABLE smoking_areas RESTART IDENTITY CASCADE;')
+
+            now = datetime.utcnow().isoformat()
+            for chunk in chunks:
+                keep = chunk['has_coordinates'] & chunk['verified']
+                lat = chunk['latitude'][keep].tolist()
+                lon = chunk['longitude'][keep].tolist()
+                categories = ['시민제보' if category == '시민제보' else '공공데이타' for category in chunk['category'][keep]]
+
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    (category, address, detail, postal_code, lo, la, 'active', 0, now, now, *cell_keys(la, lo), *codes)
+                    for category, address, detail, postal_code, la, lo, codes in zip(
+                        categories, chunk['address'][keep], chunk['detail'][keep], chunk['postal_code'][keep],
+                        lat, lon, region_codes_for(lat, lon),
+                    )
+                )
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                inserted += len(lat)
+    return inserted
+
+
+class _CsvSink:
+    def __init__(self, path: str, columns: tuple):
+        self.path = path
+        # utf-8-sig 코덱은 write마다 BOM 상태를 확인해 느리므로 BOM만 직접 쓴다
+        self.fp = open(path, 'w', encoding='utf-8', newline='', buffering=1 << 20)
+        self.fp.write('\ufeff')
+        self.writer = csv.writer(self.fp)
+        self.writer.writerow(columns)
+
+    def close(self):
+        self.fp.close()
+
+
+def _consume(args, metrics, chunks):
+    """생성된 청크를 끝까지 소비 (--seed-db면 DB에 COPY)"""
+    if args.seed_db:
+        import psycopg2
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        connection = psycopg2.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '5432'),
+            database=os.getenv('DB_NAME', 'smoking_areas_db'),
+            user=os.getenv('DB_USER', 'postgres'),
+            password=os.getenv('DB_PASSWORD', ''),
+        )
+        try:
+            with metrics.stage('generate_and_seed', rows=args.rows):
+                inserted = seed_database(connection, chunks, args.seed_db)
+        finally:
+            connection.close()
+        print(f"  🗄️ DB 적재 ({args.seed_db}): {inserted:,}행")
+    else:
+        with metrics.stage('generate', rows=args.rows):
+            for _ in chunks:
+                pass
+
+
+def main():
+    from pipeline_metrics import pipeline_metrics
+    from pipeline_profiler import profile_run
+
+    parser = argparse.ArgumentParser(description='Generate synthetic smoking-area CSVs for scale testing.')
+    parser.add_argument('--rows', type=int, default=10_000, help='Rows to generate (10k-10M).')
+    parser.add_argument('--schema', choices=['raw', 'final', 'both', 'none'], default='both',
+                        help='CSV schema(s) to write: smoking_place_raw.csv and/or final_smoking_places_with_coordinates_*.csv.')
+    parser.add_argument('-o', '--output-dir', default='.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--missing', type=float, default=DEFAULT_MISSING_RATIO, help='Fraction of rows without coordinates.')
+    parser.add_argument('--duplicates', type=float, default=DEFAULT_DUPLICATE_RATIO,
+                        help='Fraction of rows that re-report a nearby earlier spot.')
+    parser.add_argument('--verify-failures', type=float, default=DEFAULT_VERIFY_FAILURE_RATIO,
+                        help='Fraction of rows marked as failed address verification in the final schema.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows held in memory at once.')
+    parser.add_argument('--seed-db', choices=['append', 'replace'], default=None,
+                        help='Also COPY rows with coordinates into the local smoking_areas table.')
+    parser.add_argument('--profile', action='store_true', help='Write cProfile stats and collapsed stacks.')
+    parser.add_argument('--memory', action='store_true', help='Record per-stage peak memory in the metrics report.')
+    args = parser.parse_args()
+
+    if args.memory:
+        pipeline_metrics('synthetic_dataset').track_memory()
+
+    generator = SyntheticSmokingAreaGenerator(args.seed, args.missing, args.duplicates, args.verify_failures, args.chunk_size)
+    metrics = pipeline_metrics('synthetic_dataset')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    sinks = []
+    if args.schema in {'raw', 'both'}:
+        sinks.append(('raw', _CsvSink(os.path.join(args.output_dir, f'smoking_place_raw_synthetic_{args.rows}.csv'), RAW_COLUMNS)))
+    if args.schema in {'final', 'both'}:
+        sinks.append(('final', _CsvSink(
+            os.path.join(args.output_dir, f'final_smoking_places_with_coordinates_synthetic_{args.rows}.csv'), FINAL_COLUMNS,
+        )))
+
+    verified_at = (datetime.now() - timedelta(minutes=30)).strftime('%Y-%m-%d %H:%M')
+    geocoded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    start = time.perf_counter()
+
+    def written_chunks():
+        for chunk in generator.chunks(args.rows):
+            for kind, sink in sinks:
+                sink.writer.writerows(raw_rows(chunk) if kind == 'raw' else final_rows(chunk, verified_at, geocoded_at))
+            if generator.generated % (args.chunk_size * 20) == 0 or generator.generated == args.rows:
+                elapsed = time.perf_counter() - start
+                print(f"  진행: {generator.generated:,}/{args.rows:,} ({generator.generated / elapsed:,.0f}행/초)")
+            yield chunk
+
+    print(f"🧪 합성 데이터 {args.rows:,}행 생성 (좌표 결측 {args.missing:.0%}, 중복 {args.duplicates:.0%}, 시드 {args.seed})")
+    try:
+        with profile_run('synthetic_dataset', enabled=args.profile, directory=args.output_dir):
+            _consume(args, metrics, written_chunks())
+    finally:
+        for _, sink in sinks:
+            sink.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ 완료 ({elapsed:.1f}초): 중복 {generator.duplicates:,}행, 좌표 결측 {generator.missing:,}행")
+    for _, sink in sinks:
+        print(f"  📄 {sink.path}: {os.path.getsize(sink.path):,} bytes")
+    metrics.write_reports(directory=args.output_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""활성 흡연구역 Mapbox Vector Tile(MVT) 피라미드 생성
+
+active_smoking_areas를 한 번 읽어 줌 범위의 타일별로 점을 나누고,
+비어 있지 않은 타일만 디렉터리({z}/{x}/{y}.pbf) 또는 MBTiles(SQLite)로 기록한다.
+MVT 2.1 포인트 레이어만 필요하므로 protobuf 인코딩을 직접 구현한다.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import shutil
+import sqlite3
+from collections import defaultdict
+
+from spatial_cells import MAX_MERCATOR_LAT
+
+
+LAYER_NAME = 'smoking_areas'
+TILE_EXTENT = 4096
+
+_WIRE_VARINT = 0
+_WIRE_LENGTH = 2
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint((field << 3) | _WIRE_VARINT) + _varint(value)
+
+
+def _field_bytes(field: int, payload: bytes) -> bytes:
+    return _varint((field << 3) | _WIRE_LENGTH) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values) -> bytes:
+    return _field_bytes(field, b''.join(_varint(value) for value in values))
+
+
+def _encode_value(value) -> bytes:
+    # Value: string=1, sint64=6, bool=7
+    if isinstance(value, bool):
+        return _field_varint(7, int(value))
+    if isinstance(value, int):
+        return _varint((6 << 3) | _WIRE_VARINT) + _varint((value << 1) ^ (value >> 63))
+    return _field_bytes(1, str(value).encode('utf-8'))
+
+
+def world_pixel(latitude: float, longitude: float, zoom: int) -> tuple[float, float]:
+    """줌 레벨의 타일 단위 좌표 (정수부 = 타일 번호)"""
+    lat = max(min(latitude, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    n = 1 << zoom
+    x = (longitude + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return min(max(x, 0.0), n - 1e-9), min(max(y, 0.0), n - 1e-9)
+
+
+def encode_tile(features: list[tuple[int, int, int, dict]]) -> bytes:
+    """(id, tile_x, tile_y, properties) 목록을 포인트 레이어 하나짜리 MVT로 인코딩"""
+    keys: dict[str, int] = {}
+    values: dict[tuple, int] = {}
+    encoded_features = []
+
+    for feature_id, px, py, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            key_index = keys.setdefault(key, len(keys))
+            value_index = values.setdefault((type(value).__name__, value), len(values))
+            tags.extend((key_index, value_index))
+
+        geometry = (9, _zigzag(px), _zigzag(py))  # MoveTo(1) x 1
+        encoded_features.append(
+            _field_varint(1, feature_id)
+            + _packed(2, tags)
+            + _field_varint(3, 1)  # POINT
+            + _packed(4, geometry)
+        )
+
+    layer = _field_varint(15, 2) + _field_bytes(1, LAYER_NAME.encode('utf-8'))
+    layer += b''.join(_field_bytes(2, feature) for feature in encoded_features)
+    layer += b''.join(_field_bytes(3, key.encode('utf-8')) for key in keys)
+    layer += b''.join(_field_bytes(4, _encode_value(value)) for _, value in values)
+    layer += _field_varint(5, TILE_EXTENT)
+    return _field_bytes(3, layer)
+
+
+def build_tiles(points, min_zoom: int, max_zoom: int):
+    """points: (id, longitude, latitude, category, report_count) 목록
+
+    (z, x, y, tile_bytes)를 줌 순서대로 생성한다. 점이 없는 타일은 만들지 않는다.
+    """
+    for zoom in range(min_zoom, max_zoom + 1):
+        buckets = defaultdict(list)
+        for area_id, longitude, latitude, category, report_count in points:
+            wx, wy = world_pixel(latitude, longitude, zoom)
+            tx, ty = int(wx), int(wy)
+            px = int((wx - tx) * TILE_EXTENT)
+            py = int((wy - ty) * TILE_EXTENT)
+            buckets[(tx, ty)].append((area_id, px, py, {'category': category, 'report_count': int(report_count or 0)}))
+
+        for (tx, ty), features in buckets.items():
+            yield zoom, tx, ty, encode_tile(features)
+
+
+class DirectoryTileSink:
+    """{z}/{x}/{y}.pbf 디렉터리
+
+    옆의 임시 디렉터리(<output>.tmp)에 만든 뒤 close()에서 통째로 바꿔 넣어,
+    이번 실행에서 비게 된 타일이 이전 실행의 파일로 남지 않게 한다.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = os.path.normpath(output_dir)
+        self.build_dir = f'{self.output_dir}.tmp'
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+        os.makedirs(self.build_dir)
+
+    def write(self, zoom: int, x: int, y: int, data: bytes):
+        tile_dir = os.path.join(self.build_dir, str(zoom), str(x))
+        os.makedirs(tile_dir, exist_ok=True)
+        with open(os.path.join(tile_dir, f'{y}.pbf'), 'wb') as fp:
+            fp.write(data)
+
+    def close(self, metadata: dict):
+        with open(os.path.join(self.build_dir, 'metadata.json'), 'w', encoding='utf-8') as fp:
+            json.dump(metadata, fp, ensure_ascii=False, indent=2)
+
+        # 비어 있지 않은 디렉터리는 os.replace로 덮어쓸 수 없어 이전 결과를 옆으로 옮긴 뒤 교체한다
+        old_dir = f'{self.output_dir}.old'
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self.output_dir):
+            os.replace(self.output_dir, old_dir)
+        os.replace(self.build_dir, self.output_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def abort(self):
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+
+
+class MBTilesSink:
+    """MBTiles 1.3 (tile_row는 TMS 기준으로 뒤집어 저장, 타일은 gzip)"""
+
+    def __init__(self, output_file: str):
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        self.connection = sqlite3.connect(output_file)
+        self.connection.executescript("""
+            CREATE TABLE metadata (name TEXT, value TEXT);
+            CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+            CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+        """)
+
+    def write(self, zoom: int, x: int, y: int, data: bytes):
+        tms_row = (1 << zoom) - 1 - y
+        self.connection.execute(
+            'INSERT INTO tiles VALUES (?, ?, ?, ?)',
+            (zoom, x, tms_row, gzip.compress(data)),
+        )
+
+    def close(self, metadata: dict):
+        rows = [(key, value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+                for key, value in metadata.items()]
+        self.connection.executemany('INSERT INTO metadata VALUES (?, ?)', rows)
+        self.connection.commit()
+        self.connection.close()
+
+    def abort(self):
+        self.connection.close()
+
+
+def tileset_metadata(points, min_zoom: int, max_zoom: int) -> dict:
+    longitudes = [point[1] for point in points]
+    latitudes = [point[2] for point in points]
+    bounds = [min(longitudes), min(latitudes), max(longitudes), max(latitudes)]
+    center_zoom = min(max(min_zoom, 12), max_zoom)
+    return {
+        'name': LAYER_NAME,
+        'format': 'pbf',
+        'type': 'overlay',
+        'minzoom': str(min_zoom),
+        'maxzoom': str(max_zoom),
+        'bounds': ','.join(f'{value:.7f}' for value in bounds),
+        'center': f'{(bounds[0] + bounds[2]) / 2:.7f},{(bounds[1] + bounds[3]) / 2:.7f},{center_zoom}',
+        'json': {
+            'vector_layers': [{
+                'id': LAYER_NAME,
+                'minzoom': min_zoom,
+                'maxzoom': max_zoom,
+                'fields': {'category': 'String', 'report_count': 'Number'},
+            }]
+        },
+    }
+
+
+def load_active_points(connection, batch_size: int = 5000) -> list[tuple]:
+    cursor = connection.cursor(name='vector_tiles_cursor')
+    cursor.itersize = batch_size
+    cursor.execute("""
+        SELECT id, longitude::float8, latitude::float8, category, report_count
+        FROM active_smoking_areas
+        ORDER BY id
+    """)
+    points = [tuple(row) for row in cursor]
+    cursor.close()
+    connection.commit()
+    return points
+
+
+def main():
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Build a vector tile pyramid of active smoking areas.')
+    parser.add_argument('output', help='Output directory, or a *.mbtiles file.')
+    parser.add_argument('--min-zoom', type=int, default=6)
+    parser.add_argument('--max-zoom', type=int, default=16)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return
+
+    try:
+        points = load_active_points(db_manager.connection)
+    finally:
+        db_manager.disconnect()
+
+    if not points:
+        print("❌ 활성 흡연구역이 없어 타일을 만들 수 없습니다.")
+        return
+
+    print(f"🧱 벡터 타일 생성: {len(points)}개 지점, 줌 {args.min_zoom}-{args.max_zoom}")
+    sink = MBTilesSink(args.output) if args.output.endswith('.mbtiles') else DirectoryTileSink(args.output)
+
+    tile_counts = defaultdict(int)
+    total_bytes = 0
+    try:
+        for zoom, x, y, data in build_tiles(points, args.min_zoom, args.max_zoom):
+            sink.write(zoom, x, y, data)
+            tile_counts[zoom] += 1
+            total_bytes += len(data)
+    except BaseException:
+        sink.abort()
+        raise
+
+    sink.close(tileset_metadata(points, args.min_zoom, args.max_zoom))
+
+    for zoom in sorted(tile_counts):
+        print(f"  z{zoom}: {tile_counts[zoom]}개 타일")
+    print(f"✅ 타일 {sum(tile_counts.values())}개 ({total_bytes:,} bytes) 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()